@@ -0,0 +1,59 @@
+"""
+Compare snapshot codecs for students.data: file size, save time and load time.
+
+Run from the project root:
+    python -m benchmarks.codec_benchmark
+    python -m benchmarks.codec_benchmark --sizes 10000,100000 --format stream
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import List
+from db.codecs import CODECS
+from db.database import Database
+from db.generator import generate
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+
+def synthetic_records(n: int, seed: int = 42) -> List[dict]:
+    """
+    Build n student records with the synthetic population generator.
+    """
+    return [record for batch in generate(n, seed=seed) for record in batch]
+
+
+def run(sizes: List[int], snapshot_format: str) -> None:
+    """Print one row per (size, codec)."""
+    DATABASE_CONFIG["snapshot_format"] = snapshot_format
+    DATABASE_CONFIG["read_cache"] = False
+    print(f"{'students':>10} {'codec':>6} {'size (KiB)':>12} {'save (s)':>10} {'load (s)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            records = synthetic_records(n)
+            for codec in CODECS:
+                DATABASE_CONFIG["compression"] = codec
+                db = Database(path=os.path.join(tmp, f"students-{n}-{codec}.data"), verbose=False)
+
+                start = time.perf_counter()
+                db.write_to_file(records)
+                save = time.perf_counter() - start
+
+                start = time.perf_counter()
+                loaded = db.read_from_file()
+                load = time.perf_counter() - start
+
+                assert len(loaded) == n
+                size = os.path.getsize(db.path) / 1024
+                print(f"{n:>10} {codec:>6} {size:>12.1f} {save:>10.3f} {load:>10.3f}")
+                os.remove(db.path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark students.data compression codecs.")
+    parser.add_argument("--sizes", default="10000,100000,999999",
+                        help="comma-separated student counts")
+    parser.add_argument("--format", default="pickle", choices=("pickle", "stream"),
+                        help="snapshot layout to benchmark")
+    args = parser.parse_args()
+    run([int(x) for x in args.sizes.split(",")], args.format)
@@ -0,0 +1,72 @@
+"""
+Measure StudentController login and duplicate-email checks as the population
+grows, against a linear scan of the store (Database.find_by_email without
+secondary indexes).
+
+Run from the project root:
+    python -m benchmarks.login_benchmark
+    python -m benchmarks.login_benchmark --sizes 1000,100000 --lookups 5000
+"""
+import argparse
+import gc
+import os
+import random
+import tempfile
+import time
+from typing import Callable, List
+from controller.student_controller import StudentController
+from db.async_database import AsyncDatabase
+from db.database import Database
+from db.generator import generate, write_population
+from db.id_allocator import IdAllocator
+from db.student_repository import StudentRepository
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+
+def mean_latency_us(func: Callable[[str], object], keys: List[str]) -> float:
+    """Mean time of func(key) over the keys, in microseconds."""
+    start = time.perf_counter()
+    for key in keys:
+        func(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def run(sizes: List[int], lookups: int, scans: int) -> None:
+    """Print one row per size."""
+    DATABASE_CONFIG["secondary_indexes"] = False
+    rng = random.Random(0)
+    print(f"{'students':>10} {'build (s)':>10} {'login (us)':>11} {'exists (us)':>12} {'scan (us)':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            db = Database(path=os.path.join(tmp, f"students-{n}.data"), verbose=False)
+            records = [record for batch in generate(n) for record in batch]
+            write_population(db, iter([records]))
+            controller = StudentController(db, adb=AsyncDatabase(db), ids=IdAllocator.for_database(db),
+                                           students=StudentRepository(db))
+            sample = [records[rng.randrange(n)] for _ in range(lookups)]
+            passwords = {r["email"]: r["password"] for r in sample}
+            missing = [f"nobody.{i}@university.com" for i in range(lookups)]
+
+            start = time.perf_counter()
+            controller.email_exists(missing[0])  # Builds the index
+            build = time.perf_counter() - start
+            # Until the new index dict reaches the oldest GC generation, every young
+            # collection traverses all its entries; a long-running app gets there
+            # after a few collections, so promote it now rather than time that
+            gc.collect()
+
+            login = mean_latency_us(lambda email: controller.login(email, passwords[email]),
+                                    [r["email"] for r in sample])
+            exists = mean_latency_us(controller.email_exists, missing)
+            scan = mean_latency_us(db.find_by_email, missing[:scans])
+            print(f"{n:>10} {build:>10.3f} {login:>11.1f} {exists:>12.1f} {scan:>11.1f}")
+            db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="StudentController login latency vs population size.")
+    parser.add_argument("--sizes", default="1000,10000,100000,999999", help="comma-separated student counts")
+    parser.add_argument("--lookups", type=int, default=2000, help="logins and email checks per size")
+    parser.add_argument("--scans", type=int, default=20, help="linear-scan lookups per size (baseline)")
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(",")], args.lookups, args.scans)
@@ -0,0 +1,79 @@
+"""
+Measure the memory held by decoded Student objects: bytes per student for the
+slot-based, interned models versus equivalent plain dataclasses.
+
+Run from the project root:
+    python -m benchmarks.memory_benchmark
+    python -m benchmarks.memory_benchmark --sizes 100000
+"""
+import argparse
+import pickle
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, List
+from db.generator import generate
+from models.student_model import Student
+
+
+# ---------- Baseline: the previous plain (__dict__-based, non-interned) models ----------
+
+@dataclass
+class PlainSubject:
+    id: str
+    title: str
+    mark: int
+    grade: str
+
+
+@dataclass
+class PlainStudent:
+    id: str
+    name: str
+    email: str
+    password: str
+    subjects: List[PlainSubject] = field(default_factory=list)
+
+    @staticmethod
+    def from_dict(data: dict) -> "PlainStudent":
+        return PlainStudent(data["id"], data["name"], data["email"], data["password"],
+                            [PlainSubject(s["id"], s["title"], s["mark"], s["grade"]) for s in data["subjects"]])
+
+
+def pickled_records(n: int) -> List[bytes]:
+    """
+    Synthetic records pickled one by one, like the frames of a stream snapshot.
+    Decoding them yields fresh strings per record, as reading students.data does.
+    """
+    return [pickle.dumps(record) for batch in generate(n) for record in batch]
+
+
+def bytes_per_student(blobs: List[bytes], from_dict: Callable[[dict], object]) -> float:
+    """
+    Traced memory retained by the decoded students (the intermediate dicts
+    are freed), divided by the count.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    students = [from_dict(pickle.loads(blob)) for blob in blobs]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del students
+    return (after - before) / len(blobs)
+
+
+def run(sizes: List[int]) -> None:
+    """Print one row per (size, model)."""
+    print(f"{'students':>10} {'model':>8} {'bytes/student':>14}")
+    for n in sizes:
+        blobs = pickled_records(n)
+        plain = bytes_per_student(blobs, PlainStudent.from_dict)
+        slots = bytes_per_student(blobs, Student.from_dict)
+        print(f"{n:>10} {'plain':>8} {plain:>14.1f}")
+        print(f"{n:>10} {'slots':>8} {slots:>14.1f}   ({100 * (1 - slots / plain):.0f}% smaller)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bytes per decoded Student, plain vs slot-based models.")
+    parser.add_argument("--sizes", default="100000,999999", help="comma-separated student counts")
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(",")])
@@ -1,54 +1,239 @@
 from __future__ import annotations
-from typing import List
+from itertools import chain, islice
+from typing import Iterator
+from db.async_database import AsyncDatabase
 from db.database import Database
-from models.admin_model import Admin
-from models.student_model import Student, students_from_dicts, students_to_dicts
+from db.enrolment_index import EnrolmentIndex
+from db.grade_aggregates import GradeAggregates
+from db.id_allocator import IdAllocator
+from db.student_repository import StudentRepository
+from db.subject_catalog import SubjectCatalog
+from models.admin_model import Admin, Population
+from models.student_model import Student, iter_students_from_dicts
+from models.student_table import StudentTable
+from models.subject_model import subject_title
+from resources.parameters.app_parameters import ADMIN_CONFIG
+
+
+# ---------- Per-shard workers (module level so they can run in worker processes) ----------
+
+def _population(records: Iterator[dict]) -> Population:
+    """
+    Columnar StudentTable for populations of at least ADMIN_CONFIG["columnar_threshold"]
+    (when NumPy is installed), otherwise Students decoded lazily one at a time.
+    Only up to the threshold is read ahead to decide, so smaller populations
+    still stream in constant memory.
+    """
+    if not StudentTable.available:
+        return iter_students_from_dicts(records)
+    records = iter(records)
+    threshold = ADMIN_CONFIG["columnar_threshold"]
+    head = list(islice(records, threshold))
+    if len(head) >= threshold:
+        head.extend(records)
+        return StudentTable(head)
+    return iter_students_from_dicts(chain(head, records))
+
+
+def _list_shard(records: Iterator[dict]) -> list[dict]:
+    """Summary rows for one shard."""
+    return Admin.list_students(_population(records))
+
+
+def _group_shard(records: Iterator[dict]) -> dict[str, list[Student]]:
+    """Grade buckets for one shard."""
+    return Admin.group_by_grade(_population(records))
+
+
+def _partition_shard(records: Iterator[dict]) -> dict[str, list[Student]]:
+    """PASS/FAIL groups for one shard."""
+    return Admin.partition_pass_fail(_population(records))
+
+
+def _merge_groups(parts: list[dict[str, list[Student]]]) -> dict[str, list[Student]]:
+    """Merge per-shard {key: [students]} results into one dict."""
+    merged: dict[str, list[Student]] = {}
+    for part in parts:
+        for key, students in part.items():
+            merged.setdefault(key, []).extend(students)
+    return merged
 
 
 class AdminController:
-    """Handles admin features like viewing, grouping, and removing students."""
+    """
+    Handles admin features like viewing, grouping, and removing students.
 
-    # ---------- Internal Helpers ----------
+    The grade and PASS/FAIL reports are answered from GradeAggregates, kept
+    up to date by the StudentRepository's events, so they cost O(output);
+    the students in them are the repository's live objects. The student list
+    scans `db` shard by shard into throwaway Students (or a columnar
+    StudentTable). Removals and clears go through the repository.
 
-    def __init__(self, db: Database):
-        """Connect to the database (no admin instance needed)."""
-        self.db = db
+    Every report sees committed state only, so they agree with each other
+    while a student session has buffered writes; admin actions never
+    commit such a session.
+    """
 
-    def _load_students(self) -> list[Student]:
-        """Read all student data from the file."""
-        raw = self.db.read_from_file()
-        return students_from_dicts(raw)
+    # ---------- Internal Helpers ----------
 
-    def _write_students(self, students: list[Student]) -> None:
-        """Write updated student data back to the file."""
-        self.db.write_to_file(students_to_dicts(students))
+    def __init__(self, db: Database, *, adb: AsyncDatabase, ids: IdAllocator, catalog: SubjectCatalog,
+                 enrolments: EnrolmentIndex, students: StudentRepository):
+        """
+        Connect to the database (no admin instance needed), sharing the app's
+        async wrapper, id allocator, catalog, enrolment index and repository.
+        """
+        self.db = db
+        self.adb = adb
+        self.ids = ids
+        self.catalog = catalog
+        self.enrolments = enrolments
+        self.students = students
+        self.grades = GradeAggregates(self.students)
 
     # ---------- Below is the Admin Logic ----------
 
     def list_students(self) -> list[dict]:
         """Return a list of all students with their details."""
-        students = self._load_students()
-        return Admin.list_students(students)
+        return [row for part in self.db.map_shards(_list_shard) for row in part]
 
     def group_by_grade(self) -> dict[str, list[Student]]:
         """Group students by their grade (HD, D, C, P, F)."""
-        students = self._load_students()
-        return Admin.group_by_grade(students)
+        if ADMIN_CONFIG["verify_aggregates"]:
+            self._verify_and_repair()
+        return self._load_groups({grade: ids for grade, ids in self.grades.grade_ids().items() if ids})
 
     def partition_pass_fail(self) -> dict[str, list[Student]]:
         """Split students into pass and fail groups."""
-        students = self._load_students()
-        return Admin.partition_pass_fail(students)
+        if ADMIN_CONFIG["verify_aggregates"]:
+            self._verify_and_repair()
+        return self._load_groups(self.grades.status_ids())
+
+    def _load_groups(self, groups: dict[str, list[str]]) -> dict[str, list[Student]]:
+        """Group → ids turned into group → Students (in the given order, as committed), loaded in one go."""
+        students = self.students.get_many((sid for ids in groups.values() for sid in ids), committed=True)
+        return {group: [students[sid] for sid in ids if sid in students] for group, ids in groups.items()}
+
+    def grade_counts(self) -> dict[str, int]:
+        """Number of students per grade, in GRADE_ORDER (O(1))."""
+        return self.grades.grade_counts()
+
+    def pass_fail_counts(self) -> dict[str, int]:
+        """Number of students who pass and fail (O(1))."""
+        return self.grades.status_counts()
+
+    def verify_aggregates(self) -> dict[str, tuple[list[str], list[str]]]:
+        """
+        Recompute the grade and PASS/FAIL groups from scratch with a full scan
+        (the Admin reports, shard by shard) and diff them against the
+        materialized aggregates. Both sides describe committed state; a
+        session's buffered writes are left alone.
+
+        Returns:
+            Group → (ids missing from the aggregates, ids wrongly in them),
+            for every group that differs; empty if they agree.
+        """
+        expected = _merge_groups(self.db.map_shards(_group_shard))
+        expected.update(_merge_groups(self.db.map_shards(_partition_shard)))
+        actual = {group: set(ids) for group, ids in {**self.grades.grade_ids(), **self.grades.status_ids()}.items()}
+        diff = {}
+        for group, have in actual.items():
+            want = {s.id for s in expected.get(group, ())}
+            if want != have:
+                diff[group] = (sorted(want - have), sorted(have - want))
+        return diff
+
+    def _verify_and_repair(self) -> None:
+        """Verification mode: report differences and rebuild the aggregates if there are any."""
+        diff = self.verify_aggregates()
+        if diff:
+            for group, (missing, extra) in diff.items():
+                print(f"[WARN][Admin] {group} aggregate differs from a full scan: "
+                      f"missing {missing[:10]}, unexpected {extra[:10]}")
+            self.grades.rebuild()
 
     def remove_student_by_id(self, student_id: str) -> bool:
-        """Remove a student by their ID and save the changes."""
-        students = self._load_students()
-        updated, removed = Admin.remove_student_by_id(students, student_id)
-        if removed:
-            self._write_students(updated)
-        return removed
+        """
+        Remove a student by their ID, straight from the store (a student
+        session's buffered writes are not committed). The ID is freed for
+        reuse and the student's subjects are dropped from the catalog counts.
+        """
+        record = self.students.remove(student_id, immediate=True)
+        if record is None:
+            return False
+        self.ids.release(student_id)
+        subject_ids = [sub["id"] for sub in record.get("subjects", ())]
+        for subject_id in subject_ids:
+            self.catalog.drop(subject_id)
+        self.enrolments.remove_student(student_id, subject_ids)
+        return True
 
     def clear_all_students(self) -> bool:
         """Delete all student records from the database."""
-        self._write_students([])
+        self.students.clear()
+        self.ids.rebuild([])
+        self.catalog.rebuild_counts([])
         return True
+
+    # ---------- Subject queries (answered from the enrolment index) ----------
+
+    def subject_roster(self, subject_id: str) -> list[Student]:
+        """Students enrolled in a subject, loaded by id through the repository."""
+        students = (self.students.get(sid) for sid in self.enrolments.roster(subject_id))
+        return [student for student in students if student is not None]
+
+    def subject_stats(self, subject_id: str) -> dict:
+        """Enrolment count, mean mark and grade distribution of a subject."""
+        sid = subject_id.strip()
+        grades = self.enrolments.grade_distribution(sid)
+        return {
+            "id": sid,
+            "title": subject_title(sid),
+            "enrolled": sum(grades.values()),
+            "mean": self.enrolments.mean(sid),
+            "grades": grades,
+        }
+
+    def most_enrolled_subjects(self, limit: int = 10) -> list[dict]:
+        """The subjects with the most students, largest first."""
+        return [
+            {"id": sid, "title": subject_title(sid), "enrolled": count}
+            for sid, count in self.enrolments.most_enrolled(limit)
+        ]
+
+    # ---------- Async variants (scans run on the AsyncDatabase scan pool) ----------
+
+    async def list_students_async(self) -> list[dict]:
+        """Async list_students()."""
+        return await self.adb.run_scan(self.list_students)
+
+    async def group_by_grade_async(self) -> dict[str, list[Student]]:
+        """Async group_by_grade()."""
+        return await self.adb.run_scan(self.group_by_grade)
+
+    async def partition_pass_fail_async(self) -> dict[str, list[Student]]:
+        """Async partition_pass_fail()."""
+        return await self.adb.run_scan(self.partition_pass_fail)
+
+    async def verify_aggregates_async(self) -> dict[str, tuple[list[str], list[str]]]:
+        """Async verify_aggregates()."""
+        return await self.adb.run_scan(self.verify_aggregates)
+
+    async def remove_student_by_id_async(self, student_id: str) -> bool:
+        """Async remove_student_by_id()."""
+        return await self.adb.run(self.remove_student_by_id, student_id)
+
+    async def clear_all_students_async(self) -> bool:
+        """Async clear_all_students()."""
+        return await self.adb.run(self.clear_all_students)
+
+    async def subject_roster_async(self, subject_id: str) -> list[Student]:
+        """Async subject_roster() (may rebuild the enrolment index, so it runs on the scan pool)."""
+        return await self.adb.run_scan(self.subject_roster, subject_id)
+
+    async def subject_stats_async(self, subject_id: str) -> dict:
+        """Async subject_stats()."""
+        return await self.adb.run_scan(self.subject_stats, subject_id)
+
+    async def most_enrolled_subjects_async(self, limit: int = 10) -> list[dict]:
+        """Async most_enrolled_subjects()."""
+        return await self.adb.run_scan(self.most_enrolled_subjects, limit)
@@ -1,53 +1,61 @@
 from __future__ import annotations
-from typing import Optional, List
+from typing import Optional
+from db.async_database import AsyncDatabase
 from db.database import Database
-from models.student_model import Student, students_from_dicts, students_to_dicts
+from db.id_allocator import IdAllocator
+from db.student_repository import StudentRepository
+from db.unit_of_work import UnitOfWork
+from models.student_model import Student
 from models.user_model import User
 
 
 class StudentController:
-    """Owns student identity/session and profile updates (no subject ops here)."""
+    """
+    Owns student identity/session and profile updates (no subject ops here).
 
-    def __init__(self, db: Database):
+    Students are loaded and saved through a StudentRepository (shared with the
+    other controllers by the apps), which keeps one live Student per id and
+    an email index that makes login, find_by_email and the duplicate check in
+    register O(1).
+
+    `db` may be a UnitOfWork shared with the SubjectController. Its writes go
+    straight to the store unless session_autocommit is off, in which case they
+    are buffered until logout() or commit().
+    """
+
+    def __init__(self, db: Database, *, adb: AsyncDatabase, ids: IdAllocator, students: StudentRepository):
+        """
+        Use the app's shared async wrapper, id allocator and student
+        repository; each is built once by the app entry points.
+        """
         self.db = db
+        self.adb = adb
+        self.ids = ids
+        self.students = students
         self.current_student: Optional[Student] = None
 
     # ---------- Internal Helpers ----------
 
-    def _load_students(self) -> List[Student]:
-        """Read all students from the DB file."""
-        raw = self.db.read_from_file()
-        return students_from_dicts(raw)
-
-    def _write_students(self, students: List[Student]) -> None:
-        """Overwrite the DB with exactly these students."""
-        self.db.write_to_file(students_to_dicts(students))
-
-    def _save_current_profile(self) -> None:
+    def _save_current_profile(self) -> bool:
         """
         Persist non-subject changes to the current student (e.g., password).
         Subject mutations should be persisted by SubjectController.
+
+        Returns:
+            False if the store rejected the write (the change is discarded).
         """
         if not self.current_student:
-            return
-
-        students = self._load_students()
-        students = [s for s in students if s.id != self.current_student.id]
-        students.append(self.current_student)
+            return False
 
-        self._write_students(students)
+        return self.students.save(self.current_student)
 
     def find_by_email(self, email: str) -> Optional[Student]:
         """Find a student by email (case-insensitive)."""
-        e = email.strip().lower()
-        for s in self._load_students():
-            if s.email.strip().lower() == e:
-                return s
-        return None
+        return self.students.find_by_email(email)
 
     def email_exists(self, email: str) -> bool:
-        """Check if an email is already registered."""
-        return self.find_by_email(email) is not None
+        """Check if an email is already registered (without decoding the student)."""
+        return self.students.email_exists(email)
     
     # ---------- Below is the Student Logic ----------
 
@@ -56,26 +64,33 @@ class StudentController:
         if not (User.validate_email(email) and User.validate_password(password)):
             return False, "bad_format"
 
-        email_norm = email.strip().lower()
-        for s in self._load_students():
-            if s.email.strip().lower() == email_norm:
-                if s.verify_password(password):
-                    self.current_student = s
-                    return True, "student"
-                return False, "bad_password"
-        return False, "no_such_user"
+        s = self.find_by_email(email)
+        if s is None:
+            return False, "no_such_user"
+        if s.verify_password(password):
+            self.current_student = s
+            return True, "student"
+        return False, "bad_password"
 
     def register(self, name: str, email: str, password: str) -> tuple[bool, str]:
         """Create a new student record if the email isn’t taken."""
-        students = self._load_students()
-
-        email_norm = email.strip().lower()
-        if any(s.email.strip().lower() == email_norm for s in students):
+        if self.email_exists(email):
             return False, f"Student {name.strip()} already exists"
 
-        new_student = Student.create(name, email, password)
-        students.append(new_student)
-        self._write_students(students)
+        student_id = self.ids.allocate()
+        while self.students.exists(student_id):  # Stored before the bitmap existed
+            self.ids.mark_used([student_id])
+            student_id = self.ids.allocate()
+        try:
+            new_student = Student.create(name, email, password, student_id=student_id)
+        except ValueError:
+            self.ids.release(student_id)
+            raise
+        if not self.students.add(new_student):
+            self.ids.release(student_id)
+            return False, f"Student {new_student.name} could not be registered"
+        if isinstance(self.db, UnitOfWork):
+            self.db.on_rollback(lambda: self.ids.release(student_id))
         return True, f"Enrolling Student {new_student.name}"
 
     def change_password(self, new_password: str, confirm: str) -> tuple[bool, str]:
@@ -86,7 +101,51 @@ class StudentController:
             return False, "Password does not match - try again"
         try:
             self.current_student.change_password(new_password.strip())
-            self._save_current_profile()
+            if not self._save_current_profile():
+                return False, "Your password could not be saved"
             return True, "Password updated"
         except Exception as e:
             return False, str(e)
+
+    # ---------- Session ----------
+
+    def commit(self) -> bool:
+        """Write the session's buffered changes (no-op without a UnitOfWork)."""
+        return self.students.commit()
+
+    def rollback(self) -> None:
+        """
+        Discard the session's buffered changes. The current student is
+        reloaded in place, so every controller holding it sees the stored state.
+        """
+        self.students.rollback()
+        if self.current_student and self.students.get(self.current_student.id) is not self.current_student:
+            self.current_student = None  # Registered in the rolled-back session
+
+    def logout(self) -> tuple[bool, str]:
+        """Commit the session's changes and end it. Returns (ok, message)."""
+        ok = self.commit()
+        self.current_student = None
+        return ok, "Logged out" if ok else "Your changes could not be saved"
+
+    # ---------- Async variants (blocking work runs on the AsyncDatabase I/O pool) ----------
+
+    async def find_by_email_async(self, email: str) -> Optional[Student]:
+        """Async find_by_email()."""
+        return await self.adb.run(self.find_by_email, email)
+
+    async def login_async(self, email: str, password: str) -> tuple[bool, Optional[str]]:
+        """Async login()."""
+        return await self.adb.run(self.login, email, password)
+
+    async def register_async(self, name: str, email: str, password: str) -> tuple[bool, str]:
+        """Async register()."""
+        return await self.adb.run(self.register, name, email, password)
+
+    async def change_password_async(self, new_password: str, confirm: str) -> tuple[bool, str]:
+        """Async change_password()."""
+        return await self.adb.run(self.change_password, new_password, confirm)
+
+    async def logout_async(self) -> tuple[bool, str]:
+        """Async logout()."""
+        return await self.adb.run(self.logout)
@@ -1,16 +1,35 @@
 from __future__ import annotations
-import random
 from typing import List, Optional, Tuple
+from db.async_database import AsyncDatabase
 from db.database import Database
+from db.enrolment_index import EnrolmentIndex
+from db.student_repository import StudentRepository
+from db.subject_catalog import SubjectCatalog
+from db.unit_of_work import UnitOfWork
 from models.student_model import Student
 from models.subject_model import Subject, MAX_SUBJECTS
 
 
 class SubjectController:
-    """Owns all subject-related actions for the currently logged-in student."""
+    """
+    Owns all subject-related actions for the currently logged-in student.
 
-    def __init__(self, db: Database, current_student: Optional[Student] = None):
+    With a UnitOfWork as `db`, catalog places and enrolment index entries
+    change immediately while the student's record is buffered; each change
+    registers its inverse so a rollback gives places back.
+    """
+
+    def __init__(self, db: Database, current_student: Optional[Student] = None, *, adb: AsyncDatabase,
+                 catalog: SubjectCatalog, enrolments: EnrolmentIndex, students: StudentRepository):
+        """
+        Use the app's shared async wrapper, subject catalog, enrolment index
+        and student repository; each is built once by the app entry points.
+        """
         self.db = db
+        self.adb = adb
+        self.catalog = catalog
+        self.enrolments = enrolments
+        self.students = students
         self.current_student: Optional[Student] = current_student
 
     def set_current_student(self, student: Student) -> None:
@@ -25,43 +44,67 @@ class SubjectController:
 
     def enrol_auto(self) -> Tuple[bool, str, Optional[Subject]]:
         """
-        Enrol in a random subject like 'Subject-541'.
+        Enrol in a random available subject from the catalog, like 'Subject-541'.
         Returns (ok, message, subject|None).
+
+        Holds the student's repository lock, so concurrent calls (e.g. two
+        quick clicks running on the I/O pool) cannot both pass the
+        MAX_SUBJECTS check.
         """
         if not self.current_student:
             return False, "Not logged in", None
 
         student = self.current_student
-
-        if len(student.subjects) >= MAX_SUBJECTS:
-            return False, "students are allowed to enrol in 4 subjects only", None
-
-        title = f"Subject-{random.randint(1, 999)}"
-        try:
-            sub = student.enrol_subject(title)
-            self._persist_current_student()
-            enrolled = len(student.subjects)
-            return True, f"You are now enrolled in {enrolled} out of {MAX_SUBJECTS} subjects", sub
-        except ValueError as e:
-            return False, str(e), None
-        except Exception as e:
-            return False, str(e), None
-
-    def _persist_current_student(self) -> None:
+        with self.students.lock(student.id):
+            if len(student.subjects) >= MAX_SUBJECTS:
+                return False, "students are allowed to enrol in 4 subjects only", None
+
+            subject_id = self.catalog.claim(exclude=[s.id for s in student.subjects])
+            if subject_id is None:
+                return False, "No subjects are available", None
+            try:
+                sub = student.enrol_subject(subject_id)
+                if not self._persist_current_student():
+                    self.catalog.drop(subject_id)
+                    return False, "Your enrolment could not be saved", None
+                self.enrolments.add(sub.id, student.id, sub.mark)
+                self._on_rollback(lambda: self._unenrol(sub.id, student.id))
+                enrolled = len(student.subjects)
+                return True, f"You are now enrolled in {enrolled} out of {MAX_SUBJECTS} subjects", sub
+            except ValueError as e:
+                self.catalog.drop(subject_id)
+                return False, str(e), None
+            except Exception as e:
+                self.catalog.drop(subject_id)
+                return False, str(e), None
+
+    def _persist_current_student(self) -> bool:
         """
-        Save the current student's latest state to the database.
-        Replaces any existing record with the same id.
+        Save the current student's changed fields through the repository.
+        Nothing is written if nothing changed; a student missing from the
+        store is written whole.
+
+        Returns:
+            False if the store rejected the write (the change is discarded).
         """
         if not self.current_student:
-            return
+            return False
+        return self.students.save(self.current_student)
 
-        raw = self.db.read_from_file()
+    def _on_rollback(self, undo) -> None:
+        """Register a compensation with the session, if there is one."""
+        if isinstance(self.db, UnitOfWork):
+            self.db.on_rollback(undo)
 
-        student_id = self.current_student.id
-        out = [d for d in raw if str(d.get("id", "")).strip() != student_id]
-        out.append(self.current_student.to_dict())
+    def _unenrol(self, subject_id: str, student_id: str) -> None:
+        """Give back a place claimed in a rolled-back session."""
+        self.catalog.drop(subject_id)
+        self.enrolments.discard(subject_id, student_id)
 
-        self.db.write_to_file(out)
+    def _reenrol(self, subject_id: str, student_id: str, mark: Optional[int]) -> None:
+        """Retake a place dropped in a rolled-back session (unless it has been filled since)."""
+        if self.catalog.enrol(subject_id):
+            self.enrolments.add(subject_id, student_id, mark)
 
 
     # ---------- Below is the Subject Logic ----------
@@ -78,10 +121,17 @@ class SubjectController:
             return False, "Not logged in"
 
         student = self.current_student
-        removed = student.remove_subject(subject_id.strip())
-        if removed:
-            self._persist_current_student()
-            return True, f"You are now enrolled in {len(student.subjects)} out of {MAX_SUBJECTS} subjects"
+        sid = subject_id.strip()
+        with self.students.lock(student.id):
+            mark = next((s.mark for s in student.subjects if s.id == sid), None)
+            removed = student.remove_subject(sid)
+            if removed:
+                if not self._persist_current_student():
+                    return False, "Your changes could not be saved"
+                self.catalog.drop(sid)
+                self.enrolments.discard(sid, student.id)
+                self._on_rollback(lambda: self._reenrol(sid, student.id, mark))
+                return True, f"You are now enrolled in {len(student.subjects)} out of {MAX_SUBJECTS} subjects"
         return False, "Subject not found."
 
     def average(self) -> Optional[float]:
@@ -93,3 +143,13 @@ class SubjectController:
             return None
         return self.current_student.average_mark()
 
+    # ---------- Async variants (blocking work runs on the AsyncDatabase I/O pool) ----------
+
+    async def enrol_auto_async(self) -> Tuple[bool, str, Optional[Subject]]:
+        """Async enrol_auto()."""
+        return await self.adb.run(self.enrol_auto)
+
+    async def remove_by_id_async(self, subject_id: str) -> Tuple[bool, str]:
+        """Async remove_by_id()."""
+        return await self.adb.run(self.remove_by_id, subject_id)
+
@@ -0,0 +1,33 @@
+import pytest
+from controller import admin_controller
+from controller.admin_controller import _population
+from models.student_table import StudentTable
+from resources.parameters.app_parameters import ADMIN_CONFIG
+
+
+def _records(n: int, consumed: list):
+    for i in range(1, n + 1):
+        consumed.append(i)
+        yield {"id": f"{i:06d}", "name": "Student", "email": f"s{i}@university.com", "password": "Password123",
+               "subjects": [{"id": "001", "title": "Subject-001", "mark": 40 + i % 60, "grade": "P"}]}
+
+
+def test_small_population_streams_without_reading_ahead(monkeypatch):
+    monkeypatch.setattr(admin_controller.StudentTable, "available", True)
+    monkeypatch.setitem(ADMIN_CONFIG, "columnar_threshold", 10)
+    consumed = []
+
+    population = _population(_records(5, consumed))
+    assert not isinstance(population, StudentTable)
+    assert len(consumed) <= 10
+    assert [s.id for s in population] == [f"{i:06d}" for i in range(1, 6)]
+
+
+def test_large_population_builds_a_table(monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.setitem(ADMIN_CONFIG, "columnar_threshold", 10)
+    consumed = []
+
+    population = _population(_records(25, consumed))
+    assert isinstance(population, StudentTable)
+    assert population.ids == [f"{i:06d}" for i in range(1, 26)]
@@ -0,0 +1,51 @@
+from controller.student_controller import StudentController
+from controller.subject_controller import SubjectController
+from db.async_database import AsyncDatabase
+from db.database import Database
+from db.enrolment_index import EnrolmentIndex
+from db.id_allocator import IdAllocator
+from db.student_repository import StudentRepository
+from db.subject_catalog import SubjectCatalog
+
+
+def _record_writes(db: Database, writes: list) -> None:
+    for name in ("upsert", "patch"):
+        def spy(*args, name=name, original=getattr(db, name)):
+            writes.append((name, args))
+            return original(*args)
+        setattr(db, name, spy)
+
+
+def _controllers(tmp_path, writes: list):
+    db = Database(path=str(tmp_path / "students.data"), log_structured=False, verbose=False)
+    _record_writes(db, writes)
+    adb, catalog, students = AsyncDatabase(db), SubjectCatalog.for_database(db), StudentRepository(db)
+    student = StudentController(db, adb=adb, ids=IdAllocator.for_database(db), students=students)
+    subjects = SubjectController(db, adb=adb, catalog=catalog, enrolments=EnrolmentIndex(db, catalog),
+                                 students=students)
+    return db, student, subjects
+
+
+def test_changes_are_saved_as_deltas_and_unchanged_students_not_at_all(tmp_path):
+    writes = []
+    db, student, subjects = _controllers(tmp_path, writes)
+    assert student.register("Sam Lee", "sam.lee@university.com", "Password123")[0]
+    assert [name for name, _ in writes] == ["upsert"]  # A new student is written whole
+
+    writes.clear()
+    student.login("sam.lee@university.com", "Password123")
+    subjects.set_current_student(student.current_student)
+    ok, _, sub = subjects.enrol_auto()
+    assert ok
+    assert [(name, args[0]) for name, args in writes] == [("patch", student.current_student.id)]
+    assert set(writes[0][1][1]) == {"subjects", "mark_sum", "mark_count", "overall_grade"}
+
+    writes.clear()
+    assert student.change_password("Newpassword456", "Newpassword456")[0]
+    assert [args[1] for _, args in writes] == [{"password": "Newpassword456"}]
+
+    writes.clear()
+    assert not subjects.remove_by_id("999")[0]
+    student._save_current_profile()
+    assert writes == []
+    assert db.get(student.current_student.id)["subjects"][0]["id"] == sub.id
@@ -0,0 +1,117 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import AsyncIterator, Callable, Iterator, List, Optional, TypeVar
+from db.database import Database, T
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+R = TypeVar("R")
+
+
+def _take(records: Iterator[dict], count: int) -> List[dict]:
+    """Pull up to `count` records from a blocking iterator."""
+    return list(islice(records, count))
+
+
+class AsyncDatabase:
+    """
+    Asyncio front end for any Database backend.
+
+    Every call runs the blocking backend method on a bounded thread pool, so
+    the event loop (and any UI driven by it) never waits on file I/O.
+    Whole-population scans (read_from_file, iterate, map_shards) use a
+    separate, smaller pool, so a long admin scan cannot hold up the point
+    reads and writes behind logins and enrolments.
+    """
+
+    def __init__(self, db: Database, workers: Optional[int] = None, scan_workers: Optional[int] = None):
+        """
+        Wrap a database and start its executors.
+        """
+        self.db = db
+        self._io = ThreadPoolExecutor(
+            max_workers=workers or DATABASE_CONFIG["async_workers"], thread_name_prefix="db-io")
+        self._scans = ThreadPoolExecutor(
+            max_workers=scan_workers or DATABASE_CONFIG["async_scan_workers"], thread_name_prefix="db-scan")
+
+    # ---------- Executors ----------
+
+    async def run(self, func: Callable[..., R], *args) -> R:
+        """
+        Run a blocking call on the I/O pool and await its result.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._io, functools.partial(func, *args))
+
+    async def run_scan(self, func: Callable[..., R], *args) -> R:
+        """
+        Run a blocking whole-population scan on the scan pool and await its result.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._scans, functools.partial(func, *args))
+
+    # ---------- Database interface ----------
+
+    async def read_from_file(self) -> List:
+        """Load every record (scan pool)."""
+        return await self.run_scan(self.db.read_from_file)
+
+    async def write_to_file(self, data_list: List) -> None:
+        """Replace every stored record."""
+        await self.run(self.db.write_to_file, data_list)
+
+    async def get(self, student_id: str) -> Optional[dict]:
+        """Read a single student by id."""
+        return await self.run(self.db.get, student_id)
+
+    async def find_by_email(self, email: str) -> Optional[dict]:
+        """Look up a student by email (case-insensitive)."""
+        return await self.run(self.db.find_by_email, email)
+
+    async def upsert(self, record: dict) -> bool:
+        """Insert or replace a student; True if it was written."""
+        return await self.run(self.db.upsert, record)
+
+    async def patch(self, student_id: str, changes: dict) -> bool:
+        """Update only the given fields of a student."""
+        return await self.run(self.db.patch, student_id, changes)
+
+    async def upsert_many(self, records: List[dict]) -> bool:
+        """Insert or replace many students in one commit; True if it was written."""
+        return await self.run(self.db.upsert_many, records)
+
+    async def commit_batch(self, entries: List[tuple]) -> bool:
+        """Apply a batch of upsert / patch / delete entries as one write."""
+        return await self.run(self.db.commit_batch, entries)
+
+    async def delete(self, student_id: str) -> bool:
+        """Delete a student; True if it existed."""
+        return await self.run(self.db.delete, student_id)
+
+    async def iterate(self, batch_size: Optional[int] = None) -> AsyncIterator[dict]:
+        """
+        Yield every stored record, decoding them on the scan pool in batches.
+        """
+        batch_size = batch_size or DATABASE_CONFIG["async_batch_size"]
+        records = self.db.iterate()
+        while True:
+            batch = await self.run_scan(_take, records, batch_size)
+            if not batch:
+                return
+            for record in batch:
+                yield record
+
+    async def map_shards(self, func: Callable[[Iterator[dict]], T]) -> List[T]:
+        """Apply `func` to every storage shard (scan pool)."""
+        return await self.run_scan(self.db.map_shards, func)
+
+    async def clear_all(self) -> None:
+        """Delete every record."""
+        await self.run(self.db.clear_all)
+
+    def close(self) -> None:
+        """
+        Wait for queued calls to finish and stop both executors.
+        The wrapped database is left open.
+        """
+        self._io.shutdown(wait=True)
+        self._scans.shutdown(wait=True)
@@ -0,0 +1,28 @@
+from typing import Optional
+from db.database import Database
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+
+def open_database(backend: Optional[str] = None) -> Database:
+    """
+    Open the storage backend selected by DATABASE_CONFIG["backend"].
+
+    Supported backends:
+      - "pickle": the pickle `students.data` file (optionally log-structured)
+      - "sharded": pickle files split into shards by a hash of the student id
+      - "sqlite": SQLite file with indexed id and email lookups
+      - "record": fixed-width binary record file accessed through mmap
+    """
+    backend = backend or DATABASE_CONFIG["backend"]
+    if backend == "pickle":
+        return Database()
+    if backend == "sharded":
+        from db.sharded_database import ShardedDatabase
+        return ShardedDatabase()
+    if backend == "sqlite":
+        from db.sqlite_database import SQLiteDatabase  # Imported here so sqlite3 is only loaded when used.
+        return SQLiteDatabase()
+    if backend == "record":
+        from db.record_file import RecordFileDatabase
+        return RecordFileDatabase()
+    raise ValueError(f"Unknown database backend: {backend}")
@@ -0,0 +1,128 @@
+import bz2
+import lzma
+import zlib
+from typing import BinaryIO
+
+# Compression codecs supported for students.data, detected on read by their magic bytes
+CODECS = ("none", "zlib", "lzma", "bz2")
+
+XZ_MAGIC = b"\xfd7zXZ\x00"
+BZ2_MAGIC = b"BZh"
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ZlibWriter:
+    """
+    Minimal write-only file object that zlib-compresses into another file.
+    Closing it flushes the compressor but leaves the underlying file open.
+    """
+
+    def __init__(self, raw: BinaryIO, level: int = 6):
+        self._raw = raw
+        self._compressor = zlib.compressobj(level)
+
+    def write(self, data: bytes) -> int:
+        self._raw.write(self._compressor.compress(data))
+        return len(data)
+
+    def close(self) -> None:
+        self._raw.write(self._compressor.flush())
+
+
+class ZlibReader:
+    """
+    Minimal read-only file object that inflates a zlib stream incrementally,
+    so records can be streamed without decompressing the whole file first.
+    """
+
+    def __init__(self, raw: BinaryIO):
+        self._raw = raw
+        self._decompressor = zlib.decompressobj()
+        self._buffer = b""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: int) -> None:
+        """Inflate more input until `size` unread bytes are buffered (or EOF)."""
+        while not self._eof and (size < 0 or len(self._buffer) - self._pos < size):
+            chunk = self._raw.read(CHUNK_SIZE)
+            tail = self._buffer[self._pos:]
+            self._pos = 0
+            if not chunk:
+                self._buffer = tail + self._decompressor.flush()
+                self._eof = True
+                break
+            self._buffer = tail + self._decompressor.decompress(chunk)
+
+    def read(self, size: int = -1) -> bytes:
+        self._fill(size)
+        end = len(self._buffer) if size < 0 else min(self._pos + size, len(self._buffer))
+        data = self._buffer[self._pos:end]
+        self._pos = end
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def readline(self, size: int = -1) -> bytes:
+        while self._buffer.find(b"\n", self._pos) < 0 and not self._eof:
+            self._fill(len(self._buffer) - self._pos + CHUNK_SIZE)
+        newline = self._buffer.find(b"\n", self._pos)
+        end = len(self._buffer) if newline < 0 else newline + 1
+        if size >= 0:
+            end = min(end, self._pos + size)
+        data = self._buffer[self._pos:end]
+        self._pos = end
+        return data
+
+    def close(self) -> None:
+        pass
+
+
+def detect_codec(head: bytes) -> str:
+    """
+    Identify the codec of a file from its first few bytes.
+    Uncompressed snapshots start with a pickle opcode or the stream magic.
+    """
+    if head.startswith(XZ_MAGIC):
+        return "lzma"
+    if head.startswith(BZ2_MAGIC):
+        return "bz2"
+    if len(head) >= 2 and head[0] == 0x78 and (head[0] * 256 + head[1]) % 31 == 0:
+        return "zlib"
+    return "none"
+
+
+def open_writer(raw: BinaryIO, codec: str):
+    """
+    Wrap a binary file opened for writing with the given codec.
+    The caller must close() the wrapper (but not rely on it closing `raw`).
+    """
+    if codec == "none":
+        return raw
+    if codec == "zlib":
+        return ZlibWriter(raw)
+    if codec == "lzma":
+        return lzma.LZMAFile(raw, "wb", preset=6)
+    if codec == "bz2":
+        return bz2.BZ2File(raw, "wb", compresslevel=9)
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+def open_reader(raw: BinaryIO):
+    """
+    Wrap a binary file opened for reading, auto-detecting its codec.
+    """
+    head = raw.read(len(XZ_MAGIC))
+    raw.seek(0)
+    codec = detect_codec(head)
+    if codec == "none":
+        return raw
+    if codec == "zlib":
+        return ZlibReader(raw)
+    if codec == "lzma":
+        return lzma.LZMAFile(raw, "rb")
+    return bz2.BZ2File(raw, "rb")
@@ -1,56 +1,996 @@
+import copy
 import os
 import pickle
-from typing import List
+import stat
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, TypeVar
+from db.codecs import open_reader, open_writer
+from db.mvcc import Snapshot, VersionStore
+from db.index import SecondaryIndex, Location, normalize_email, IDX_PUT, IDX_DEL, IDX_CLEAR
+from db.wal import WriteAheadLog, encode_frame, iter_frames, OP_UPSERT, OP_DELETE, OP_CLEAR, OP_PATCH, OP_BATCH
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+if TYPE_CHECKING:
+    from models.student_model import Student
+
+T = TypeVar("T")
+
+# First bytes of a snapshot written in the framed record stream format
+STREAM_MAGIC = b"STUSTRM1"
+
+
+class _CommitRequest:
+    """
+    One pending snapshot mutation waiting for a group commit.
+
+    `mutate` takes the current record list and returns (new_list, result),
+    where new_list is None if nothing changed. `reindex` asks for the
+    secondary index to be rebuilt rather than updated (a full replacement).
+    """
+
+    def __init__(self, mutate: Callable[[List], tuple], reindex: bool = False):
+        self.mutate = mutate
+        self.reindex = reindex
+        self.result = None
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
 
 class Database:
     """
     Database class for storing and loading student data.
+
+    Two storage modes are supported:
+      - snapshot (default): every write re-pickles the whole list into `students.data`.
+      - log-structured: `students.data` is a snapshot and every mutation is appended
+        to `students.data.log` as a small framed record. A background compactor folds
+        the log into a new snapshot once it passes a size or ratio threshold.
     """
 
-    def __init__(self):
+    def __init__(self, path: Optional[str] = None, log_structured: Optional[bool] = None, verbose: bool = True):
         """
         Initializes the database
         Creates the "students.data" file if it doesn't already exist.
         """
-        os.makedirs("db", exist_ok=True)  
-        self.path = os.path.join("db", "students.data")
-        print(f"[DB] Using {self.path}")  
+        if path is None:
+            os.makedirs(DATABASE_CONFIG["directory"], exist_ok=True)
+            path = os.path.join(DATABASE_CONFIG["directory"], DATABASE_CONFIG["filename"])
+        self.path = path
+        self.verbose = verbose
+        if verbose:
+            print(f"[DB] Using {self.path}")
         self._ensure_file()
 
+        if log_structured is None:
+            log_structured = DATABASE_CONFIG["log_structured"]
+        self.log_structured = log_structured
+
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self._records: Dict[str, dict] = {}
+        self._log_offset = 0
+        self._snapshot_sig: Optional[tuple] = None
+
+        # Read cache: decoded snapshot plus the stat signature it was loaded from
+        self.read_cache = DATABASE_CONFIG["read_cache"]
+        self._cache: Optional[List] = None
+        self._cache_sig: Optional[tuple] = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # Group commit: concurrent snapshot writes are coalesced into one durable write
+        self._commit_cond = threading.Condition()
+        self._commit_queue: List[_CommitRequest] = []
+        self._commit_leader = False
+
+        # MVCC: immutable generations handed out to readers by snapshot()
+        self.versions = VersionStore()
+
+        self.wal: Optional[WriteAheadLog] = None
+        if self.log_structured:
+            self.wal = WriteAheadLog(self.path + ".log", fsync=DATABASE_CONFIG["log_fsync"])
+            self._load_state()
+
+        # Persistent email/id indexes, verified against the data-file generation on open
+        self.index: Optional[SecondaryIndex] = None
+        self.index_valid = False
+        if DATABASE_CONFIG["secondary_indexes"]:
+            self.index = SecondaryIndex(self.path)
+            self.index_valid = self.index.load(self._generation())
+            if not self.index_valid:
+                if DATABASE_CONFIG["index_autorebuild"]:
+                    self.rebuild_index()
+                elif verbose:
+                    print(f"[WARN][DB] Index for {self.path} is missing or stale; run `python -m db.index rebuild`")
+
     def _ensure_file(self):
         """
         Ensures the existence of the student data file.
         This file stores the serialized list of student data.
         """
         if not os.path.exists(self.path):
-            print(f"[DEBUG][DB] Creating new data file at {self.path}")
+            if self.verbose:
+                print(f"[DEBUG][DB] Creating new data file at {self.path}")
             with open(self.path, "wb") as f:
-                pickle.dump([], f)
+                self._dump_snapshot(f, [])
 
-    def read_from_file(self) -> List:
+    # ---------- Snapshot file formats ----------
+
+    @staticmethod
+    def _dump_snapshot(f, data_list: List) -> List[Location]:
         """
-        Reads data from the file (`students.data`).
+        Serialize records in the configured snapshot format:
+          - "pickle": one pickled list (the original format)
+          - "stream": STREAM_MAGIC followed by one checksummed frame per record
+        compressed with the configured codec ("none", "zlib", "lzma" or "bz2").
+
+        Returns:
+            The location of each record: (list position, byte offset of its frame).
+            Offsets are only known for uncompressed stream files, otherwise None.
+        """
+        out = open_writer(f, DATABASE_CONFIG["compression"])
+        seekable = out is f
+        locations: List[Location] = []
+        if DATABASE_CONFIG["snapshot_format"] == "stream":
+            out.write(STREAM_MAGIC)
+            for i, record in enumerate(data_list):
+                locations.append((i, f.tell() if seekable else None))
+                out.write(encode_frame(record))
+        else:
+            pickle.dump(data_list, out)
+            locations = [(i, None) for i in range(len(data_list))]
+        if not seekable:
+            out.close()
+        return locations
+
+    def _stream_snapshot(self, f) -> Iterator[dict]:
+        """
+        Yield records from an open snapshot file one at a time.
+
+        The compression codec and format are detected from the file itself.
+        Stream-format files are decoded frame by frame in constant memory; a
+        pickled list has to be loaded whole. Raises if a stream is cut short.
         """
+        src = open_reader(f)
+        head = src.read(len(STREAM_MAGIC))
+        if head != STREAM_MAGIC:
+            f.seek(0)  # Not a record stream: rewind and unpickle the whole list
+            yield from pickle.load(open_reader(f))
+            return
         try:
-            with open(self.path, "rb") as f:
-                data = pickle.load(f)
-                return data
+            yield from iter_frames(src, strict=True)
+        except ValueError:
+            raise ValueError(f"{self.path} is truncated or corrupt")
+
+    @staticmethod
+    def _stat_signature(path: str) -> Optional[tuple]:
+        """
+        (inode, size, mtime) of a file, used to tell whether it changed on disk.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _read_snapshot(self, strict: bool = False) -> List:
+        """
+        Unpickle the snapshot file (`students.data`).
+
+        With the read cache enabled the decoded list is kept in memory and reused
+        until the file's stat signature changes. The returned list is shared with
+        the cache, so callers must copy it before modifying it.
+
+        A file that cannot be read yields an empty list, or raises when `strict`
+        is set (writers must never overwrite records they failed to read).
+        """
+        with self._lock:
+            sig = self._stat_signature(self.path)
+            if self.read_cache and self._cache is not None and sig == self._cache_sig:
+                self.cache_hits += 1
+                return self._cache
+            self.cache_misses += 1
+            try:
+                with open(self.path, "rb") as f:
+                    data = list(self._stream_snapshot(f))
+            except Exception as e:
+                if strict:
+                    raise
+                print(f"[ERROR][DB] Failed reading {self.path}: {e}")
+                return []
+            if self.read_cache:
+                self._cache, self._cache_sig = data, sig
+            return data
+
+    def _invalidate_cache(self) -> None:
+        """Drop the cached snapshot after our own writes."""
+        self._cache = None
+        self._cache_sig = None
+
+    def cache_stats(self) -> dict:
+        """
+        Hit/miss counters of the read cache.
+        """
+        return {"hits": self.cache_hits, "misses": self.cache_misses}
+
+    def change_token(self):
+        """
+        Cheap token that changes whenever any process writes to the store,
+        or None if the backend cannot tell. Lets callers keep derived
+        in-memory state (e.g. the controllers' email index) until it changes.
+        """
+        return self._generation()
+
+    def _write_snapshot(self, data_list: List, reindex: bool = False) -> None:
+        """
+        Atomically replace the snapshot file with the given list.
+
+        The data goes to a temp file in the same directory, which is fsynced and
+        renamed over `students.data`, so a crash leaves either the old or the new
+        file intact, never a truncated one. The written list becomes the cached
+        snapshot, so callers hand over ownership of it.
+
+        The secondary index is updated with just the records whose location or
+        email changed; it is rebuilt with `reindex`, or if it did not describe
+        the file being replaced.
+        """
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".", suffix=".tmp", dir=directory)
+        try:
+            self._copy_mode(fd, self.path)
+            with os.fdopen(fd, "wb") as f:
+                locations = self._dump_snapshot(f, data_list)
+                f.flush()
+                os.fsync(f.fileno())
+            with self._lock:
+                replaced = self._generation()
+                os.replace(tmp, self.path)
+                self._fsync_directory(directory)
+                if self.read_cache and not self.log_structured:
+                    self._cache, self._cache_sig = data_list, self._stat_signature(self.path)
+                else:
+                    self._invalidate_cache()
+                if not self.log_structured:
+                    # Publish the new generation copy-on-write; pinned readers keep the old one
+                    self.versions.install(data_list, self._generation())
+                if self.index is not None and not self.log_structured:
+                    if reindex or not self.index_valid or self.index.generation != replaced:
+                        self.index.rebuild(zip(data_list, locations), self._generation())
+                    else:
+                        self.index.apply(self._relocations(data_list, locations), self._generation())
+                    self.index_valid = True
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _relocations(self, data_list: List, locations: List[Location]) -> List[tuple]:
+        """
+        Index journal entries turning the current index into one of the
+        rewritten snapshot: puts for records that are new, moved or changed
+        email, deletes for records that are gone.
+        """
+        indexed = self.index.ids
+        changes: List[tuple] = []
+        seen = set()
+        for record, location in zip(data_list, locations):
+            rid = self._record_id(record)
+            email = normalize_email(record.get("email", ""))
+            seen.add(rid)
+            if indexed.get(rid) != (location, email):
+                changes.append((IDX_PUT, rid, email, location))
+        changes.extend((IDX_DEL, rid) for rid in indexed if rid not in seen)
+        return changes
+
+    @staticmethod
+    def _copy_mode(fd: int, path: str) -> None:
+        """
+        Give a temp file (created 0600 by mkstemp) the permissions of the file
+        it will replace, or those a newly created file would get.
+        """
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        if hasattr(os, "fchmod"):  # Not on Windows, where mkstemp's mode does not apply anyway
+            os.fchmod(fd, mode)
+
+    @staticmethod
+    def _fsync_directory(directory: str) -> None:
+        """Make a rename durable by syncing its directory (not supported on Windows)."""
+        if os.name == "nt":
+            return
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    # ---------- Group commit ----------
+
+    def _commit(self, mutate: Callable[[List], tuple], reindex: bool = False):
+        """
+        Queue a snapshot mutation and return its result once it is durable.
+
+        The first writer to arrive becomes the leader: it waits up to
+        `group_commit_window_ms` for more writers, applies every queued mutation
+        in arrival order to one copy of the records, writes the snapshot once,
+        and then acknowledges all of them. Other writers just wait.
+        """
+        request = _CommitRequest(mutate, reindex)
+        with self._commit_cond:
+            self._commit_queue.append(request)
+            lead = not self._commit_leader
+            if lead:
+                self._commit_leader = True
+
+        if lead:
+            window = DATABASE_CONFIG["group_commit_window_ms"] / 1000
+            if window > 0:
+                time.sleep(window)
+            while True:
+                with self._commit_cond:
+                    batch, self._commit_queue = self._commit_queue, []
+                    if not batch:
+                        self._commit_leader = False
+                        break
+                self._flush_batch(batch)
+
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _flush_batch(self, batch: List[_CommitRequest]) -> None:
+        """Apply a batch of queued mutations and write them as one commit."""
+        try:
+            data = list(self._read_snapshot(strict=True))
+            changed = False
+            for request in batch:
+                try:
+                    updated, request.result = request.mutate(data)
+                except Exception as e:
+                    request.error = e
+                    continue
+                if updated is not None:
+                    data, changed = updated, True
+            if changed:
+                self._write_snapshot(data, reindex=any(request.reindex for request in batch))
         except Exception as e:
-            print(f"[ERROR][DB] Failed reading {self.path}: {e}")
-            return [] 
+            for request in batch:
+                request.error = request.error or e
+        for request in batch:
+            request.done.set()
+
+    # ---------- Log-structured mode ----------
+
+    @staticmethod
+    def _record_id(record: dict) -> str:
+        """Key used to identify a record in the log."""
+        return str(record.get("id", "")).strip()
+
+    @staticmethod
+    def _entry_id(entry: tuple) -> str:
+        """Id of the record an upsert, patch or delete entry touches."""
+        op, payload = entry
+        if op == OP_UPSERT:
+            return Database._record_id(payload)
+        if op == OP_PATCH:
+            return payload[0]
+        return payload
+
+    def _load_state(self) -> None:
+        """
+        Rebuild the current state from the snapshot plus the log tail.
+        """
+        records: Dict[str, dict] = {}
+        self._snapshot_sig = self._stat_signature(self.path)
+        for record in self._read_snapshot():
+            records[self._record_id(record)] = record
+        entries, self._log_offset = self.wal.replay()
+        for entry in entries:
+            self._apply(records, entry)
+        self._records = records
+        self._invalidate_cache()
+
+    def _refresh_state(self) -> None:
+        """
+        Pick up changes made by other processes since the state was loaded.
+
+        If the snapshot was replaced the state is rebuilt; if only the log grew
+        just the new tail is replayed. Otherwise the in-memory state is reused.
+        """
+        with self._lock:
+            if self._stat_signature(self.path) != self._snapshot_sig or self.wal.size() < self._log_offset:
+                self.cache_misses += 1
+                self._load_state()
+            elif self.wal.size() > self._log_offset:
+                self.cache_misses += 1
+                entries, self._log_offset = self.wal.replay(self._log_offset)
+                for entry in entries:
+                    self._apply(self._records, entry)
+            else:
+                self.cache_hits += 1
+
+    @staticmethod
+    def _apply(records: Dict[str, dict], entry: tuple) -> None:
+        """Apply a single log entry to an in-memory record map."""
+        op, payload = entry
+        if op == OP_UPSERT:
+            records[Database._record_id(payload)] = payload
+        elif op == OP_DELETE:
+            records.pop(payload, None)
+        elif op == OP_CLEAR:
+            records.clear()
+        elif op == OP_PATCH:
+            rid, changes = payload
+            if rid in records:
+                # A new dict: the old one may be shared with pinned snapshots
+                records[rid] = {**records[rid], **changes}
+        elif op == OP_BATCH:
+            for sub_entry in payload:
+                Database._apply(records, sub_entry)
+
+    def _diff(self, data_list: List) -> List[tuple]:
+        """
+        Turn a full replacement list into the upserts/deletes that produce it.
+        """
+        entries: List[tuple] = []
+        incoming: Dict[str, dict] = {}
+        for record in data_list:
+            incoming[self._record_id(record)] = record
+
+        if not incoming and self._records:
+            return [(OP_CLEAR, None)]
+
+        for rid in self._records:
+            if rid not in incoming:
+                entries.append((OP_DELETE, rid))
+        for rid, record in incoming.items():
+            if self._records.get(rid) != record:
+                entries.append((OP_UPSERT, copy.deepcopy(record)))
+        return entries
+
+    @contextmanager
+    def _log_writer(self) -> Iterator[None]:
+        """
+        Hold the log's writer lock (shared with other processes), then our
+        own lock. Always taken in this order, so the compactor, which holds
+        the log lock throughout, cannot deadlock with a writer.
+        """
+        with self.wal.locked(), self._lock:
+            yield
+
+    def _append(self, entries: List[tuple]) -> None:
+        """
+        Append entries to the log, apply them in memory, and schedule compaction.
+        The caller holds _log_writer() and has just refreshed the state, so
+        anything past the log offset is a torn tail.
+        """
+        if not entries:
+            return
+        with self._lock:
+            log_size = self.wal.append(entries, self._log_offset)
+            for entry in entries:
+                self._apply(self._records, entry)
+            self._log_offset = log_size
+            if self.index is not None and self.index_valid:
+                changes = [self._index_change(entry) for entry in self._flatten(entries)]
+                self.index.apply([change for change in changes if change is not None], self._generation())
+        self._maybe_compact(log_size)
+
+    @staticmethod
+    def _flatten(entries: List[tuple]) -> Iterator[tuple]:
+        """The entries with every batch expanded into its members."""
+        for entry in entries:
+            if entry[0] == OP_BATCH:
+                yield from entry[1]
+            else:
+                yield entry
+
+    @staticmethod
+    def _index_change(entry: tuple) -> Optional[tuple]:
+        """Translate a log entry into the matching index journal entry (None if the index is unaffected)."""
+        op, payload = entry
+        if op == OP_UPSERT:
+            return IDX_PUT, Database._record_id(payload), normalize_email(payload.get("email", "")), None
+        if op == OP_DELETE:
+            return IDX_DEL, payload
+        if op == OP_PATCH:
+            rid, changes = payload
+            return (IDX_PUT, rid, normalize_email(changes["email"]), None) if "email" in changes else None
+        return (IDX_CLEAR,)
+
+    def _should_compact(self, log_size: int) -> bool:
+        """True once the log passes the configured size or log/snapshot ratio."""
+        if log_size >= DATABASE_CONFIG["compact_max_log_bytes"]:
+            return True
+        if log_size < DATABASE_CONFIG["compact_min_log_bytes"]:
+            return False
+        snapshot_size = max(os.path.getsize(self.path), 1)
+        return log_size / snapshot_size >= DATABASE_CONFIG["compact_ratio"]
+
+    def _maybe_compact(self, log_size: int) -> None:
+        """Start a background compaction if one is due and none is running."""
+        if not self._should_compact(log_size):
+            return
+        with self._lock:
+            if self._compactor and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, name="db-compactor", daemon=True)
+            self._compactor.start()
+
+    def compact(self) -> None:
+        """
+        Fold the log into a new snapshot and empty the log.
+
+        The log's writer lock is held throughout, so writers in every process
+        wait for the compaction instead of appending entries the new log
+        would drop. Readers are not blocked: the snapshot is written outside
+        our own lock, and a reader that sees the new snapshot before the log
+        is emptied just replays entries it already contains (they are
+        idempotent).
+        """
+        if not self.log_structured:
+            return
+        with self._compact_lock, self.wal.locked():
+            try:
+                with self._lock:
+                    self._refresh_state()  # Includes every other process's appends
+                    state = list(self._records.values())
+                self._write_snapshot(state)
+                with self._lock:
+                    self.wal.replace(b"")
+                    self._snapshot_sig = self._stat_signature(self.path)
+                    self._log_offset = 0
+                    if self.index is not None and self.index_valid:
+                        self.index.apply([], self._generation())
+            except Exception as e:
+                print(f"[ERROR][DB] Compaction of {self.path} failed: {e}")
+
+    def close(self) -> None:
+        """
+        Wait for any running compaction to finish.
+        """
+        compactor = self._compactor
+        if compactor and compactor.is_alive():
+            compactor.join()
+
+    # ---------- Secondary indexes ----------
+
+    def _generation(self) -> tuple:
+        """
+        Token identifying the current on-disk state: the snapshot's stat
+        signature plus the log length. Any write by any process changes it.
+        """
+        return self._stat_signature(self.path), self.wal.size() if self.wal else 0
+
+    def _scan_locations(self) -> Iterator[tuple]:
+        """Yield (record, location) pairs straight from the snapshot file."""
+        with open(self.path, "rb") as f:
+            if f.read(len(STREAM_MAGIC)) == STREAM_MAGIC:
+                i = 0
+                while True:
+                    offset = f.tell()
+                    frame = next(iter_frames(f, strict=True), None)
+                    if frame is None:
+                        return
+                    yield frame, (i, offset)
+                    i += 1
+            f.seek(0)
+            for i, record in enumerate(self._stream_snapshot(f)):
+                yield record, (i, None)
+
+    def rebuild_index(self) -> int:
+        """
+        Rebuild the secondary indexes from scratch.
+
+        Returns:
+            The number of students indexed.
+        """
+        if self.index is None:
+            self.index = SecondaryIndex(self.path)
+        with self._lock:
+            if self.log_structured:
+                self._refresh_state()
+                entries = ((record, None) for record in self._records.values())
+            else:
+                entries = self._scan_locations()
+            count = self.index.rebuild(entries, self._generation())
+            self.index_valid = True
+            return count
+
+    def _usable_index(self) -> Optional[SecondaryIndex]:
+        """
+        The secondary index if it matches the data on disk, rebuilding it when
+        another process has written since (if autorebuild is on), else None.
+        """
+        if self.index is None:
+            return None
+        if not self.index_valid or self.index.generation != self._generation():
+            if not DATABASE_CONFIG["index_autorebuild"]:
+                self.index_valid = False
+                return None
+            self.rebuild_index()
+        return self.index
+
+    def _read_at(self, location: Location) -> Optional[dict]:
+        """Read one snapshot record by its indexed location."""
+        pos, offset = location
+        with self._lock:
+            if self._cache is not None and self._cache_sig == self._stat_signature(self.path):
+                self.cache_hits += 1
+                return copy.deepcopy(self._cache[pos])
+        if offset is not None:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                return next(iter_frames(f, strict=True), None)
+        data = self._read_snapshot()
+        return copy.deepcopy(data[pos]) if pos < len(data) else None
+
+    # ---------- MVCC snapshots ----------
+
+    def _version_token(self):
+        """
+        Token of the on-disk state the current generation must match, or None
+        if the backend cannot tell (then every snapshot() builds a new one).
+        """
+        return self._generation()
+
+    def _version_records(self) -> List:
+        """Current records, to be frozen into a new generation."""
+        if self.log_structured:
+            self._refresh_state()
+            return list(self._records.values())
+        return self._read_snapshot()
+
+    def snapshot(self) -> Snapshot:
+        """
+        Pin a consistent, immutable view of every stored record.
+
+        Writers install new generations instead of changing the pinned one,
+        so the snapshot can be read at leisure without blocking them. The
+        generation is reclaimed once every reader has released it.
+        """
+        with self._lock:
+            token = self._version_token()
+            if token is None or token != self.versions.token:
+                self.versions.install(self._version_records(), token)
+            return self.versions.pin()
+
+    # ---------- Public API ----------
+
+    def read_from_file(self) -> List:
+        """
+        Reads data from the file (`students.data`).
+        """
+        if self.log_structured:
+            with self._lock:
+                self._refresh_state()
+                return copy.deepcopy(list(self._records.values()))
+        return copy.deepcopy(self._read_snapshot()) if self.read_cache else self._read_snapshot()
 
     def write_to_file(self, data_list: List):
         """
         Writes the given list of data to the file (`students.data`).
+        In log-structured mode only the records that changed are appended.
         """
         try:
-            with open(self.path, "wb") as f:
-                pickle.dump(data_list, f) 
+            if self.log_structured:
+                with self._log_writer():
+                    self._refresh_state()
+                    self._append(self._diff(data_list))
+                return
+            self._commit(lambda _: (list(data_list), None), reindex=True)
         except Exception as e:
             print(f"[ERROR][DB] Failed writing {self.path}: {e}")
 
+    # ---------- Record-level API ----------
+
+    def get(self, student_id: str) -> Optional[dict]:
+        """
+        Return the record with the given id, or None if it does not exist.
+        """
+        sid = str(student_id).strip()
+        if self.log_structured:
+            with self._lock:
+                self._refresh_state()
+                record = self._records.get(sid)
+                return copy.deepcopy(record) if record is not None else None
+        with self._lock:
+            index = self._usable_index()
+            if index is not None:
+                if sid not in index:
+                    return None
+                record = self._read_at(index.location(sid))
+                if record is not None and self._record_id(record) == sid:
+                    return record
+        for record in self._read_snapshot():
+            if self._record_id(record) == sid:
+                return copy.deepcopy(record)
+        return None
+
+    def upsert(self, record: dict) -> bool:
+        """
+        Insert a record, or replace the stored record with the same id in place.
+
+        Returns:
+            True if the record was written.
+        """
+        try:
+            record = copy.deepcopy(record)  # Stored (and cached) records must not alias the caller's
+            if self.log_structured:
+                with self._log_writer():
+                    self._refresh_state()
+                    self._append([(OP_UPSERT, record)])
+                return True
+            rid = self._record_id(record)
+
+            def replace(data: List) -> tuple:
+                for i, existing in enumerate(data):
+                    if self._record_id(existing) == rid:
+                        data[i] = record
+                        break
+                else:
+                    data.append(record)
+                return data, None
+
+            self._commit(replace)
+            return True
+        except Exception as e:
+            print(f"[ERROR][DB] Failed upserting into {self.path}: {e}")
+            return False
+
+    def patch(self, student_id: str, changes: dict) -> bool:
+        """
+        Update only the given fields of a stored record, keeping its position.
+        In log-structured mode just the changed fields are appended to the log.
+
+        Returns:
+            True if the record exists (and was updated), False otherwise.
+        """
+        sid = str(student_id).strip()
+        try:
+            changes = copy.deepcopy(changes)
+            if self.log_structured:
+                with self._log_writer():
+                    self._refresh_state()
+                    if sid not in self._records:
+                        return False
+                    self._append([(OP_PATCH, (sid, changes))])
+                return True
+
+            def update(data: List) -> tuple:
+                for i, existing in enumerate(data):
+                    if self._record_id(existing) == sid:
+                        data[i] = {**existing, **changes}
+                        return data, True
+                return None, False
+
+            return self._commit(update)
+        except Exception as e:
+            print(f"[ERROR][DB] Failed patching {self.path}: {e}")
+            return False
+
+    def upsert_many(self, records: List[dict]) -> bool:
+        """
+        Insert or replace many records in one commit (one rewrite or one log append).
+
+        Returns:
+            True if the records were written.
+        """
+        try:
+            records = copy.deepcopy(records)
+            if self.log_structured:
+                with self._log_writer():
+                    self._refresh_state()
+                    self._append([(OP_UPSERT, record) for record in records])
+                return True
+
+            def replace_all(data: List) -> tuple:
+                positions = {self._record_id(existing): i for i, existing in enumerate(data)}
+                for record in records:
+                    rid = self._record_id(record)
+                    if rid in positions:
+                        data[positions[rid]] = record
+                    else:
+                        positions[rid] = len(data)
+                        data.append(record)
+                return data, None
+
+            self._commit(replace_all)
+            return True
+        except Exception as e:
+            print(f"[ERROR][DB] Failed upserting into {self.path}: {e}")
+            return False
+
+    def delete(self, student_id: str) -> bool:
+        """
+        Delete the record with the given id.
+
+        Returns:
+            True if a record was removed, False if none matched.
+        """
+        sid = str(student_id).strip()
+        try:
+            if self.log_structured:
+                with self._log_writer():
+                    self._refresh_state()
+                    if sid not in self._records:
+                        return False
+                    self._append([(OP_DELETE, sid)])
+                return True
+            def remove(data: List) -> tuple:
+                kept = [r for r in data if self._record_id(r) != sid]
+                if len(kept) == len(data):
+                    return None, False
+                return kept, True
+
+            return self._commit(remove)
+        except Exception as e:
+            print(f"[ERROR][DB] Failed deleting from {self.path}: {e}")
+            return False
+
+    def commit_batch(self, entries: List[tuple]) -> bool:
+        """
+        Apply a batch of upsert / patch / delete log entries (one per record,
+        as buffered by a UnitOfWork) as a single atomic write: one framed log
+        entry in log-structured mode, one snapshot rewrite otherwise.
+        Deletes of records that no longer exist are skipped; a patch of one
+        fails the whole batch, so its changes are never dropped silently.
+
+        Returns:
+            True if the batch was written, False if nothing was.
+        """
+        if not entries:
+            return True
+        try:
+            entries = copy.deepcopy(entries)
+            if self.log_structured:
+                with self._log_writer():
+                    self._refresh_state()
+                    self._check_patches(entries, self._records.__contains__)
+                    self._append([(OP_BATCH, entries)])
+                return True
+
+            def apply_all(data: List) -> tuple:
+                positions = {self._record_id(existing): i for i, existing in enumerate(data)}
+                self._check_patches(entries, positions.__contains__)
+                for op, payload in entries:
+                    if op == OP_UPSERT:
+                        rid = self._record_id(payload)
+                        if rid in positions:
+                            data[positions[rid]] = payload
+                        else:
+                            positions[rid] = len(data)
+                            data.append(payload)
+                    elif op == OP_PATCH:
+                        rid, changes = payload
+                        if rid in positions:
+                            data[positions[rid]] = {**data[positions[rid]], **changes}
+                    elif op == OP_DELETE and payload in positions:
+                        data[positions.pop(payload)] = None
+                return [record for record in data if record is not None], None
+
+            self._commit(apply_all)
+            return True
+        except Exception as e:
+            print(f"[ERROR][DB] Failed committing a batch to {self.path}: {e}")
+            return False
+
+    @staticmethod
+    def _check_patches(entries: List[tuple], exists: Callable[[str], bool]) -> None:
+        """
+        Raise ValueError if a patch in a batch targets a record that will not
+        exist when it is applied (`exists` answers for the stored records).
+        """
+        present: Dict[str, bool] = {}
+        for op, payload in entries:
+            if op == OP_UPSERT:
+                present[Database._record_id(payload)] = True
+            elif op == OP_DELETE:
+                present[payload] = False
+            elif op == OP_PATCH:
+                rid = payload[0]
+                if not (present[rid] if rid in present else exists(rid)):
+                    raise ValueError(f"cannot patch student {rid}: no such record")
+
+    def find_by_email(self, email: str) -> Optional[dict]:
+        """
+        Return the record whose email matches (case-insensitive), or None.
+        """
+        with self._lock:
+            if self.log_structured:
+                self._refresh_state()
+            index = self._usable_index()
+            if index is not None:
+                sid = index.id_for_email(email)
+                return self.get(sid) if sid is not None else None
+        e = email.strip().lower()
+        for record in self.iterate():
+            if str(record.get("email", "")).strip().lower() == e:
+                return record
+        return None
+
+    def iterate(self) -> Iterator[dict]:
+        """
+        Yield every stored record in file order. Each record is the caller's
+        own copy, as with read_from_file().
+        """
+        for record, shared in self._iter_stored():
+            yield copy.deepcopy(record) if shared else record
+
+    def _iter_stored(self) -> Iterator[tuple]:
+        """
+        Yield (record, shared) for every stored record in file order, where
+        `shared` tells whether the record belongs to the in-memory state or
+        the read cache (and must be copied before it leaves the database).
+        """
+        if self.log_structured:
+            with self._lock:
+                self._refresh_state()
+                records = list(self._records.values())
+            for record in records:
+                yield record, True
+            return
+
+        with self._lock:
+            cached = self._cache if self._cache_sig == self._stat_signature(self.path) else None
+        if cached is not None:
+            self.cache_hits += 1
+            records, shared = cached, True
+        elif DATABASE_CONFIG["snapshot_format"] == "stream" or not self.read_cache:
+            # Stream straight from disk without materializing (or caching) the whole list
+            with open(self.path, "rb") as f:
+                for record in self._stream_snapshot(f):
+                    yield record, False
+            return
+        else:
+            records, shared = self._read_snapshot(), self.read_cache
+        for record in records:
+            yield record, shared
+
+    def iter_records(self) -> Iterator[dict]:
+        """
+        Generator over stored records, one at a time.
+
+        With the stream snapshot format (or the read cache disabled) records are
+        decoded frame by frame, so peak memory does not grow with the population.
+        """
+        return self.iterate()
+
+    def iter_students(self) -> Iterator["Student"]:
+        """
+        Generator over stored students, decoding one Student at a time.
+        """
+        from models.student_model import Student  # Imported here to keep the storage layer model-agnostic.
+        for record, _ in self._iter_stored():
+            yield Student.from_dict(record)  # Decoding copies, so shared records need no copy first
+
+    def map_shards(self, func: Callable[[Iterator[dict]], T]) -> List[T]:
+        """
+        Apply `func` to the records of every storage shard and return the partial results.
+
+        `func` receives an iterator of records so it can consume them in constant
+        memory. A single-file database is one shard. `func` must be a picklable,
+        module-level function so sharded backends can run it in worker processes.
+        Each shard is read from one pinned snapshot, so concurrent writes are
+        either fully visible or not at all.
+        """
+        if not self.log_structured and (DATABASE_CONFIG["snapshot_format"] == "stream" or not self.read_cache):
+            # Streaming reads hold one open handle on an atomically replaced file,
+            # which is already a consistent snapshot without materializing it
+            return [func(self.iter_records())]
+        with self.snapshot() as snap:
+            return [func(iter(snap))]
+
     def clear_all(self):
         """
         Clears all data in the database by overwriting the file with an empty list.
         """
-        self.write_to_file([]) 
+        self.write_to_file([])
@@ -0,0 +1,152 @@
+import heapq
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from db.subject_catalog import SubjectCatalog
+from models.subject_model import GRADE_ORDER, grade_from_mark
+
+
+class EnrolmentIndex:
+    """
+    Inverted index from subject id to the students enrolled in it (with their marks).
+
+    Built from one snapshot scan the first time it is needed, then kept up to
+    date incrementally by the controllers as students enrol, drop subjects or
+    are removed, so admin queries about a subject never load the population.
+    Per-subject mark sums are kept alongside, making a subject's mean O(1).
+
+    Every enrolment change also bumps the SubjectCatalog's change counter. The
+    index remembers the counter value it is in sync with; if the counter has
+    moved further than the index's own updates explain (another process, the
+    generator, a failed write), the index is rebuilt before the next query.
+    (An enrolment another process has counted but not yet saved when a rebuild
+    runs is only picked up at the next change.)
+    """
+
+    def __init__(self, db, catalog: SubjectCatalog):
+        """
+        Bind the index to a database and its catalog (nothing is loaded yet).
+        """
+        self.db = db
+        self.catalog = catalog
+        self._lock = threading.RLock()
+        self._students: Dict[str, Dict[str, int]] = {}
+        self._sums: Dict[str, int] = {}
+        self._synced: Optional[int] = None  # Catalog change counter the index matches; None = stale
+
+    # ---------- Building ----------
+
+    def rebuild(self) -> int:
+        """
+        Rebuild the index from a pinned snapshot of the database.
+
+        Returns:
+            The number of enrolments indexed.
+        """
+        with self._lock:
+            changes = self.catalog.changes()
+            students: Dict[str, Dict[str, int]] = {}
+            sums: Dict[str, int] = {}
+            total = 0
+            with self.db.snapshot() as snap:
+                for record in snap:
+                    rid = record["id"]
+                    for sub in record.get("subjects", ()):
+                        mark = sub.get("mark") or 0
+                        students.setdefault(sub["id"], {})[rid] = mark
+                        sums[sub["id"]] = sums.get(sub["id"], 0) + mark
+                        total += 1
+            self._students, self._sums = students, sums
+            self._synced = changes
+            return total
+
+    def _ensure_current(self) -> None:
+        """Rebuild if enrolments changed behind the index's back."""
+        if self._synced is None or self.catalog.changes() != self._synced:
+            self.rebuild()
+
+    def _advance(self, own_changes: int) -> bool:
+        """
+        Account for catalog changes made by the caller's own update.
+        Returns False (and marks the index stale) if anything else changed too.
+        """
+        if self._synced is not None and self.catalog.changes() == self._synced + own_changes:
+            self._synced += own_changes
+            return True
+        self._synced = None
+        return False
+
+    # ---------- Incremental updates ----------
+
+    def add(self, subject_id: str, student_id: str, mark: Optional[int]) -> None:
+        """
+        Record an enrolment (after SubjectCatalog.claim()/enrol() counted it).
+        """
+        with self._lock:
+            if self._advance(1):
+                mark = mark or 0
+                self._students.setdefault(subject_id, {})[student_id] = mark
+                self._sums[subject_id] = self._sums.get(subject_id, 0) + mark
+
+    def discard(self, subject_id: str, student_id: str) -> None:
+        """
+        Record a student dropping a subject (after SubjectCatalog.drop()).
+        """
+        with self._lock:
+            if self._advance(1):
+                self._remove(subject_id, student_id)
+
+    def remove_student(self, student_id: str, subject_ids: Iterable[str]) -> None:
+        """
+        Record a removed student (after their subjects were dropped from the catalog).
+        """
+        subject_ids = list(subject_ids)
+        with self._lock:
+            if self._advance(len(subject_ids)):
+                for subject_id in subject_ids:
+                    self._remove(subject_id, student_id)
+
+    def _remove(self, subject_id: str, student_id: str) -> None:
+        roster = self._students.get(subject_id)
+        if roster is None or student_id not in roster:
+            return
+        self._sums[subject_id] -= roster.pop(student_id)
+        if not roster:
+            del self._students[subject_id]
+            del self._sums[subject_id]
+
+    # ---------- Queries ----------
+
+    def roster(self, subject_id: str) -> List[str]:
+        """Ids of the students enrolled in a subject, sorted."""
+        with self._lock:
+            self._ensure_current()
+            return sorted(self._students.get(subject_id.strip(), ()))
+
+    def marks(self, subject_id: str) -> Dict[str, int]:
+        """Student id → mark for a subject."""
+        with self._lock:
+            self._ensure_current()
+            return dict(self._students.get(subject_id.strip(), {}))
+
+    def mean(self, subject_id: str) -> Optional[float]:
+        """Mean mark in a subject (None if nobody is enrolled)."""
+        sid = subject_id.strip()
+        with self._lock:
+            self._ensure_current()
+            count = len(self._students.get(sid, ()))
+            return self._sums[sid] / count if count else None
+
+    def grade_distribution(self, subject_id: str) -> Dict[str, int]:
+        """Number of students per grade in a subject, in GRADE_ORDER."""
+        counts = dict.fromkeys(GRADE_ORDER, 0)
+        for mark in self.marks(subject_id).values():
+            counts[grade_from_mark(mark)] += 1
+        return counts
+
+    def most_enrolled(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """The `limit` subjects with the most students, as (subject id, count) pairs."""
+        with self._lock:
+            self._ensure_current()
+            sizes = [(len(roster), subject_id) for subject_id, roster in self._students.items()]
+        return [(subject_id, count) for count, subject_id in
+                heapq.nlargest(limit, sizes, key=lambda pair: (pair[0], -int(pair[1])))]
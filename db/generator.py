@@ -0,0 +1,242 @@
+import argparse
+import random
+import time
+from typing import Iterator, List, Optional
+from db.database import Database
+from db.id_allocator import IdAllocator, ID_SPACE
+from db.subject_catalog import SubjectCatalog
+from models.subject_model import grade_from_mark, MAX_SUBJECTS
+from resources.parameters.app_parameters import DATABASE_CONFIG, GENERATOR_CONFIG
+
+try:
+    import numpy as np
+except ImportError:  # Optional: without NumPy the (slower) stdlib generator is used
+    np = None
+
+FIRST_NAMES = ["James", "Olivia", "Liam", "Emma", "Noah", "Amelia", "William", "Ava", "Jack", "Mia",
+               "Ethan", "Chloe", "Lucas", "Grace", "Henry", "Zoe", "Oscar", "Ruby", "Leo", "Isla"]
+LAST_NAMES = ["Smith", "Nguyen", "Chen", "Brown", "Wilson", "Taylor", "Lee", "Martin", "Patel", "Kim",
+              "Walker", "White", "Harris", "Wang", "Lewis", "Young", "King", "Singh", "Scott", "Green"]
+
+# Lookup tables so the per-student loop only indexes lists
+GRADE_BY_MARK = [grade_from_mark(mark) for mark in range(101)]
+SUBJECT_IDS = [f"{i:03d}" for i in range(1000)]
+SUBJECT_TITLES = [f"Subject-{i:03d}" for i in range(1000)]
+
+
+def validate_config(cfg: dict) -> None:
+    """
+    Check a generator configuration (GENERATOR_CONFIG plus overrides).
+
+    Raises:
+        ValueError: naming the first setting that is out of range.
+    """
+    if not 0 <= cfg["mark_min"] <= cfg["mark_max"] <= 100:
+        raise ValueError(f"GENERATOR_CONFIG needs 0 <= mark_min <= mark_max <= 100, "
+                         f"got {cfg['mark_min']}..{cfg['mark_max']}")
+    if cfg["mark_distribution"] not in ("uniform", "normal"):
+        raise ValueError(f"Unknown mark_distribution {cfg['mark_distribution']!r}")
+    if cfg["mark_distribution"] == "normal":
+        if cfg["mark_std"] <= 0:
+            raise ValueError("GENERATOR_CONFIG mark_std must be positive")
+        if not cfg["mark_min"] <= cfg["mark_mean"] <= cfg["mark_max"]:
+            raise ValueError("GENERATOR_CONFIG mark_mean must lie between mark_min and mark_max")
+    weights = cfg["subject_count_weights"]
+    if len(weights) != MAX_SUBJECTS + 1 or min(weights) < 0 or sum(weights) <= 0:
+        raise ValueError(f"GENERATOR_CONFIG subject_count_weights needs {MAX_SUBJECTS + 1} "
+                         f"non-negative weights with a positive sum")
+    if cfg["batch_size"] <= 0:
+        raise ValueError("GENERATOR_CONFIG batch_size must be positive")
+
+
+# ---------- Column generators (one batch of random draws at a time) ----------
+
+def _numpy_columns(rng, count: int, cfg: dict) -> tuple:
+    """
+    Draw every random column of a batch with vectorized NumPy calls.
+    Marks and subject ids are flat, holding counts[i] entries per student in order.
+    """
+    weights = np.asarray(cfg["subject_count_weights"], dtype=float)
+    counts = rng.choice(MAX_SUBJECTS + 1, size=count, p=weights / weights.sum())
+    total = int(counts.sum())
+    lo, hi = cfg["mark_min"], cfg["mark_max"]
+    if cfg["mark_distribution"] == "normal":
+        # Redraw out-of-range marks (a truncated normal) rather than piling them up on the bounds
+        marks = np.rint(rng.normal(cfg["mark_mean"], cfg["mark_std"], total))
+        outside = (marks < lo) | (marks > hi)
+        while outside.any():
+            marks[outside] = np.rint(rng.normal(cfg["mark_mean"], cfg["mark_std"], int(outside.sum())))
+            outside = (marks < lo) | (marks > hi)
+        marks = marks.astype(np.int64)
+    else:
+        marks = rng.integers(lo, hi + 1, total)
+    subjects = rng.integers(1, 1000, total)
+    first = rng.integers(0, len(FIRST_NAMES), count)
+    last = rng.integers(0, len(LAST_NAMES), count)
+    digits = rng.integers(100, 1000, count)
+    return (counts.tolist(), marks.tolist(), subjects.tolist(),
+            first.tolist(), last.tolist(), digits.tolist())
+
+
+def _stdlib_columns(rng: random.Random, count: int, cfg: dict) -> tuple:
+    """
+    Draw every random column of a batch with the random module.
+    Same layout as _numpy_columns.
+    """
+    rand = rng.random
+    counts = rng.choices(range(MAX_SUBJECTS + 1), weights=cfg["subject_count_weights"], k=count)
+    total = sum(counts)
+    lo, hi = cfg["mark_min"], cfg["mark_max"]
+    if cfg["mark_distribution"] == "normal":
+        gauss, mean, std = rng.gauss, cfg["mark_mean"], cfg["mark_std"]
+        marks = []
+        while len(marks) < total:  # Out-of-range marks are redrawn, as in _numpy_columns
+            mark = round(gauss(mean, std))
+            if lo <= mark <= hi:
+                marks.append(mark)
+    else:
+        span = hi - lo + 1
+        marks = [lo + int(rand() * span) for _ in range(total)]
+    subjects = [1 + int(rand() * 999) for _ in range(total)]
+    first = [int(rand() * len(FIRST_NAMES)) for _ in range(count)]
+    last = [int(rand() * len(LAST_NAMES)) for _ in range(count)]
+    digits = [100 + int(rand() * 900) for _ in range(count)]
+    return counts, marks, subjects, first, last, digits
+
+
+# ---------- Population ----------
+
+def generate(n: int, seed: Optional[int] = None, batch_size: Optional[int] = None,
+             **overrides) -> Iterator[List[dict]]:
+    """
+    Generate n student records in batches.
+
+    Every student has a unique id, a valid @university.com email, a valid
+    password and 0..MAX_SUBJECTS subjects whose marks follow the configured
+    distribution. Output is reproducible for a given seed and batch size
+    (and for whether NumPy is installed, since the two generators draw differently).
+
+    Args:
+        n: Number of students (at most ID_SPACE, the 6-digit ids the IdAllocator tracks).
+        seed: Random seed (defaults to GENERATOR_CONFIG["seed"]).
+        batch_size: Students per yielded batch.
+        **overrides: Any GENERATOR_CONFIG key, e.g. mark_distribution="normal".
+
+    Raises:
+        ValueError: if n does not fit the id space or the configuration is invalid.
+    """
+    cfg = {**GENERATOR_CONFIG, **overrides}
+    validate_config(cfg)
+    if not 0 <= n <= ID_SPACE:
+        raise ValueError(f"Cannot generate {n} students: ids are 6 digits, so at most {ID_SPACE}")
+    seed = cfg["seed"] if seed is None else seed
+    batch_size = batch_size or cfg["batch_size"]
+    return _batches(n, cfg, seed, batch_size)
+
+
+def _batches(n: int, cfg: dict, seed: int, batch_size: int) -> Iterator[List[dict]]:
+    """Yield the batches of a validated generate() call."""
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        ids = (rng.choice(ID_SPACE, size=n, replace=False) + 1).tolist()
+        columns = lambda count: _numpy_columns(rng, count, cfg)
+    else:
+        rng = random.Random(seed)
+        ids = rng.sample(range(1, ID_SPACE + 1), n)
+        columns = lambda count: _stdlib_columns(rng, count, cfg)
+
+    # Subject ids must be distinct within a student; the rare clashes are redrawn from here
+    fixer = random.Random(seed)
+    first_lower = [name.lower() for name in FIRST_NAMES]
+    last_lower = [name.lower() for name in LAST_NAMES]
+    for start in range(0, n, batch_size):
+        batch_ids = ids[start:start + batch_size]
+        counts, marks, subjects, first, last, digits = columns(len(batch_ids))
+        batch = []
+        offset = 0
+        for i, num in enumerate(batch_ids):
+            sid = f"{num:06d}"
+            f, l, k = first[i], last[i], counts[i]
+            subs = subjects[offset:offset + k]
+            if k > 1 and len(set(subs)) < k:
+                subs = fixer.sample(range(1, 1000), k)
+            sub_marks = marks[offset:offset + k]
+            total = sum(sub_marks)
+            batch.append({
+                "id": sid,
+                "name": f"{FIRST_NAMES[f]} {LAST_NAMES[l]}",
+                "email": f"{first_lower[f]}.{last_lower[l]}.{sid}@university.com",
+                "password": f"Password{digits[i]}",
+                "subjects": [
+                    {"id": SUBJECT_IDS[sub], "title": SUBJECT_TITLES[sub], "mark": mark, "grade": GRADE_BY_MARK[mark]}
+                    for sub, mark in zip(subs, sub_marks)
+                ],
+                "mark_sum": total,
+                "mark_count": k,
+                "overall_grade": GRADE_BY_MARK[round(total / k)] if k else None,
+            })
+            offset += k
+        yield batch
+
+
+def write_population(db: Database, batches: Iterator[List[dict]]) -> int:
+    """
+    Replace the database contents with the generated batches.
+
+    Snapshot files (plain or sharded) are rewritten whole on every commit, so
+    they are written once at the end; the other backends commit per batch.
+    The id allocator's bitmap is then reset to exactly the generated ids and
+    the subject catalog's enrolment counts to the generated enrolments.
+
+    Returns:
+        The number of students written.
+    """
+    from db.sharded_database import ShardedDatabase  # Imported here to avoid a circular import.
+    ids: List[str] = []
+    enrolments: List[dict] = []  # Just the subjects of each record, for the catalog counts
+    if type(db) in (Database, ShardedDatabase) and not db.log_structured:
+        records = [record for batch in batches for record in batch]
+        db.write_to_file(records)
+        ids = [record["id"] for record in records]
+        enrolments = records
+    else:
+        db.clear_all()
+        for batch in batches:
+            if not db.upsert_many(batch):
+                raise RuntimeError(f"Writing a batch of generated students to {db.path} failed")
+            ids.extend(record["id"] for record in batch)
+            enrolments.extend({"subjects": record["subjects"]} for record in batch)
+
+    allocator = IdAllocator(db.path + ".ids")
+    allocator.rebuild(ids)
+    allocator.close()
+    catalog = SubjectCatalog(db.path + ".subjects")
+    catalog.rebuild_counts(enrolments)
+    catalog.close()
+    return len(ids)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic student population.")
+    parser.add_argument("count", type=int, help=f"number of students (e.g. 1000 to {ID_SPACE})")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--backend", choices=("pickle", "sharded", "sqlite", "record"), default=None)
+    parser.add_argument("--format", choices=("pickle", "stream"), default=None, help="snapshot format")
+    parser.add_argument("--distribution", choices=("uniform", "normal"), default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.format:
+        DATABASE_CONFIG["snapshot_format"] = args.format
+    overrides = {"mark_distribution": args.distribution} if args.distribution else {}
+    validate_config({**GENERATOR_CONFIG, **overrides})  # Fail before opening (and clearing) the backend
+    if not 0 <= args.count <= ID_SPACE:
+        parser.error(f"count must be between 0 and {ID_SPACE} (6-digit student ids)")
+
+    from db.backends import open_database  # Imported here to avoid a circular import with db.database.
+    db = open_database(args.backend)
+    start = time.perf_counter()
+    written = write_population(db, generate(args.count, seed=args.seed, batch_size=args.batch_size, **overrides))
+    print(f"[DB] Generated {written} students in {time.perf_counter() - start:.2f}s "
+          f"({'numpy' if np is not None else 'stdlib'} generator)")
+    db.close()
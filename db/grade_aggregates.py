@@ -0,0 +1,161 @@
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from db.student_repository import StudentRepository, EVENT_ADDED, EVENT_SAVED, EVENT_REMOVED, EVENT_CLEARED
+from models.student_model import Student
+from models.subject_model import GRADE_ORDER, grade_from_mark
+
+# (overall grade, passed) of a student with at least one subject
+Summary = Tuple[str, bool]
+
+
+def summary_of_record(record: dict) -> Optional[Summary]:
+    """
+    Overall grade and PASS/FAIL of a stored record (None without subjects),
+    using the stored aggregates when present, as Student.from_dict() does.
+    """
+    subjects = record.get("subjects", ())
+    if not subjects:
+        return None
+    if record.get("mark_count") == len(subjects):
+        total = record["mark_sum"]
+    else:
+        total = sum(sub["mark"] for sub in subjects if sub.get("mark") is not None)
+    avg = total / len(subjects)
+    return grade_from_mark(int(round(avg))), avg >= 50.0
+
+
+def summary_of_student(student: Student) -> Optional[Summary]:
+    """Overall grade and PASS/FAIL of a live Student (None without subjects)."""
+    if not student.mark_count:
+        return None
+    return student.overall_grade, student.has_passed()
+
+
+class GradeAggregates:
+    """
+    Materialized admin reports: grade → student ids, PASS/FAIL id sets, and their sizes.
+
+    Built from one committed snapshot scan the first time a report needs it,
+    then kept up to date from the StudentRepository's events (sent once the
+    writes are committed): a registration, a saved
+    enrolment or drop, a removal or a clear moves at most one student
+    between sets, in O(1). Reports then cost O(output) instead of decoding
+    the whole population.
+
+    The repository bumps its `generation` for changes it cannot describe as
+    events (writes from another process, a session rollback); the sets are
+    rebuilt before the next report when that happens. Students without
+    subjects are in no set, matching Admin.group_by_grade/partition_pass_fail.
+
+    Each student's position in the store is remembered (new registrations
+    go last, as the store appends them), so the reports list members in
+    store order like a scan would.
+    """
+
+    def __init__(self, students: StudentRepository):
+        """
+        Subscribe to a repository's events (nothing is loaded yet).
+        """
+        self.students = students
+        self._lock = threading.RLock()
+        self._summaries: Dict[str, Summary] = {}
+        self._grades: Dict[str, Set[str]] = {grade: set() for grade in GRADE_ORDER}
+        self._status: Dict[str, Set[str]] = {"PASS": set(), "FAIL": set()}
+        self._ranks: Dict[str, int] = {}  # Student id → position in the store
+        self._next_rank = 0
+        self._synced: Optional[int] = None  # Repository generation the sets match; None = stale
+        students.subscribe(self._on_event)
+
+    # ---------- Building ----------
+
+    def rebuild(self) -> int:
+        """
+        Rebuild every set from a pinned snapshot of the committed store
+        (buffered session writes arrive as events when they commit).
+
+        Returns:
+            The number of students with a grade.
+        """
+        with self._lock:
+            generation = self.students.generation
+            self._summaries = {}
+            self._grades = {grade: set() for grade in GRADE_ORDER}
+            self._status = {"PASS": set(), "FAIL": set()}
+            self._ranks = {}
+            with self.students.store.snapshot() as snap:
+                for record in snap:
+                    sid = str(record["id"]).strip()
+                    self._ranks[sid] = len(self._ranks)
+                    self._place(sid, summary_of_record(record))
+            self._next_rank = len(self._ranks)
+            self._synced = generation
+            return len(self._summaries)
+
+    def _ensure_current(self) -> None:
+        """Rebuild if the repository saw changes that were not sent as events."""
+        self.students.refresh()  # Outside our lock: the repository calls _on_event() holding its own
+        with self._lock:
+            if self._synced != self.students.generation:
+                self.rebuild()
+
+    # ---------- Incremental updates ----------
+
+    def _place(self, student_id: str, summary: Optional[Summary]) -> None:
+        """Move one student to the sets matching its summary (or out of all of them)."""
+        old = self._summaries.pop(student_id, None)
+        if old is not None:
+            self._grades[old[0]].discard(student_id)
+            self._status["PASS" if old[1] else "FAIL"].discard(student_id)
+        if summary is not None:
+            self._summaries[student_id] = summary
+            self._grades[summary[0]].add(student_id)
+            self._status["PASS" if summary[1] else "FAIL"].add(student_id)
+
+    def _on_event(self, event: str, student_id: Optional[str], student: Optional[Student]) -> None:
+        with self._lock:
+            if event == EVENT_CLEARED:
+                self._summaries = {}
+                self._grades = {grade: set() for grade in GRADE_ORDER}
+                self._status = {"PASS": set(), "FAIL": set()}
+                self._ranks = {}
+                self._next_rank = 0
+                self._synced = self.students.generation
+            elif self._synced is None:
+                return  # Not built yet; the first report builds from the store
+            elif event in (EVENT_ADDED, EVENT_SAVED):
+                if student_id not in self._ranks:
+                    self._ranks[student_id] = self._next_rank
+                    self._next_rank += 1
+                self._place(student_id, summary_of_student(student))
+            elif event == EVENT_REMOVED:
+                self._ranks.pop(student_id, None)
+                self._place(student_id, None)
+
+    # ---------- Queries ----------
+
+    def _in_store_order(self, ids: Set[str]) -> List[str]:
+        return sorted(ids, key=self._ranks.__getitem__)
+
+    def grade_ids(self) -> Dict[str, List[str]]:
+        """Grade → ids of the students with that overall grade (in store order, grades in GRADE_ORDER)."""
+        self._ensure_current()
+        with self._lock:
+            return {grade: self._in_store_order(ids) for grade, ids in self._grades.items()}
+
+    def status_ids(self) -> Dict[str, List[str]]:
+        """PASS/FAIL → ids of the students in that group (in store order)."""
+        self._ensure_current()
+        with self._lock:
+            return {status: self._in_store_order(ids) for status, ids in self._status.items()}
+
+    def grade_counts(self) -> Dict[str, int]:
+        """Number of students per overall grade, in GRADE_ORDER."""
+        self._ensure_current()
+        with self._lock:
+            return {grade: len(ids) for grade, ids in self._grades.items()}
+
+    def status_counts(self) -> Dict[str, int]:
+        """Number of students who pass and fail."""
+        self._ensure_current()
+        with self._lock:
+            return {status: len(ids) for status, ids in self._status.items()}
@@ -0,0 +1,169 @@
+import mmap
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List
+
+try:
+    import fcntl
+except ImportError:  # Windows: allocations are serialized within a process only
+    fcntl = None
+
+# Student ids are 6-digit strings; id 0 ("000000") is the admin's and never allocated.
+# The bitmap has exactly one bit per id 0..ID_SPACE.
+ID_SPACE = 999_999
+BITMAP_BYTES = (ID_SPACE + 1) // 8
+
+# First byte of the bitmap that still has a free (zero) bit
+_FREE_BYTE = re.compile(b"[^\xff]")
+
+
+class IdAllocator:
+    """
+    Persistent, collision-free allocator for 6-digit student ids.
+
+    The file (`students.data.ids`) is a bitmap with one bit per id, mapped into
+    memory with mmap so every process sees the same state. Allocation scans
+    forward from a cursor for the first byte with a free bit (a C-level regex
+    search, amortized O(1)) and wraps around once to pick up released ids.
+    Allocations hold a thread lock plus, where available, an exclusive flock
+    on the file, so concurrent registrations never receive the same id.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the bitmap file at the given path.
+        """
+        self.path = path
+        self.created = not os.path.exists(path)
+        if self.created:
+            with open(path, "wb") as f:
+                f.write(b"\x01" + b"\0" * (BITMAP_BYTES - 1))  # Reserve id 0
+        self._lock = threading.Lock()
+        self._file = open(path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), BITMAP_BYTES)
+        self._cursor = 0
+
+    @classmethod
+    def for_database(cls, db) -> "IdAllocator":
+        """
+        Open the allocator stored next to a database, seeding a new bitmap
+        with the ids already in use.
+        """
+        allocator = cls(db.path + ".ids")
+        if allocator.created:
+            with db.snapshot() as snap:
+                allocator.mark_used(record["id"] for record in snap)
+        return allocator
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """
+        Hold the thread lock and the cross-process file lock. Writes to the
+        shared mapping are visible to other processes (and survive a crash of
+        this one) without an msync; only rebuild() and close() flush.
+        """
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    # ---------- Bits ----------
+
+    def _take(self) -> int:
+        """Claim the first free id at or after the cursor (wrapping once)."""
+        match = _FREE_BYTE.search(self._map, self._cursor // 8) or _FREE_BYTE.search(self._map)
+        if match is None:
+            raise ValueError("No student ids left to allocate")
+        index = match.start()
+        byte = self._map[index]
+        bit = (~byte & (byte + 1)).bit_length() - 1  # Lowest zero bit
+        sid = index * 8 + bit
+        self._map[index] = byte | (1 << bit)
+        self._cursor = sid + 1
+        return sid
+
+    def _set(self, sid: int, used: bool) -> None:
+        index, bit = divmod(sid, 8)
+        if used:
+            self._map[index] |= 1 << bit
+        else:
+            self._map[index] &= ~(1 << bit) & 0xFF
+
+    @staticmethod
+    def _parse(student_id) -> int:
+        """Numeric id, or -1 if it is outside the 6-digit space."""
+        try:
+            sid = int(str(student_id).strip())
+        except ValueError:
+            return -1
+        return sid if 0 < sid <= ID_SPACE else -1
+
+    # ---------- Public API ----------
+
+    def allocate(self) -> str:
+        """
+        Allocate one unused id.
+        """
+        with self._locked():
+            return f"{self._take():06d}"
+
+    def reserve(self, count: int) -> List[str]:
+        """
+        Allocate a block of `count` unused ids at once (e.g. for a bulk import).
+        """
+        with self._locked():
+            return [f"{self._take():06d}" for _ in range(count)]
+
+    def is_used(self, student_id: str) -> bool:
+        """True if the id is currently allocated."""
+        sid = self._parse(student_id)
+        return sid >= 0 and bool(self._map[sid // 8] & (1 << (sid % 8)))
+
+    def mark_used(self, student_ids: Iterable[str]) -> None:
+        """
+        Record ids that are already taken (e.g. by existing students).
+        """
+        with self._locked():
+            for student_id in student_ids:
+                sid = self._parse(student_id)
+                if sid >= 0:
+                    self._set(sid, True)
+
+    def release(self, student_id: str) -> None:
+        """
+        Return an id to the pool (after its student is deleted).
+        """
+        sid = self._parse(student_id)
+        if sid < 0:
+            return
+        with self._locked():
+            self._set(sid, False)
+            self._cursor = min(self._cursor, sid)
+
+    def rebuild(self, student_ids: Iterable[str]) -> None:
+        """
+        Reset the bitmap so exactly the given ids are in use.
+        """
+        with self._locked():
+            self._map[:] = b"\x01" + b"\0" * (BITMAP_BYTES - 1)
+            for student_id in student_ids:
+                sid = self._parse(student_id)
+                if sid >= 0:
+                    self._set(sid, True)
+            self._cursor = 0
+            self._map.flush()
+
+    def close(self) -> None:
+        """
+        Flush and close the mapping.
+        """
+        with self._lock:
+            self._map.flush()
+            self._map.close()
+            self._file.close()
@@ -0,0 +1,211 @@
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterator, List, Optional, Set, Tuple
+from db.database import Database
+from db.id_allocator import IdAllocator
+from db.index import normalize_email
+from models.user_model import User
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+
+def iter_rows(path: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Stream (line number, row) pairs from a CSV file with a header row
+    (name,email,password) or from a JSON Lines file (.jsonl / .ndjson).
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    row = {"_error": f"invalid JSON: {e}", "_raw": line.rstrip("\n")}
+                yield line_no, row if isinstance(row, dict) else {"_error": "not a JSON object", "_raw": row}
+        else:
+            # The header is line 1, so data rows start at line 2
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                yield line_no, row
+
+
+def validate_row(item: Tuple[int, dict]) -> Tuple[int, Optional[dict], str]:
+    """
+    Worker entry point: validate one row with the User validators.
+
+    Returns:
+        (line number, normalized record without an id, "") for a good row,
+        or (line number, None, reason) for a rejected one.
+    """
+    line_no, row = item
+    if "_error" in row:
+        return line_no, None, row["_error"]
+    name = str(row.get("name") or "").strip()
+    email = str(row.get("email") or "").strip()
+    password = str(row.get("password") or "").strip()
+    if not name:
+        return line_no, None, "missing name"
+    if not User.validate_email(email):
+        return line_no, None, "invalid email"
+    if not User.validate_password(password):
+        return line_no, None, "invalid password"
+    return line_no, {"name": name, "email": email.lower(), "password": password, "subjects": []}, ""
+
+
+class BulkImporter:
+    """
+    Imports a CSV/JSONL intake into any Database backend.
+
+    Rows are streamed in batches, validated in a process pool, deduplicated
+    against the stored emails (and earlier rows of the same file), given fresh
+    ids and committed with one upsert_many() per batch. After each successful
+    commit a checkpoint records the last line imported, so an interrupted run
+    resumes where it stopped. A batch that fails to commit stops the run
+    without a checkpoint (its reserved ids are released), so the next run
+    imports it again. Rejected rows are appended to a CSV report.
+    """
+
+    def __init__(self, db: Database, source: str, batch_size: Optional[int] = None,
+                 workers: Optional[int] = None):
+        self.db = db
+        self.source = source
+        self.batch_size = batch_size or DATABASE_CONFIG["import_batch_size"]
+        self.workers = workers or DATABASE_CONFIG["import_workers"] or os.cpu_count() or 1
+        self.checkpoint_path = source + ".checkpoint"
+        self.rejected_path = source + ".rejected.csv"
+        self.imported = 0
+        self.rejected = 0
+        self.failed = False  # Set when a batch failed to commit; rerun to resume
+        self._emails: Set[str] = set()
+        self.ids = IdAllocator.for_database(db)
+
+    # ---------- Checkpoints & report ----------
+
+    def _load_checkpoint(self) -> int:
+        """Return the last line committed by a previous run (0 if none)."""
+        if not os.path.exists(self.checkpoint_path):
+            return 0
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            state = json.load(f)
+        self.imported, self.rejected = state["imported"], state["rejected"]
+        return state["line"]
+
+    def _save_checkpoint(self, line_no: int) -> None:
+        """Atomically record progress up to and including `line_no`."""
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"line": line_no, "imported": self.imported, "rejected": self.rejected}, f)
+        os.replace(tmp, self.checkpoint_path)
+
+    def _report(self, rejects: List[Tuple[int, str, dict]]) -> None:
+        """Append rejected rows to the report (header written once)."""
+        if not rejects:
+            return
+        new_file = not os.path.exists(self.rejected_path)
+        with open(self.rejected_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(["line", "reason", "row"])
+            for line_no, reason, row in rejects:
+                writer.writerow([line_no, reason, json.dumps(row.get("_raw", row))])
+
+    # ---------- Dedup ----------
+
+    def _load_existing(self) -> None:
+        """Collect stored emails, from the secondary index where one is usable."""
+        for shard in getattr(self.db, "shards", [self.db]):
+            index = shard._usable_index() if getattr(shard, "index", None) is not None else None
+            if index is not None:
+                self._emails.update(index.emails)
+                continue
+            with shard.snapshot() as snap:
+                for record in snap:
+                    self._emails.add(normalize_email(record.get("email", "")))
+
+    # ---------- Import ----------
+
+    def _abandon(self, records: List[dict], reserved: List[str]) -> None:
+        """
+        Undo a batch that failed to commit: release its ids and forget its
+        emails. Ids that did get stored (backends that write record by
+        record) stay allocated.
+        """
+        for record, student_id in zip(records, reserved):
+            if self.db.get(student_id) is None:
+                self.ids.release(student_id)
+                self._emails.discard(record["email"])
+
+    def run(self) -> Tuple[int, int]:
+        """
+        Import the source file, resuming from the checkpoint if there is one.
+
+        Returns:
+            (students imported, rows rejected) over all runs of this import.
+            Check `failed` to tell a stopped run from a finished one.
+        """
+        resume_after = self._load_checkpoint()
+        if resume_after:
+            print(f"[DB] Resuming {self.source} after line {resume_after}")
+        self._load_existing()
+
+        rows = ((n, row) for n, row in iter_rows(self.source) if n > resume_after)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                records, rejects = [], []
+                chunksize = max(1, len(batch) // (self.workers * 4))
+                for (line_no, record, reason), (_, row) in zip(pool.map(validate_row, batch, chunksize=chunksize), batch):
+                    if record is None:
+                        rejects.append((line_no, reason, row))
+                    elif record["email"] in self._emails:
+                        rejects.append((line_no, "duplicate email", row))
+                    else:
+                        self._emails.add(record["email"])
+                        records.append(record)
+
+                # One block of ids per batch, allocated under a single lock
+                reserved = self.ids.reserve(len(records))
+                for record, student_id in zip(records, reserved):
+                    record["id"] = student_id
+
+                if records and not self.db.upsert_many(records):
+                    self._abandon(records, reserved)
+                    print(f"[ERROR][DB] Committing lines {batch[0][0]}-{batch[-1][0]} failed; rerun to resume")
+                    self.failed = True
+                    break
+                self._report(rejects)
+                self.imported += len(records)
+                self.rejected += len(rejects)
+                self._save_checkpoint(batch[-1][0])
+                print(f"[DB] Imported {self.imported} students ({self.rejected} rejected) up to line {batch[-1][0]}")
+        return self.imported, self.rejected
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import students from a CSV or JSON Lines file.")
+    parser.add_argument("source", help="CSV with a name,email,password header, or .jsonl")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--restart", action="store_true", help="ignore any checkpoint and rejected report")
+    args = parser.parse_args()
+
+    if args.restart:
+        for leftover in (args.source + ".checkpoint", args.source + ".rejected.csv"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    from db.backends import open_database  # Imported here to avoid a circular import with db.database.
+    db = open_database()
+    importer = BulkImporter(db, args.source, batch_size=args.batch_size, workers=args.workers)
+    imported, rejected = importer.run()
+    if importer.failed:
+        print(f"[DB] Stopped: {imported} imported, {rejected} rejected so far; run again to resume")
+    else:
+        print(f"[DB] Done: {imported} imported, {rejected} rejected (see {importer.rejected_path})")
+    db.close()
@@ -0,0 +1,161 @@
+import argparse
+import os
+import pickle
+from typing import Dict, Iterable, List, Optional, Tuple
+from db.wal import WriteAheadLog
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+# Index journal operations
+IDX_PUT = "put"
+IDX_DEL = "del"
+IDX_CLEAR = "clear"
+IDX_GENERATION = "generation"
+
+# Where a record lives in the snapshot: (list position, byte offset of its frame or None)
+Location = Optional[Tuple[int, Optional[int]]]
+
+
+def normalize_email(email: str) -> str:
+    """Key used by the email index (matches the controllers' case-insensitive lookups)."""
+    return str(email).strip().lower()
+
+
+class SecondaryIndex:
+    """
+    Persistent id → location and email → id indexes stored next to `students.data`.
+
+    The index is saved as a pickled snapshot (`students.data.idx`) plus a small
+    append-only journal (`students.data.idx.log`) of incremental updates. Both
+    record the data-file generation they describe; if it does not match the
+    data file on open, the index is stale and must be rebuilt.
+    """
+
+    def __init__(self, data_path: str):
+        """
+        Bind the index files to a data file (they are not loaded yet).
+        """
+        self.path = data_path + ".idx"
+        self.journal = WriteAheadLog(data_path + ".idx.log", fsync=DATABASE_CONFIG["log_fsync"])
+        self.ids: Dict[str, Tuple[Location, str]] = {}
+        self.emails: Dict[str, str] = {}
+        self.generation = None
+
+    # ---------- Loading & saving ----------
+
+    def load(self, generation) -> bool:
+        """
+        Load the index from disk.
+
+        Returns:
+            True if the index exists and matches the given data-file generation.
+        """
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+            self.ids, self.emails, self.generation = state["ids"], state["emails"], state["generation"]
+            for entry in self.journal.replay()[0]:
+                self._apply(entry)
+        except Exception as e:
+            print(f"[ERROR][DB] Failed reading index {self.path}: {e}")
+            return False
+        return self.generation == generation
+
+    def save(self) -> None:
+        """
+        Write the whole index atomically and empty the journal.
+        """
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"generation": self.generation, "ids": self.ids, "emails": self.emails}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.journal.replace(b"")
+
+    # ---------- Updates ----------
+
+    def _apply(self, entry: tuple) -> None:
+        """Apply one journal entry in memory."""
+        op = entry[0]
+        if op == IDX_PUT:
+            _, rid, email, location = entry
+            self._remove(rid)
+            self.ids[rid] = (location, email)
+            self.emails[email] = rid
+        elif op == IDX_DEL:
+            self._remove(entry[1])
+        elif op == IDX_CLEAR:
+            self.ids.clear()
+            self.emails.clear()
+        elif op == IDX_GENERATION:
+            self.generation = entry[1]
+
+    def _remove(self, rid: str) -> None:
+        old = self.ids.pop(rid, None)
+        if old is not None and self.emails.get(old[1]) == rid:
+            del self.emails[old[1]]
+
+    def apply(self, changes: List[tuple], generation) -> None:
+        """
+        Record incremental changes for a write that produced `generation`.
+        Folds the journal into a fresh snapshot once it outgrows the index.
+        """
+        entries = changes + [(IDX_GENERATION, generation)]
+        for entry in entries:
+            self._apply(entry)
+        log_size = self.journal.append(entries)
+        if log_size >= max(DATABASE_CONFIG["compact_min_log_bytes"], os.path.getsize(self.path) if os.path.exists(self.path) else 0):
+            self.save()
+
+    def rebuild(self, entries: Iterable[Tuple[dict, Location]], generation) -> int:
+        """
+        Rebuild both indexes from scratch from (record, location) pairs.
+
+        Returns:
+            The number of records indexed.
+        """
+        self.ids, self.emails = {}, {}
+        for record, location in entries:
+            rid = str(record.get("id", "")).strip()
+            email = normalize_email(record.get("email", ""))
+            self.ids[rid] = (location, email)
+            self.emails[email] = rid
+        self.generation = generation
+        self.save()
+        return len(self.ids)
+
+    # ---------- Lookups ----------
+
+    def id_for_email(self, email: str) -> Optional[str]:
+        """Student id registered under an email, or None."""
+        return self.emails.get(normalize_email(email))
+
+    def location(self, student_id: str) -> Location:
+        """Stored location of a student id, or None if it is not indexed."""
+        entry = self.ids.get(str(student_id).strip())
+        return entry[0] if entry else None
+
+    def __contains__(self, student_id: str) -> bool:
+        return str(student_id).strip() in self.ids
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the students.data secondary indexes.")
+    parser.add_argument("command", choices=("check", "rebuild"))
+    args = parser.parse_args()
+
+    DATABASE_CONFIG["secondary_indexes"] = True
+    DATABASE_CONFIG["index_autorebuild"] = False
+    from db.backends import open_database  # Imported here to avoid a circular import with db.database.
+    db = open_database()
+    shards = getattr(db, "shards", [db])
+    for shard in shards:
+        if not hasattr(shard, "index"):
+            print(f"[DB] {shard.path} uses the backend's own indexes")
+        elif args.command == "rebuild":
+            print(f"[DB] Rebuilt index for {shard.path}: {shard.rebuild_index()} students")
+        else:
+            print(f"[DB] Index for {shard.path}: {'valid' if shard.index_valid else 'stale'}")
+    db.close()
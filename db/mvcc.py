@@ -0,0 +1,109 @@
+import threading
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+# Token stored before any generation has been installed (never equal to a real token)
+_UNSET = object()
+
+
+class Snapshot:
+    """
+    Immutable view of the stored records as of one generation.
+
+    Writers never modify an installed generation (they install a new one),
+    so a snapshot can be read without locks for as long as it is held.
+    Records are shared with other readers and must be treated as read-only.
+    Release the snapshot when done, or use it as a context manager.
+    """
+
+    def __init__(self, generation, records: Tuple[dict, ...], on_release: Callable[[], None]):
+        self.generation = generation
+        self.records = records
+        self._on_release: Optional[Callable[[], None]] = on_release
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def get(self, student_id: str) -> Optional[dict]:
+        """Record with the given id in this generation, or None."""
+        sid = str(student_id).strip()
+        return next((r for r in self.records if str(r.get("id", "")).strip() == sid), None)
+
+    def find_by_email(self, email: str) -> Optional[dict]:
+        """Record with the given email (case-insensitive) in this generation, or None."""
+        e = email.strip().lower()
+        return next((r for r in self.records if str(r.get("email", "")).strip().lower() == e), None)
+
+    def release(self) -> None:
+        """Unpin the generation so it can be reclaimed. Safe to call twice."""
+        if self._on_release is not None:
+            self._on_release()
+            self._on_release = None
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class VersionStore:
+    """
+    Numbered generations of a record set, with reader pins.
+
+    install() publishes a new generation copy-on-write; pin() hands out the
+    current one. A superseded generation is dropped as soon as no reader
+    pins it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = 0
+        self.token = _UNSET
+        self._versions: Dict[int, Tuple[dict, ...]] = {0: ()}
+        self._pins: Dict[int, int] = {}
+
+    def install(self, records: Sequence[dict], token) -> int:
+        """
+        Publish `records` as the next generation, tagged with the on-disk
+        token it was built from.
+
+        Returns:
+            The new generation number.
+        """
+        frozen = tuple(records)
+        with self._lock:
+            self.current += 1
+            self._versions[self.current] = frozen
+            self.token = token
+            self._reclaim()
+            return self.current
+
+    def pin(self) -> Snapshot:
+        """
+        Pin the current generation and return a snapshot of it.
+        """
+        with self._lock:
+            generation = self.current
+            self._pins[generation] = self._pins.get(generation, 0) + 1
+            records = self._versions[generation]
+        return Snapshot(generation, records, lambda: self._release(generation))
+
+    def _release(self, generation: int) -> None:
+        with self._lock:
+            self._pins[generation] -= 1
+            if not self._pins[generation]:
+                del self._pins[generation]
+            self._reclaim()
+
+    def _reclaim(self) -> None:
+        """Drop superseded generations that no reader pins."""
+        for generation in [g for g in self._versions if g != self.current and g not in self._pins]:
+            del self._versions[generation]
+
+    def live_generations(self) -> list:
+        """Generation numbers still held in memory (current plus pinned)."""
+        with self._lock:
+            return sorted(self._versions)
@@ -0,0 +1,583 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from db.database import Database, T
+from db.mvcc import VersionStore
+from db.wal import OP_UPSERT, OP_PATCH, OP_DELETE
+from models.subject_model import GRADE_ORDER, MAX_SUBJECTS
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+try:
+    import fcntl
+except ImportError:  # Windows: access is serialized within a process only
+    fcntl = None
+
+MAGIC = b"STUREC01"
+VERSION = 1
+
+# magic, version, capacity (slots allocated), high_water (slots ever used), free_head (-1 = none)
+HEADER = struct.Struct("<8sIIIi")
+
+# Stored after the header: the write generation, bumped by every write from any process,
+# and the number of the string table the slots point into (a rewrite starts a new one)
+GENERATION = struct.Struct("<Q")
+TABLE = struct.Struct("<I")
+TABLE_OFFSET = HEADER.size + GENERATION.size
+HEADER_SIZE = TABLE_OFFSET + TABLE.size
+
+# Per-subject layout: subject id (uint16), mark (uint8, 255 = none), grade index (uint8)
+SUBJECT = "HBB"
+
+# Slot layout: used flag, student id, (offset, length) of name/email/password in the
+# string table, subject count, MAX_SUBJECTS subjects, next free slot (-1 = none)
+SLOT = struct.Struct("<BI" + "QI" * 3 + "B" + SUBJECT * MAX_SUBJECTS + "i")
+
+SLOT_FIELDS = len(SLOT.unpack(bytes(SLOT.size)))
+
+NO_MARK = 255
+INITIAL_CAPACITY = 64
+
+
+class RecordFileDatabase(Database):
+    """
+    Fixed-width binary record store opened through mmap.
+
+    Every student occupies one SLOT of the same size, so a student can be read or
+    rewritten in place by slot number without decoding the rest of the file.
+    Deleted slots are chained into a free list and reused by later inserts.
+    Variable-length strings (name, email, password) live in an append-only side
+    table and are referenced from the slot by (offset, length).
+
+    Subject titles are not stored: they are always rebuilt as "Subject-<id>".
+
+    Several processes may share the file. Every access holds a flock on it
+    (shared for reads, exclusive for writes), and every write bumps a
+    generation counter in the header. A process that finds the counter moved
+    re-indexes its id → slot map, remapping the file first if another
+    process grew it; the counter is also the backend's change_token().
+
+    write_to_file(), clear_all() and compact() build a new file and a new
+    string table instead, and swap the file in with os.replace(), so a crash
+    or a record that cannot be encoded leaves the old contents intact. A
+    process holding the replaced file reopens it the next time it locks it.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (or create) the record file and its string table.
+        """
+        if path is None:
+            os.makedirs(DATABASE_CONFIG["directory"], exist_ok=True)
+            path = os.path.join(DATABASE_CONFIG["directory"], DATABASE_CONFIG["record_filename"])
+        self.path = path
+        self.strings_path = path + ".strings"
+        self.log_structured = False
+        self.wal = None
+        print(f"[DB] Using {self.path}")
+
+        self._lock = threading.RLock()
+        self._ensure_file()
+        self.versions = VersionStore()
+        self._held: Optional[bool] = None  # None = no flock held; else whether it is exclusive
+        self._open()
+
+    def _ensure_file(self):
+        """
+        Create an empty record file and its string table if the file does not exist.
+        """
+        if not os.path.exists(self.path):
+            print(f"[DEBUG][DB] Creating new record file at {self.path}")
+            with open(self.path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, INITIAL_CAPACITY, 0, -1) + GENERATION.pack(0) + TABLE.pack(0))
+                f.write(b"\0" * (SLOT.size * INITIAL_CAPACITY))
+            open(self.strings_path, "wb").close()
+
+    def _open(self) -> None:
+        """Open and map the record file; _sync() opens the string table it names."""
+        self._file = open(self.path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._strings = None
+        self._table: Optional[int] = None
+        self._slots: Dict[str, int] = {}
+        self._generation = -1  # Generation the slot map was built at; -1 = never
+
+    def _close_files(self) -> None:
+        self._map.close()
+        self._file.close()
+        if self._strings is not None:
+            self._strings.close()
+
+    def _strings_path(self, table: int) -> str:
+        """Path of string table number `table` (0 is the one created with the file)."""
+        return self.strings_path if table == 0 else f"{self.strings_path}.{table}"
+
+    # ---------- Locking ----------
+
+    @contextmanager
+    def _locked(self, write: bool = False) -> Iterator[None]:
+        """
+        Hold the thread lock and, where available, a flock on the record file:
+        shared for reads, exclusive for writes. Nested holds reuse the outer
+        flock, upgrading it for a write. The outermost hold first catches up
+        with writes made by other processes.
+        """
+        with self._lock:
+            outer = self._held
+            if outer is None or (write and not outer):
+                self._acquire(write)
+                self._held = write
+            try:
+                if outer is None:
+                    self._sync()
+                yield
+            finally:
+                if outer is None:
+                    if fcntl is not None:
+                        fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+                    self._held = None
+                elif write and not outer:
+                    if fcntl is not None:
+                        fcntl.flock(self._file.fileno(), fcntl.LOCK_SH)
+                    self._held = outer
+
+    def _acquire(self, write: bool) -> None:
+        """
+        Take the flock, reopening the file first if another process replaced
+        it with a rewritten one (see _rewrite()) while we waited.
+        """
+        if fcntl is None:
+            return
+        while True:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX if write else fcntl.LOCK_SH)
+            if os.fstat(self._file.fileno()).st_nlink:
+                return
+            self._close_files()  # Also drops the flock on the replaced file
+            self._open()
+
+    def _sync(self) -> None:
+        """
+        Re-index the slots if any process wrote since the map was built,
+        remapping the file first if it was grown elsewhere and opening the
+        string table it now points into.
+        """
+        generation = GENERATION.unpack_from(self._map, HEADER.size)[0]
+        if generation == self._generation:
+            return
+        capacity, _, _ = self._header()
+        if len(self._map) != self._offset(capacity):
+            self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        table = TABLE.unpack_from(self._map, TABLE_OFFSET)[0]
+        if table != self._table:
+            if self._strings is not None:
+                self._strings.close()
+            # Unbuffered: other processes append to it
+            self._strings = open(self._strings_path(table), "r+b", buffering=0)
+            self._table = table
+        self._index_slots()
+        self._generation = generation
+
+    def _bump(self) -> None:
+        """Advance the header's generation after a write (exclusive flock held)."""
+        self._generation = GENERATION.unpack_from(self._map, HEADER.size)[0] + 1
+        GENERATION.pack_into(self._map, HEADER.size, self._generation)
+
+    # ---------- Header & slots ----------
+
+    def _header(self) -> Tuple[int, int, int]:
+        """Return (capacity, high_water, free_head)."""
+        magic, version, capacity, high_water, free_head = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a student record file")
+        if version != VERSION:
+            raise ValueError(f"{self.path} has unsupported record file version {version}")
+        return capacity, high_water, free_head
+
+    def _set_header(self, capacity: int, high_water: int, free_head: int) -> None:
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, capacity, high_water, free_head)
+
+    @staticmethod
+    def _offset(slot: int) -> int:
+        return HEADER_SIZE + slot * SLOT.size
+
+    def _index_slots(self) -> None:
+        """Build the id → slot map from the fixed-width fields only."""
+        _, high_water, _ = self._header()
+        self._slots = {}
+        for slot in range(high_water):
+            used, sid = struct.unpack_from("<BI", self._map, self._offset(slot))
+            if used:
+                self._slots[f"{sid:06d}"] = slot
+
+    def _grow(self, capacity: int) -> None:
+        """Extend the file to hold `capacity` slots and remap it."""
+        self._map.flush()
+        self._map.close()
+        self._file.truncate(self._offset(capacity))
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        _, high_water, free_head = self._header()
+        self._set_header(capacity, high_water, free_head)
+
+    def _allocate_slot(self) -> int:
+        """Pop a slot off the free list, or take the next unused one."""
+        capacity, high_water, free_head = self._header()
+        if free_head >= 0:
+            next_free = SLOT.unpack_from(self._map, self._offset(free_head))[-1]
+            self._set_header(capacity, high_water, next_free)
+            return free_head
+        if high_water >= capacity:
+            self._grow(capacity * 2)
+            capacity *= 2
+        self._set_header(capacity, high_water + 1, free_head)
+        return high_water
+
+    def _free_slot(self, slot: int) -> None:
+        """Mark a slot unused and push it onto the free list."""
+        capacity, high_water, free_head = self._header()
+        values = [0] * SLOT_FIELDS
+        values[-1] = free_head
+        SLOT.pack_into(self._map, self._offset(slot), *values)
+        self._set_header(capacity, high_water, slot)
+
+    # ---------- String table ----------
+
+    def _read_string(self, offset: int, length: int) -> str:
+        self._strings.seek(offset)
+        return self._strings.read(length).decode("utf-8")
+
+    def _write_string(self, value: str) -> Tuple[int, int]:
+        data = str(value).encode("utf-8")
+        self._strings.seek(0, os.SEEK_END)
+        offset = self._strings.tell()
+        self._strings.write(data)
+        return offset, len(data)
+
+    # ---------- Record encoding ----------
+
+    def _decode_slot(self, slot: int) -> dict:
+        """Turn a slot back into a record dict."""
+        values = SLOT.unpack_from(self._map, self._offset(slot))
+        _, sid, name_off, name_len, email_off, email_len, pwd_off, pwd_len, count = values[:9]
+        subjects = []
+        for i in range(count):
+            sub_id, mark, grade = values[9 + i * 3: 12 + i * 3]
+            subjects.append({
+                "id": f"{sub_id:03d}",
+                "title": f"Subject-{sub_id:03d}",
+                "mark": None if mark == NO_MARK else mark,
+                "grade": GRADE_ORDER[grade],
+            })
+        return {
+            "id": f"{sid:06d}",
+            "name": self._read_string(name_off, name_len),
+            "email": self._read_string(email_off, email_len),
+            "password": self._read_string(pwd_off, pwd_len),
+            "subjects": subjects,
+        }
+
+    def _encode_record(self, record: dict, previous: Optional[dict]) -> tuple:
+        """
+        Build slot values for a record, appending only strings that changed.
+        """
+        strings = []
+        for i, key in enumerate(("name", "email", "password")):
+            value = str(record.get(key, ""))
+            if previous is not None and previous[key] == value:
+                old = SLOT.unpack_from(self._map, self._offset(self._slots[previous["id"]]))
+                strings.extend(old[2 + i * 2: 4 + i * 2])
+            else:
+                strings.extend(self._write_string(value))
+        return self._slot_values(record, strings)
+
+    def _slot_values(self, record: dict, strings: List[int]) -> tuple:
+        """Slot values for a record whose strings are at the given (offset, length) pairs."""
+        subjects = record.get("subjects", [])
+        if len(subjects) > MAX_SUBJECTS:
+            raise ValueError(f"record {record.get('id')} has more than {MAX_SUBJECTS} subjects")
+        packed = []
+        for sub in subjects:
+            mark = sub.get("mark")
+            packed.extend((int(sub["id"]), NO_MARK if mark is None else int(mark), GRADE_ORDER.index(sub["grade"])))
+        packed.extend([0] * (3 * (MAX_SUBJECTS - len(subjects))))
+        return (1, int(self._record_id(record)), *strings, len(subjects), *packed, -1)
+
+    # ---------- Database interface ----------
+
+    def read_from_file(self) -> List:
+        """
+        Decode every used slot.
+        """
+        return list(self.iterate())
+
+    def write_to_file(self, data_list: List):
+        """
+        Replace all stored students with the given list.
+        """
+        try:
+            with self._locked(write=True):
+                self._rewrite(data_list)
+        except Exception as e:
+            print(f"[ERROR][DB] Failed writing {self.path}: {e}")
+
+    def get(self, student_id: str) -> Optional[dict]:
+        """
+        Read a single student by id straight from its slot.
+        """
+        with self._locked():
+            slot = self._slots.get(str(student_id).strip())
+            return None if slot is None else self._decode_slot(slot)
+
+    def find_by_email(self, email: str) -> Optional[dict]:
+        """
+        Scan slots comparing only the email string, decoding just the match.
+        """
+        e = email.strip().lower()
+        with self._locked():
+            for slot in self._slots.values():
+                values = SLOT.unpack_from(self._map, self._offset(slot))
+                if self._read_string(values[4], values[5]).strip().lower() == e:
+                    return self._decode_slot(slot)
+        return None
+
+    def _upsert(self, record: dict) -> None:
+        """Write one record to its slot (raises if it cannot be encoded)."""
+        rid = self._record_id(record)
+        with self._locked(write=True):
+            slot = self._slots.get(rid)
+            previous = self._decode_slot(slot) if slot is not None else None
+            values = self._encode_record(record, previous)
+            if slot is None:
+                slot = self._allocate_slot()
+            self._strings.flush()
+            SLOT.pack_into(self._map, self._offset(slot), *values)
+            self._slots[rid] = slot
+            self._bump()
+            self._map.flush()
+
+    def _patch(self, student_id: str, changes: dict) -> bool:
+        """Merge changed fields into one slot; False if there is no such student."""
+        sid = str(student_id).strip()
+        with self._locked(write=True):
+            slot = self._slots.get(sid)
+            if slot is None:
+                return False
+            previous = self._decode_slot(slot)
+            values = self._encode_record({**previous, **changes}, previous)
+            self._strings.flush()
+            SLOT.pack_into(self._map, self._offset(slot), *values)
+            self._bump()
+            self._map.flush()
+            return True
+
+    def upsert(self, record: dict) -> bool:
+        """
+        Rewrite the student's slot in place, or allocate a new slot.
+
+        Returns:
+            True if the record was written.
+        """
+        try:
+            self._upsert(record)
+            return True
+        except Exception as e:
+            print(f"[ERROR][DB] Failed upserting into {self.path}: {e}")
+            return False
+
+    def patch(self, student_id: str, changes: dict) -> bool:
+        """
+        Rewrite the student's slot with the changed fields merged in; unchanged
+        strings are reused, so only new values are appended to the string table.
+        """
+        try:
+            return self._patch(student_id, changes)
+        except Exception as e:
+            print(f"[ERROR][DB] Failed patching {self.path}: {e}")
+            return False
+
+    def upsert_many(self, records: List[dict]) -> bool:
+        """
+        Write each student to its slot (slots are already updated in place).
+
+        Returns:
+            True if every record was written. Slots are written one at a
+            time, so after a failure the records before it stay written.
+        """
+        try:
+            with self._locked(write=True):
+                for record in records:
+                    self._upsert(record)
+            return True
+        except Exception as e:
+            print(f"[ERROR][DB] Failed upserting into {self.path}: {e}")
+            return False
+
+    def commit_batch(self, entries: List[tuple]) -> bool:
+        """
+        Apply a batch of upsert / patch / delete entries under one lock hold.
+        A patch of a missing student fails the batch before anything is
+        written. Slots are rewritten in place, so unlike the other backends a
+        crash (or a record that cannot be encoded) part-way through can leave
+        only some of them applied.
+        """
+        try:
+            with self._locked(write=True):
+                self._check_patches(entries, self._slots.__contains__)
+                for op, payload in entries:
+                    if op == OP_UPSERT:
+                        self._upsert(payload)
+                    elif op == OP_PATCH:
+                        self._patch(*payload)
+                    elif op == OP_DELETE:
+                        self.delete(payload)
+            return True
+        except Exception as e:
+            print(f"[ERROR][DB] Failed committing a batch to {self.path}: {e}")
+            return False
+
+    def delete(self, student_id: str) -> bool:
+        """
+        Free the student's slot for reuse.
+        """
+        with self._locked(write=True):
+            slot = self._slots.pop(str(student_id).strip(), None)
+            if slot is None:
+                return False
+            self._free_slot(slot)
+            self._bump()
+            self._map.flush()
+            return True
+
+    def iterate(self) -> Iterator[dict]:
+        """
+        Yield used slots in slot order.
+        """
+        with self._locked():
+            slots = sorted(self._slots.values())
+        for slot in slots:
+            with self._locked():
+                if not self._map[self._offset(slot)]:
+                    continue  # Deleted while iterating
+                record = self._decode_slot(slot)
+            yield record
+
+    def map_shards(self, func: Callable[[Iterator[dict]], T]) -> List[T]:
+        """
+        The whole file is one shard, read from one pinned snapshot
+        (slots are rewritten in place, so a plain scan could mix versions).
+        """
+        with self.snapshot() as snap:
+            return [func(iter(snap))]
+
+    def _version_token(self):
+        """The header's write generation."""
+        return self.change_token()
+
+    def _version_records(self) -> List:
+        """Decode every used slot while holding off writers (in every process)."""
+        with self._locked():
+            return list(self.iterate())
+
+    def _rewrite(self, records: Iterable[dict]) -> None:
+        """
+        Replace every stored record with `records` (exclusive flock held).
+
+        The slots and a new string table are built in fresh files, fsynced,
+        and the record file is swapped in with os.replace(), so a failure at
+        any point leaves the old file in use. Raises on failure.
+        """
+        table = self._table + 1
+        strings = bytearray()
+        slots: Dict[str, tuple] = {}  # Id → slot values; a repeated id keeps its first position
+        for record in records:
+            refs: List[int] = []
+            for key in ("name", "email", "password"):
+                data = str(record.get(key, "")).encode("utf-8")
+                refs.extend((len(strings), len(data)))
+                strings += data
+            slots[self._record_id(record)] = self._slot_values(record, refs)
+        capacity = INITIAL_CAPACITY
+        while capacity < len(slots):
+            capacity *= 2
+        image = bytearray(self._offset(capacity))
+        HEADER.pack_into(image, 0, MAGIC, VERSION, capacity, len(slots), -1)
+        GENERATION.pack_into(image, HEADER.size, self._generation + 1)
+        TABLE.pack_into(image, TABLE_OFFSET, table)
+        for slot, values in enumerate(slots.values()):
+            SLOT.pack_into(image, self._offset(slot), *values)
+
+        directory = os.path.dirname(self.path) or "."
+        with open(self._strings_path(table), "wb") as f:  # Unused until the new file points at it
+            self._copy_mode(f.fileno(), self._strings_path(self._table))
+            f.write(strings)
+            f.flush()
+            os.fsync(f.fileno())
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".", suffix=".tmp", dir=directory)
+        try:
+            self._copy_mode(fd, self.path)
+            with os.fdopen(fd, "wb") as f:
+                f.write(image)
+                f.flush()
+                os.fsync(f.fileno())
+            if fcntl is None:
+                self._close_files()  # Windows cannot replace a mapped file
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            if fcntl is None and self._file.closed:
+                self._open()
+                self._sync()
+            raise
+        self._fsync_directory(directory)
+
+        old_table, old_files = self._table, (self._map, self._file, self._strings)
+        self._open()
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)  # Before letting go of the old file
+            old_files[0].close()
+            old_files[1].close()  # Releases its flock; waiting processes then reopen
+            old_files[2].close()
+        self._sync()
+        try:
+            os.remove(self._strings_path(old_table))
+        except OSError:
+            pass  # Still open elsewhere on Windows; it is overwritten by a later rewrite
+
+    def clear_all(self):
+        """
+        Delete every record.
+        """
+        with self._locked(write=True):
+            self._rewrite([])
+
+    def compact(self) -> None:
+        """
+        Rewrite the file and string table keeping only strings referenced by
+        live slots. A failure leaves the old file in use.
+        """
+        try:
+            with self._locked(write=True):
+                self._rewrite(list(self.iterate()))
+        except Exception as e:
+            print(f"[ERROR][DB] Compaction of {self.path} failed: {e}")
+
+    def change_token(self):
+        """
+        The header's write generation, bumped by every write from any process.
+        """
+        with self._locked():
+            return self._generation
+
+    def close(self) -> None:
+        """
+        Flush and close the mapping and underlying files.
+        """
+        with self._lock:
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+            self._strings.close()
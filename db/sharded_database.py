@@ -0,0 +1,219 @@
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
+from db.database import Database, T
+from db.mvcc import Snapshot
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+
+def shard_for(student_id: str, shard_count: int) -> int:
+    """
+    Pick the shard that owns a student id.
+    Uses CRC32 rather than hash() so the mapping is stable across processes.
+    """
+    return zlib.crc32(str(student_id).strip().encode("utf-8")) % shard_count
+
+
+def _run_on_shard(args: tuple):
+    """
+    Worker entry point: load one shard file and apply `func` to its records.
+    """
+    path, log_structured, func = args
+    shard = Database(path=path, log_structured=log_structured, verbose=False)
+    return shard.map_shards(func)[0]
+
+
+class ShardedDatabase(Database):
+    """
+    Spreads students across N shard files chosen by a hash of the student id.
+
+    Each shard is an ordinary Database (pickle snapshot, optionally
+    log-structured), so a write only rewrites the shard that owns the student.
+    Whole-population scans go through map_shards(), which loads the shards in
+    parallel worker processes and returns one partial result per shard.
+    """
+
+    def __init__(self, path: Optional[str] = None, shard_count: Optional[int] = None,
+                 log_structured: Optional[bool] = None):
+        """
+        Open (or create) every shard file.
+        """
+        if path is None:
+            os.makedirs(DATABASE_CONFIG["directory"], exist_ok=True)
+            path = os.path.join(DATABASE_CONFIG["directory"], DATABASE_CONFIG["filename"])
+        if log_structured is None:
+            log_structured = DATABASE_CONFIG["log_structured"]
+        self.path = path
+        self.log_structured = log_structured
+        self.wal = None
+        self.shard_count = shard_count or DATABASE_CONFIG["shard_count"]
+
+        stem, ext = os.path.splitext(path)
+        self.shards: List[Database] = [
+            Database(path=f"{stem}.shard-{i:02d}{ext}", log_structured=log_structured, verbose=False)
+            for i in range(self.shard_count)
+        ]
+        print(f"[DB] Using {self.shard_count} shards of {self.path}")
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _shard(self, student_id: str) -> Database:
+        """The shard that owns the given student id."""
+        return self.shards[shard_for(student_id, self.shard_count)]
+
+    # ---------- Database interface ----------
+
+    def read_from_file(self) -> List:
+        """
+        Read every shard and concatenate the records.
+        """
+        return [record for shard in self.shards for record in shard.read_from_file()]
+
+    def write_to_file(self, data_list: List):
+        """
+        Redistribute the given records across the shards and rewrite every shard.
+        """
+        buckets: Dict[int, List] = {i: [] for i in range(self.shard_count)}
+        for record in data_list:
+            buckets[shard_for(self._record_id(record), self.shard_count)].append(record)
+        for i, shard in enumerate(self.shards):
+            shard.write_to_file(buckets[i])
+
+    def get(self, student_id: str) -> Optional[dict]:
+        """
+        Read a student from its owning shard only.
+        """
+        return self._shard(student_id).get(student_id)
+
+    def find_by_email(self, email: str) -> Optional[dict]:
+        """
+        Ask each shard in turn (each uses its own email index when enabled).
+        """
+        for shard in self.shards:
+            record = shard.find_by_email(email)
+            if record is not None:
+                return record
+        return None
+
+    def upsert(self, record: dict) -> bool:
+        """
+        Write a student to its owning shard only; True if it was written.
+        """
+        return self._shard(self._record_id(record)).upsert(record)
+
+    def patch(self, student_id: str, changes: dict) -> bool:
+        """
+        Update a student's changed fields in its owning shard only.
+        """
+        return self._shard(student_id).patch(student_id, changes)
+
+    def upsert_many(self, records: List[dict]) -> bool:
+        """
+        Write each shard's share of the records in one commit per shard.
+
+        Returns:
+            True if every shard's commit succeeded (a failed one does not undo the others).
+        """
+        buckets: Dict[int, List] = {}
+        for record in records:
+            buckets.setdefault(shard_for(self._record_id(record), self.shard_count), []).append(record)
+        return all([self.shards[i].upsert_many(bucket) for i, bucket in buckets.items()])
+
+    def commit_batch(self, entries: List[tuple]) -> bool:
+        """
+        Commit each shard's share of the batch atomically within that shard
+        (the batch as a whole is not atomic across shards).
+        """
+        buckets: Dict[int, List] = {}
+        for entry in entries:
+            buckets.setdefault(shard_for(self._entry_id(entry), self.shard_count), []).append(entry)
+        return all([self.shards[i].commit_batch(bucket) for i, bucket in buckets.items()])
+
+    def delete(self, student_id: str) -> bool:
+        """
+        Delete a student from its owning shard only.
+        """
+        return self._shard(student_id).delete(student_id)
+
+    def iterate(self) -> Iterator[dict]:
+        """
+        Yield the records of each shard in turn.
+        """
+        for shard in self.shards:
+            yield from shard.iterate()
+
+    def map_shards(self, func: Callable[[Iterator[dict]], T]) -> List[T]:
+        """
+        Load the shards in parallel worker processes and apply `func` to each.
+        Falls back to in-process loading when parallel scans are disabled.
+        """
+        if not DATABASE_CONFIG["parallel_scan"] or self.shard_count == 1:
+            return [part for shard in self.shards for part in shard.map_shards(func)]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=min(self.shard_count, os.cpu_count() or 1))
+        jobs = [(shard.path, self.log_structured, func) for shard in self.shards]
+        return list(self._pool.map(_run_on_shard, jobs))
+
+    def snapshot(self) -> Snapshot:
+        """
+        Pin one generation of every shard and present them as a single snapshot.
+        Each shard is consistent on its own; a student lives in exactly one shard.
+        """
+        parts = [shard.snapshot() for shard in self.shards]
+        records = tuple(record for part in parts for record in part)
+
+        def release():
+            for part in parts:
+                part.release()
+
+        return Snapshot(tuple(part.generation for part in parts), records, release)
+
+    def clear_all(self):
+        """
+        Empty every shard.
+        """
+        for shard in self.shards:
+            shard.clear_all()
+
+    def compact(self) -> None:
+        """
+        Compact every shard.
+        """
+        for shard in self.shards:
+            shard.compact()
+
+    def cache_stats(self) -> dict:
+        """
+        Read cache counters summed over all shards.
+        """
+        stats = [shard.cache_stats() for shard in self.shards]
+        return {"hits": sum(s["hits"] for s in stats), "misses": sum(s["misses"] for s in stats)}
+
+    def change_token(self):
+        """
+        The change tokens of every shard.
+        """
+        return tuple(shard.change_token() for shard in self.shards)
+
+    def close(self) -> None:
+        """
+        Close every shard and shut down the worker pool.
+        """
+        for shard in self.shards:
+            shard.close()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def migrate_to_shards(source: Database, target: ShardedDatabase) -> int:
+    """
+    Copy every record from a single-file database into a sharded one.
+
+    Returns:
+        The number of students migrated.
+    """
+    records = source.read_from_file()
+    target.write_to_file(records)
+    return len(records)
@@ -0,0 +1,335 @@
+import argparse
+import os
+import sqlite3
+import threading
+from typing import Callable, Iterator, List, Optional
+from db.database import Database, T
+from db.mvcc import VersionStore
+from db.wal import OP_UPSERT, OP_PATCH, OP_DELETE
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id       TEXT PRIMARY KEY,
+    name     TEXT NOT NULL,
+    email    TEXT NOT NULL,
+    password TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_students_email ON students (lower(email));
+CREATE TABLE IF NOT EXISTS subjects (
+    student_id TEXT    NOT NULL REFERENCES students (id) ON DELETE CASCADE,
+    id         TEXT    NOT NULL,
+    title      TEXT    NOT NULL,
+    mark       INTEGER,
+    grade      TEXT,
+    position   INTEGER NOT NULL,
+    PRIMARY KEY (student_id, id)
+);
+"""
+
+# One row per (student, subject); students without subjects have NULL subject columns
+SELECT_JOINED = """
+SELECT s.id, s.name, s.email, s.password, sub.id, sub.title, sub.mark, sub.grade
+FROM students s
+LEFT JOIN subjects sub ON sub.student_id = s.id
+{where}
+ORDER BY s.rowid, sub.position
+"""
+
+
+class SQLiteDatabase(Database):
+    """
+    SQLite-backed implementation of the Database interface.
+
+    Students live in a `students` table keyed by id, with a UNIQUE index on the
+    lowercased email, and their subjects in a `subjects` child table. Lookups by
+    id or email are indexed point queries instead of full-file scans. The file
+    runs in WAL journal mode so readers do not block the writer.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (or create) the SQLite file and make sure the schema exists.
+        """
+        if path is None:
+            os.makedirs(DATABASE_CONFIG["directory"], exist_ok=True)
+            path = os.path.join(DATABASE_CONFIG["directory"], DATABASE_CONFIG["sqlite_filename"])
+        self.path = path
+        self.log_structured = False
+        self.wal = None
+        print(f"[DB] Using {self.path}")
+
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+        self.versions = VersionStore()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection in WAL mode with foreign keys enabled."""
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    # ---------- Row mapping ----------
+
+    @staticmethod
+    def _records_from_rows(rows) -> Iterator[dict]:
+        """Group joined student/subject rows back into record dicts."""
+        current: Optional[dict] = None
+        for sid, name, email, password, sub_id, title, mark, grade in rows:
+            if current is None or current["id"] != sid:
+                if current is not None:
+                    yield current
+                current = {"id": sid, "name": name, "email": email, "password": password, "subjects": []}
+            if sub_id is not None:
+                current["subjects"].append({"id": sub_id, "title": title, "mark": mark, "grade": grade})
+        if current is not None:
+            yield current
+
+    def _query_one(self, where: str, params: tuple) -> Optional[dict]:
+        """Run a joined query expected to match at most one student."""
+        with self._lock:
+            rows = self._conn.execute(SELECT_JOINED.format(where=where), params).fetchall()
+        return next(self._records_from_rows(rows), None)
+
+    def _write_record(self, conn: sqlite3.Connection, record: dict) -> None:
+        """Insert or update one student and replace their subject rows."""
+        sid = self._record_id(record)
+        conn.execute(
+            "INSERT INTO students (id, name, email, password) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET name = excluded.name, email = excluded.email, "
+            "password = excluded.password",
+            (sid, record.get("name", ""), record.get("email", ""), record.get("password", "")),
+        )
+        conn.execute("DELETE FROM subjects WHERE student_id = ?", (sid,))
+        conn.executemany(
+            "INSERT INTO subjects (student_id, id, title, mark, grade, position) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (sid, sub["id"], sub["title"], sub.get("mark"), sub.get("grade"), pos)
+                for pos, sub in enumerate(record.get("subjects", []))
+            ],
+        )
+
+    def _patch_record(self, conn: sqlite3.Connection, sid: str, changes: dict) -> bool:
+        """Update one student's changed columns (and subjects); False if there is no such student."""
+        columns = [col for col in ("name", "email", "password") if col in changes]
+        if columns:
+            assignments = ", ".join(f"{col} = ?" for col in columns)
+            found = conn.execute(f"UPDATE students SET {assignments} WHERE id = ?",
+                                 [changes[col] for col in columns] + [sid]).rowcount > 0
+        else:
+            found = conn.execute("SELECT 1 FROM students WHERE id = ?", (sid,)).fetchone() is not None
+        if found and "subjects" in changes:
+            conn.execute("DELETE FROM subjects WHERE student_id = ?", (sid,))
+            conn.executemany(
+                "INSERT INTO subjects (student_id, id, title, mark, grade, position) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (sid, sub["id"], sub["title"], sub.get("mark"), sub.get("grade"), pos)
+                    for pos, sub in enumerate(changes["subjects"])
+                ],
+            )
+        return found
+
+    # ---------- Database interface ----------
+
+    def read_from_file(self) -> List:
+        """
+        Read every student record from the database.
+        """
+        return list(self.iterate())
+
+    def write_to_file(self, data_list: List):
+        """
+        Replace all stored students with the given list in one transaction.
+        """
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM subjects")
+                self._conn.execute("DELETE FROM students")
+                for record in data_list:
+                    self._write_record(self._conn, record)
+        except Exception as e:
+            print(f"[ERROR][DB] Failed writing {self.path}: {e}")
+
+    def get(self, student_id: str) -> Optional[dict]:
+        """
+        Return the record with the given id (primary key lookup).
+        """
+        return self._query_one("WHERE s.id = ?", (str(student_id).strip(),))
+
+    def find_by_email(self, email: str) -> Optional[dict]:
+        """
+        Return the record with the given email (uses the lower(email) index).
+        """
+        return self._query_one("WHERE lower(s.email) = ?", (email.strip().lower(),))
+
+    def upsert(self, record: dict) -> bool:
+        """
+        Insert or update a single student and their subjects.
+
+        Returns:
+            True if the row was written; False if it was rejected (e.g. its
+            email is already registered under another id).
+        """
+        try:
+            with self._lock, self._conn:
+                self._write_record(self._conn, record)
+            return True
+        except Exception as e:
+            print(f"[ERROR][DB] Failed upserting into {self.path}: {e}")
+            return False
+
+    def patch(self, student_id: str, changes: dict) -> bool:
+        """
+        UPDATE only the changed student columns; subject rows are rewritten
+        only when the subjects changed. Aggregates are not stored here.
+        """
+        try:
+            with self._lock, self._conn:
+                return self._patch_record(self._conn, str(student_id).strip(), changes)
+        except Exception as e:
+            print(f"[ERROR][DB] Failed patching {self.path}: {e}")
+            return False
+
+    def upsert_many(self, records: List[dict]) -> bool:
+        """
+        Insert or update many students in one transaction.
+
+        Returns:
+            True if the transaction committed.
+        """
+        try:
+            with self._lock, self._conn:
+                for record in records:
+                    self._write_record(self._conn, record)
+            return True
+        except Exception as e:
+            print(f"[ERROR][DB] Failed upserting into {self.path}: {e}")
+            return False
+
+    def commit_batch(self, entries: List[tuple]) -> bool:
+        """
+        Apply a batch of upsert / patch / delete entries in one transaction.
+        A rejected row or a patch of a missing student rolls it all back.
+
+        Returns:
+            True if the transaction committed.
+        """
+        try:
+            with self._lock, self._conn:
+                for op, payload in entries:
+                    if op == OP_UPSERT:
+                        self._write_record(self._conn, payload)
+                    elif op == OP_PATCH:
+                        if not self._patch_record(self._conn, *payload):
+                            raise ValueError(f"cannot patch student {payload[0]}: no such record")
+                    elif op == OP_DELETE:
+                        self._conn.execute("DELETE FROM students WHERE id = ?", (payload,))
+            return True
+        except Exception as e:
+            print(f"[ERROR][DB] Failed committing a batch to {self.path}: {e}")
+            return False
+
+    def delete(self, student_id: str) -> bool:
+        """
+        Delete a student (their subjects cascade).
+        """
+        try:
+            with self._lock, self._conn:
+                cur = self._conn.execute("DELETE FROM students WHERE id = ?", (str(student_id).strip(),))
+            return cur.rowcount > 0
+        except Exception as e:
+            print(f"[ERROR][DB] Failed deleting from {self.path}: {e}")
+            return False
+
+    def iterate(self) -> Iterator[dict]:
+        """
+        Stream every student in insertion order.
+        Uses its own connection so a long scan does not hold the writer's lock.
+        """
+        conn = self._connect()
+        try:
+            yield from self._records_from_rows(conn.execute(SELECT_JOINED.format(where="")))
+        finally:
+            conn.close()
+
+    def map_shards(self, func: Callable[[Iterator[dict]], T]) -> List[T]:
+        """
+        The whole database is one shard. A single SELECT already reads a
+        consistent snapshot, so `func` consumes it as a stream.
+        """
+        return [func(self.iterate())]
+
+    def _version_token(self):
+        """Always build a fresh generation; SQLite tracks its own versions."""
+        return None
+
+    def _version_records(self) -> List:
+        """One SELECT reads a consistent snapshot of the WAL-mode database."""
+        return list(self.iterate())
+
+    def clear_all(self):
+        """
+        Delete every student and subject row.
+        """
+        self.write_to_file([])
+
+    def compact(self) -> None:
+        """
+        Checkpoint the WAL journal back into the main database file.
+        """
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def change_token(self):
+        """
+        SQLite's data_version (bumped by other connections' commits) plus the
+        changes made through this connection.
+        """
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0], self._conn.total_changes
+
+    def close(self) -> None:
+        """
+        Close the underlying connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_pickle_to_sqlite(pickle_path: str, sqlite_path: str) -> int:
+    """
+    One-shot import of an existing `students.data` into a SQLite file.
+
+    The source is read through Database, so every snapshot format and
+    compression codec is understood, and in log-structured mode the
+    `students.data.log` tail that has not been compacted yet is replayed.
+
+    Returns:
+        The number of students migrated.
+    """
+    if not os.path.exists(pickle_path):
+        raise FileNotFoundError(pickle_path)
+    source = Database(path=pickle_path, log_structured=os.path.exists(pickle_path + ".log"), verbose=False)
+    try:
+        records = list(source.iterate())
+    finally:
+        source.close()
+    target = SQLiteDatabase(sqlite_path)
+    try:
+        if not target.upsert_many(records):
+            raise RuntimeError(f"Migrating {pickle_path} to {sqlite_path} failed")
+    finally:
+        target.close()
+    print(f"[DB] Migrated {len(records)} students from {pickle_path} to {sqlite_path}")
+    return len(records)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate students.data into SQLite.")
+    parser.add_argument("--source", default=os.path.join(DATABASE_CONFIG["directory"], DATABASE_CONFIG["filename"]))
+    parser.add_argument("--target", default=os.path.join(DATABASE_CONFIG["directory"], DATABASE_CONFIG["sqlite_filename"]))
+    args = parser.parse_args()
+    migrate_pickle_to_sqlite(args.source, args.target)
@@ -0,0 +1,370 @@
+import threading
+import weakref
+from dataclasses import fields
+from typing import Callable, Dict, Iterable, List, Optional, Union
+from db.index import normalize_email
+from db.unit_of_work import UnitOfWork
+from models.student_model import Student
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+# Change token seen before the first check (never equal to a real token)
+_UNSET = object()
+
+# Events passed to subscribers as (event, student id, Student or None)
+EVENT_ADDED = "added"      # A new student was stored (registration)
+EVENT_SAVED = "saved"      # A student's changes were stored (enrol, drop, password)
+EVENT_REMOVED = "removed"  # A student was deleted
+EVENT_CLEARED = "cleared"  # Every student was deleted
+
+Listener = Callable[[str, Optional[str], Optional[Student]], None]
+
+
+class StudentRepository:
+    """
+    Loads and saves Students, keeping one live object per student id.
+
+    The identity map is weak: a Student stays mapped for as long as anything
+    (a controller's current_student, a roster on screen) holds it, so every
+    controller and page that asks for the same id gets the same object, and
+    a change made through one is seen by all. Unreferenced students are
+    dropped and decoded again on the next load.
+
+    A normalized-email index makes find_by_email and email_exists O(1). It is
+    built from one snapshot the first time it is needed; entries start as the
+    stored records and become the live Students on first use.
+
+    Both are tagged with the store's change token. Writes made through the
+    repository keep them current; when anything else writes, live students
+    without unsaved changes are reloaded in place and the email index is
+    rebuilt on its next use. Backends that cannot report a change token are
+    read on every load instead.
+
+    `db` may be a UnitOfWork, in which case saves are buffered until commit().
+
+    Derived state (e.g. the admin grade aggregates) can subscribe() to the
+    writes made through the repository. Events describe committed state:
+    writes buffered in a session are announced when the session commits and
+    dropped if it rolls back. Changes it cannot describe as events (writes
+    from elsewhere, a rollback) bump `generation` instead, telling
+    subscribers to rebuild.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.RLock()
+        self._students: "weakref.WeakValueDictionary[str, Student]" = weakref.WeakValueDictionary()
+        self._emails: Optional[Dict[str, Union[dict, Student]]] = None
+        self._token = _UNSET
+        self._listeners: List[Listener] = []
+        self._deferred: List[tuple] = []  # Events of buffered writes, sent when the session commits
+        self._student_locks: "weakref.WeakValueDictionary[str, threading.RLock]" = weakref.WeakValueDictionary()
+        self.generation = 0
+        if isinstance(db, UnitOfWork):
+            db.add_rollback_listener(self._rolled_back)
+            db.add_commit_listener(self._committed)
+
+    @property
+    def store(self):
+        """The backend under the session; reads from it see committed state only."""
+        return self.db.db if isinstance(self.db, UnitOfWork) else self.db
+
+    # ---------- Identity map ----------
+
+    @staticmethod
+    def _assign(student: Student, record: dict) -> None:
+        """Overwrite a live student in place with a stored record."""
+        stored = Student.from_dict(record)
+        for f in fields(Student):
+            setattr(student, f.name, getattr(stored, f.name))
+
+    def _adopt(self, record: dict, refresh: bool = False) -> Student:
+        """The live Student for a stored record, decoding it if nobody holds one."""
+        sid = str(record["id"]).strip()
+        student = self._students.get(sid)
+        if student is None:
+            student = self._students[sid] = Student.from_dict(record)
+        elif refresh and not student.is_dirty():
+            self._assign(student, record)
+        return student
+
+    def _check(self) -> bool:
+        """
+        Catch up with writes made elsewhere. Returns False if the backend
+        cannot tell (then every load must go to the store).
+        """
+        token = self.db.change_token()
+        if token is None:
+            return False
+        if token != self._token:
+            for sid, student in list(self._students.items()):
+                if student.is_dirty():
+                    continue
+                record = self.db.get(sid)
+                if record is None:
+                    self._students.pop(sid, None)  # Removed elsewhere
+                else:
+                    self._assign(student, record)
+            self._emails = None
+            self._token = token
+            self.generation += 1
+        return True
+
+    def refresh(self) -> None:
+        """Catch up with writes made elsewhere now (bumping `generation` if there were any)."""
+        with self._lock:
+            self._check()
+
+    def lock(self, student_id: str) -> threading.RLock:
+        """
+        The lock serializing read-modify-write actions on one live student
+        (e.g. two enrolments started from the UI at once). Every controller
+        sharing the repository gets the same lock for an id; it is dropped
+        once nobody holds it.
+        """
+        sid = str(student_id).strip()
+        with self._lock:
+            lock = self._student_locks.get(sid)
+            if lock is None:
+                lock = self._student_locks[sid] = threading.RLock()
+            return lock
+
+    # ---------- Events ----------
+
+    def subscribe(self, listener: Listener) -> None:
+        """Call `listener(event, student_id, student)` after every write made through the repository."""
+        self._listeners.append(listener)
+
+    def _emit(self, event: str, student_id: Optional[str] = None, student: Optional[Student] = None,
+              committed: bool = False) -> None:
+        """Send an event now, or when the session commits if the write was buffered."""
+        if not committed and isinstance(self.db, UnitOfWork) and not self.db.autocommit:
+            self._deferred.append((event, student_id, student))
+            return
+        for listener in self._listeners:
+            listener(event, student_id, student)
+
+    def _committed(self) -> None:
+        """Session listener: the buffered writes are stored, so send their events."""
+        with self._lock:
+            deferred, self._deferred = self._deferred, []
+            for event in deferred:
+                self._emit(*event, committed=True)
+
+    def _email_index(self) -> Dict[str, Union[dict, Student]]:
+        """The email index, built from one snapshot if needed."""
+        if self._emails is None:
+            with self.db.snapshot() as snap:
+                self._emails = {
+                    normalize_email(record.get("email", "")): self._students.get(str(record["id"]).strip(), record)
+                    for record in snap
+                }
+        return self._emails
+
+    def _wrote(self, before, student: Student) -> None:
+        """Keep the caches in step with a write that moved the change token from `before`."""
+        self._students[student.id] = student
+        if before is not None and before == self._token:
+            if self._emails is not None:
+                self._emails[normalize_email(student.email)] = student
+            self._token = self.db.change_token()
+        else:
+            self._emails = None
+
+    # ---------- Loading ----------
+
+    def get(self, student_id: str) -> Optional[Student]:
+        """The live Student with the given id, or None if there is none."""
+        sid = str(student_id).strip()
+        with self._lock:
+            tracked = self._check()
+            if tracked:
+                student = self._students.get(sid)
+                if student is not None:
+                    return student
+            record = self.db.get(sid)
+            return self._adopt(record, refresh=not tracked) if record is not None else None
+
+    def get_many(self, student_ids: Iterable[str], committed: bool = False) -> Dict[str, Student]:
+        """
+        Id → live Student for the given ids that exist. Up to DATABASE_CONFIG["repository_point_loads"] students that nobody
+        holds are read one by one; more than that are picked out of one snapshot.
+
+        With `committed`, students with uncommitted session writes are
+        decoded from the store instead (detached copies), so the result
+        matches what other readers of the store see.
+        """
+        sids = [str(sid).strip() for sid in student_ids]
+        if committed and isinstance(self.db, UnitOfWork):
+            pending = self.db.pending_ids()
+            if pending:
+                found = self.get_many([sid for sid in sids if sid not in pending])
+                for sid in pending.intersection(sids):
+                    record = self.store.get(sid)
+                    if record is not None:
+                        found[sid] = Student.from_dict(record)
+                return found
+        with self._lock:
+            tracked = self._check()
+            found = {sid: self._students.get(sid) for sid in sids} if tracked else {}
+            missing = {sid for sid in sids if found.get(sid) is None}
+            if len(missing) <= DATABASE_CONFIG["repository_point_loads"]:
+                for sid in missing:
+                    record = self.db.get(sid)
+                    found[sid] = self._adopt(record, refresh=not tracked) if record is not None else None
+            else:
+                with self.db.snapshot() as snap:
+                    for record in snap:
+                        sid = str(record["id"]).strip()
+                        if sid in missing:
+                            found[sid] = self._adopt(record, refresh=not tracked)
+        return {sid: student for sid, student in found.items() if student is not None}
+
+    def exists(self, student_id: str) -> bool:
+        """True if a student with the given id is stored (without decoding it)."""
+        sid = str(student_id).strip()
+        with self._lock:
+            if self._check() and sid in self._students:
+                return True
+            return self.db.get(sid) is not None
+
+    def find_by_email(self, email: str) -> Optional[Student]:
+        """The live Student with the given email (case-insensitive), or None."""
+        key = normalize_email(email)
+        with self._lock:
+            if not self._check():
+                record = self.db.find_by_email(key)
+                return self._adopt(record, refresh=True) if record is not None else None
+            index = self._email_index()
+            entry = index.get(key)
+            if isinstance(entry, dict):
+                entry = index[key] = self._adopt(entry)
+            return entry
+
+    def email_exists(self, email: str) -> bool:
+        """True if the email is registered (without decoding the student)."""
+        key = normalize_email(email)
+        with self._lock:
+            if not self._check():
+                return self.db.find_by_email(key) is not None
+            return key in self._email_index()
+
+    def reload(self, student: Student) -> bool:
+        """
+        Discard a live student's unsaved changes by reloading it in place.
+
+        Returns:
+            False if the student is not stored (it is then dropped from the map).
+        """
+        with self._lock:
+            record = self.db.get(student.id)
+            if record is None:
+                self._students.pop(student.id, None)
+                return False
+            self._assign(student, record)
+            return True
+
+    # ---------- Saving ----------
+
+    def add(self, student: Student) -> bool:
+        """
+        Store a new student whole and make it the live object for its id.
+
+        Returns:
+            False if the store rejected it (it is then neither mapped nor announced).
+        """
+        with self._lock:
+            tracked = self._check()
+            before = self._token if tracked else None
+            if not self.db.upsert(student.to_dict()):
+                return False
+            student.mark_clean()
+            self._wrote(before, student)
+            self._emit(EVENT_ADDED, student.id, student)
+            return True
+
+    def save(self, student: Student) -> bool:
+        """
+        Store a student's changed fields (nothing is written if nothing
+        changed). A student missing from the store is written whole.
+
+        Returns:
+            False if the store rejected the write; the student's unsaved
+            changes are then discarded by reloading it in place.
+        """
+        if not student.is_dirty():
+            return True
+        with self._lock:
+            tracked = self._check()
+            before = self._token if tracked else None
+            if not (self.db.patch(student.id, student.delta()) or self.db.upsert(student.to_dict())):
+                self.reload(student)
+                return False
+            student.mark_clean()
+            self._wrote(before, student)
+            self._emit(EVENT_SAVED, student.id, student)
+            return True
+
+    def remove(self, student_id: str, immediate: bool = False) -> Optional[dict]:
+        """
+        Delete a student and drop it from the map. With `immediate` the
+        delete goes straight to the store instead of into the session
+        (which is neither committed nor otherwise touched).
+
+        Returns:
+            The removed record, or None if there was no such student.
+        """
+        sid = str(student_id).strip()
+        immediate = immediate and isinstance(self.db, UnitOfWork)
+        with self._lock:
+            before = self._token if self._check() else None
+            record = self.db.get(sid)
+            if record is None or not (self.db.delete_now(sid) if immediate else self.db.delete(sid)):
+                return None
+            self._students.pop(sid, None)
+            if before is not None and before == self._token:
+                if self._emails is not None:
+                    self._emails.pop(normalize_email(record.get("email", "")), None)
+                self._token = self.db.change_token()
+            else:
+                self._emails = None
+            self._emit(EVENT_REMOVED, sid, committed=immediate)
+            return record
+
+    def clear(self) -> None:
+        """Delete every student and empty the map."""
+        with self._lock:
+            self.db.clear_all()
+            self._students.clear()
+            self._emails = None
+            self._token = self.db.change_token()
+            self._emit(EVENT_CLEARED, committed=True)
+
+    # ---------- Session ----------
+
+    def commit(self) -> bool:
+        """Write the session's buffered changes (no-op without a UnitOfWork)."""
+        if isinstance(self.db, UnitOfWork):
+            return self.db.commit()
+        return True
+
+    def rollback(self) -> None:
+        """
+        Discard the session's buffered changes; live students are reloaded
+        in place with their stored state (and dropped if never stored).
+        """
+        if isinstance(self.db, UnitOfWork):
+            self.db.rollback()  # Calls _rolled_back()
+
+    def _rolled_back(self) -> None:
+        """
+        Session listener: after any rollback (including a failed commit) the
+        live students were marked clean by save() but hold changes that were
+        never written, so reload every one of them.
+        """
+        with self._lock:
+            self._deferred = []
+            for student in list(self._students.values()):
+                self.reload(student)
+            self._emails = None
+            self._token = self.db.change_token()
+            self.generation += 1
@@ -0,0 +1,321 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+from models.subject_model import subject_title
+from resources.parameters.app_parameters import SUBJECT_CONFIG
+
+try:
+    import fcntl
+except ImportError:  # Windows: updates are serialized within a process only
+    fcntl = None
+
+# Subject ids are 3-digit strings "001".."999"; slot 0 is unused
+SUBJECT_SPACE = 999
+
+# Header: reopen counter (bumped whenever a subject may have become available again)
+# and enrolment counter (bumped by every change to an enrolment count)
+HEADER = struct.Struct("<QQ")
+# Per-subject slot: offered flag, capacity (0 = unlimited), current enrolments
+SLOT = struct.Struct("<BxxxII")
+CATALOG_BYTES = HEADER.size + SLOT.size * (SUBJECT_SPACE + 1)
+
+
+class SubjectCatalog:
+    """
+    Persistent catalog of the subjects on offer, with per-subject enrolment counts.
+
+    The file (`students.data.subjects`) holds one fixed-size slot per subject id,
+    mapped into memory with mmap, so the id index is direct addressing: looking
+    up, enrolling in or dropping a subject is O(1). Counter updates hold a thread
+    lock plus, where available, an exclusive flock on the file, so concurrent
+    enrolments never push a subject past its capacity.
+
+    Subjects with free places are also kept in an in-memory list (with each id's
+    position in it), so claim() picks a random available subject in O(1) and a
+    subject that fills up is swapped out in O(1).
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the catalog file at the given path. A new catalog
+        offers subjects 1..SUBJECT_CONFIG["catalog_size"] with the default capacity.
+        """
+        self.path = path
+        self.created = not os.path.exists(path)
+        if self.created:
+            capacity = SUBJECT_CONFIG["default_capacity"] or 0
+            with open(path, "wb") as f:
+                f.write(bytes(HEADER.size + SLOT.size))  # Header and the unused slot 0
+                for sid in range(1, SUBJECT_SPACE + 1):
+                    f.write(SLOT.pack(sid <= SUBJECT_CONFIG["catalog_size"], capacity, 0))
+        self._lock = threading.RLock()
+        self._file = open(path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), CATALOG_BYTES)
+        self._rng = random.Random()
+        self._available: List[int] = []
+        self._position: Dict[int, int] = {}
+        self._seen_version = -1
+
+    @classmethod
+    def for_database(cls, db) -> "SubjectCatalog":
+        """
+        Open the catalog stored next to a database, seeding the counts of a
+        new catalog from the stored enrolments.
+        """
+        catalog = cls(db.path + ".subjects")
+        if catalog.created:
+            with db.snapshot() as snap:
+                catalog.rebuild_counts(snap)
+        return catalog
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the thread lock and the cross-process file lock."""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    # ---------- Slots ----------
+
+    @staticmethod
+    def _offset(sid: int) -> int:
+        return HEADER.size + sid * SLOT.size
+
+    def _slot(self, sid: int) -> tuple:
+        """(offered, capacity, enrolled) of one subject."""
+        return SLOT.unpack_from(self._map, self._offset(sid))
+
+    def _set_slot(self, sid: int, offered: bool, capacity: int, enrolled: int) -> None:
+        SLOT.pack_into(self._map, self._offset(sid), offered, capacity, enrolled)
+
+    def _bump_version(self) -> None:
+        """Tell every process to rebuild its available list."""
+        version, changes = HEADER.unpack_from(self._map, 0)
+        HEADER.pack_into(self._map, 0, version + 1, changes)
+
+    def _bump_changes(self) -> None:
+        """Count one change to the enrolment counts."""
+        version, changes = HEADER.unpack_from(self._map, 0)
+        HEADER.pack_into(self._map, 0, version, changes + 1)
+
+    @staticmethod
+    def _parse(subject_id) -> int:
+        """Numeric id, or -1 if it is not a subject id."""
+        try:
+            sid = int(str(subject_id).strip())
+        except ValueError:
+            return -1
+        return sid if 0 < sid <= SUBJECT_SPACE else -1
+
+    @staticmethod
+    def _has_room(offered: int, capacity: int, enrolled: int) -> bool:
+        return bool(offered) and (capacity == 0 or enrolled < capacity)
+
+    # ---------- Available list ----------
+
+    def _refresh(self) -> None:
+        """Rebuild the available list if any process may have reopened a subject."""
+        version = HEADER.unpack_from(self._map, 0)[0]
+        if version == self._seen_version:
+            return
+        self._available = [sid for sid in range(1, SUBJECT_SPACE + 1) if self._has_room(*self._slot(sid))]
+        self._position = {sid: i for i, sid in enumerate(self._available)}
+        self._seen_version = version
+
+    def _discard(self, sid: int) -> None:
+        """Swap-remove a subject from the available list in O(1)."""
+        i = self._position.pop(sid, None)
+        if i is None:
+            return
+        last = self._available.pop()
+        if last != sid:
+            self._available[i] = last
+            self._position[last] = i
+
+    # ---------- Lookups ----------
+
+    def get(self, subject_id: str) -> Optional[dict]:
+        """
+        The catalog entry for a subject id, or None if it is not offered.
+        """
+        sid = self._parse(subject_id)
+        if sid < 0:
+            return None
+        offered, capacity, enrolled = self._slot(sid)
+        if not offered:
+            return None
+        return {"id": f"{sid:03d}", "title": subject_title(f"{sid:03d}"),
+                "capacity": capacity or None, "enrolled": enrolled}
+
+    def changes(self) -> int:
+        """
+        Number of enrolment count changes made so far by any process. Lets
+        derived indexes (EnrolmentIndex) detect enrolments they did not see.
+        """
+        return HEADER.unpack_from(self._map, 0)[1]
+
+    def enrolled(self, subject_id: str) -> int:
+        """Current number of students enrolled in a subject."""
+        sid = self._parse(subject_id)
+        return self._slot(sid)[2] if sid > 0 else 0
+
+    def subjects(self) -> List[dict]:
+        """Every offered subject, in id order."""
+        return [entry for entry in (self.get(f"{sid:03d}") for sid in range(1, SUBJECT_SPACE + 1)) if entry]
+
+    # ---------- Enrolment counters ----------
+
+    def claim(self, exclude: Iterable[str] = ()) -> Optional[str]:
+        """
+        Pick a random subject with a free place that is not in `exclude`
+        (the student's current subjects) and count the enrolment.
+
+        Returns:
+            The subject id, or None if no subject is available.
+        """
+        excluded = {self._parse(s) for s in exclude}
+        with self._locked():
+            self._refresh()
+            while self._available:
+                candidates = len(self._available)
+                if candidates <= len(excluded):
+                    # Almost nothing left: fall back to a scan of the few remaining subjects
+                    choices = [sid for sid in self._available if sid not in excluded]
+                    if not choices:
+                        return None
+                    sid = self._rng.choice(choices)
+                else:
+                    sid = self._available[self._rng.randrange(candidates)]
+                    if sid in excluded:
+                        continue
+                offered, capacity, enrolled = self._slot(sid)
+                if not self._has_room(offered, capacity, enrolled):
+                    self._discard(sid)  # Filled (or withdrawn) by another process
+                    continue
+                self._set_slot(sid, offered, capacity, enrolled + 1)
+                self._bump_changes()
+                if capacity and enrolled + 1 >= capacity:
+                    self._discard(sid)
+                return f"{sid:03d}"
+        return None
+
+    def enrol(self, subject_id: str) -> bool:
+        """
+        Count an enrolment in a specific subject.
+
+        Returns:
+            False if the subject is not offered or is full.
+        """
+        sid = self._parse(subject_id)
+        if sid < 0:
+            return False
+        with self._locked():
+            offered, capacity, enrolled = self._slot(sid)
+            if not self._has_room(offered, capacity, enrolled):
+                return False
+            self._set_slot(sid, offered, capacity, enrolled + 1)
+            self._bump_changes()
+            if capacity and enrolled + 1 >= capacity:
+                self._discard(sid)
+            return True
+
+    def drop(self, subject_id: str) -> None:
+        """
+        Count a student leaving a subject, reopening it if it was full.
+        """
+        sid = self._parse(subject_id)
+        if sid < 0:
+            return
+        with self._locked():
+            offered, capacity, enrolled = self._slot(sid)
+            if enrolled == 0:
+                return
+            self._set_slot(sid, offered, capacity, enrolled - 1)
+            self._bump_changes()
+            if capacity and enrolled >= capacity and offered:
+                self._bump_version()
+
+    # ---------- Administration ----------
+
+    def offer(self, subject_id: str, capacity: Optional[int] = None) -> None:
+        """
+        Offer a subject (or change its capacity; None = unlimited).
+        """
+        sid = self._parse(subject_id)
+        if sid < 0:
+            raise ValueError(f"Subject ids are 001..{SUBJECT_SPACE:03d}")
+        with self._locked():
+            enrolled = self._slot(sid)[2]
+            self._set_slot(sid, True, capacity or 0, enrolled)
+            self._bump_version()
+
+    def withdraw(self, subject_id: str) -> None:
+        """
+        Stop offering a subject. Existing enrolments are kept and still counted.
+        """
+        sid = self._parse(subject_id)
+        if sid < 0:
+            return
+        with self._locked():
+            _, capacity, enrolled = self._slot(sid)
+            self._set_slot(sid, False, capacity, enrolled)
+            self._discard(sid)
+
+    def rebuild_counts(self, records: Iterable[dict]) -> None:
+        """
+        Recount every subject's enrolments from stored student records.
+        """
+        counts = [0] * (SUBJECT_SPACE + 1)
+        for record in records:
+            for sub in record.get("subjects", ()):
+                sid = self._parse(sub.get("id"))
+                if sid > 0:
+                    counts[sid] += 1
+        with self._locked():
+            for sid in range(1, SUBJECT_SPACE + 1):
+                offered, capacity, _ = self._slot(sid)
+                self._set_slot(sid, offered, capacity, counts[sid])
+            self._bump_version()
+            self._bump_changes()
+            self._map.flush()
+
+    def close(self) -> None:
+        """
+        Flush and close the mapping.
+        """
+        with self._lock:
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or recount the subject catalog.")
+    parser.add_argument("command", choices=("list", "recount"))
+    parser.add_argument("--backend", choices=("pickle", "sharded", "sqlite", "record"), default=None)
+    args = parser.parse_args()
+
+    from db.backends import open_database  # Imported here to avoid a circular import with db.database.
+    db = open_database(args.backend)
+    catalog = SubjectCatalog.for_database(db)
+    if args.command == "recount":
+        with db.snapshot() as snap:
+            catalog.rebuild_counts(snap)
+        print(f"[DB] Recounted enrolments in {catalog.path}")
+    else:
+        for entry in catalog.subjects():
+            if entry["enrolled"] or entry["capacity"]:
+                capacity = entry["capacity"] or "unlimited"
+                print(f"{entry['title']}: {entry['enrolled']} enrolled (capacity {capacity})")
+    catalog.close()
+    db.close()
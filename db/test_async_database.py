@@ -0,0 +1,57 @@
+import asyncio
+import threading
+from db.async_database import AsyncDatabase
+from db.database import Database
+
+
+def _record(sid: str) -> dict:
+    return {"id": sid, "name": f"Student {sid}", "email": f"s{sid}@university.com", "password": "Password123",
+            "subjects": []}
+
+
+def _async_database(tmp_path) -> AsyncDatabase:
+    return AsyncDatabase(Database(path=str(tmp_path / "students.data"), log_structured=False, verbose=False),
+                         workers=2, scan_workers=1)
+
+
+def test_calls_run_off_the_event_loop(tmp_path):
+    adb = _async_database(tmp_path)
+
+    async def main():
+        assert await adb.upsert(_record("000001"))
+        assert (await adb.find_by_email("S000001@university.com"))["id"] == "000001"
+        point = await adb.run(lambda: threading.current_thread().name)
+        scan = await adb.run_scan(lambda: threading.current_thread().name)
+        return point, scan
+
+    point, scan = asyncio.run(main())
+    assert point.startswith("db-io") and scan.startswith("db-scan")
+    adb.close()
+
+
+def test_iterate_yields_every_record_in_batches(tmp_path):
+    adb = _async_database(tmp_path)
+    adb.db.write_to_file([_record(f"{i:06d}") for i in range(1, 26)])
+
+    async def main():
+        return [record["id"] async for record in adb.iterate(batch_size=4)]
+
+    assert asyncio.run(main()) == [f"{i:06d}" for i in range(1, 26)]
+    adb.close()
+
+
+def test_a_running_scan_does_not_hold_up_point_reads(tmp_path):
+    adb = _async_database(tmp_path)
+    adb.db.upsert(_record("000001"))
+    release = threading.Event()
+
+    async def main():
+        scan = asyncio.ensure_future(adb.run_scan(release.wait, 5))  # Fills the only scan worker
+        record = await asyncio.wait_for(adb.get("000001"), timeout=2)
+        assert not scan.done()
+        release.set()
+        assert await scan
+        return record
+
+    assert asyncio.run(main())["id"] == "000001"
+    adb.close()
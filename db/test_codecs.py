@@ -0,0 +1,51 @@
+import io
+import os
+import pytest
+from db.codecs import CODECS, detect_codec, open_reader, open_writer
+from db.database import Database
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+
+def _record(sid: str) -> dict:
+    return {"id": sid, "name": f"Student {sid}", "email": f"s{sid}@university.com", "password": "Password123",
+            "subjects": [{"id": "001", "title": "Subject-001", "mark": 70, "grade": "D"}]}
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_codec_round_trip_is_detected_from_the_bytes(codec):
+    data = b"students " * 20000
+    raw = io.BytesIO()
+    out = open_writer(raw, codec)
+    out.write(data)
+    if out is not raw:
+        out.close()
+
+    assert detect_codec(raw.getvalue()[:8]) == codec
+    raw.seek(0)
+    reader = open_reader(raw)
+    assert reader.read(7) + reader.read() == data
+
+
+@pytest.mark.parametrize("snapshot_format", ["pickle", "stream"])
+@pytest.mark.parametrize("codec", CODECS)
+def test_snapshot_is_readable_whatever_the_current_setting(tmp_path, monkeypatch, codec, snapshot_format):
+    monkeypatch.setitem(DATABASE_CONFIG, "compression", codec)
+    monkeypatch.setitem(DATABASE_CONFIG, "snapshot_format", snapshot_format)
+    path = str(tmp_path / "students.data")
+    Database(path=path, log_structured=False, verbose=False).write_to_file([_record(f"{i:06d}") for i in range(1, 201)])
+
+    monkeypatch.setitem(DATABASE_CONFIG, "compression", "lzma" if codec == "none" else "none")
+    reader = Database(path=path, log_structured=False, verbose=False)
+    assert [record["id"] for record in reader.iter_records()] == [f"{i:06d}" for i in range(1, 201)]
+    assert reader.get("000150")["email"] == "s000150@university.com"
+
+
+def test_compressed_snapshots_are_smaller(tmp_path, monkeypatch):
+    records = [_record(f"{i:06d}") for i in range(1, 501)]
+    sizes = {}
+    for codec in CODECS:
+        monkeypatch.setitem(DATABASE_CONFIG, "compression", codec)
+        path = str(tmp_path / f"{codec}.data")
+        Database(path=path, log_structured=False, verbose=False).write_to_file(records)
+        sizes[codec] = os.path.getsize(path)
+    assert all(sizes[codec] < sizes["none"] for codec in CODECS if codec != "none")
@@ -0,0 +1,58 @@
+from db.database import Database
+from db.enrolment_index import EnrolmentIndex
+from db.subject_catalog import SubjectCatalog
+
+
+def _record(sid: str, marks: dict) -> dict:
+    return {"id": sid, "name": "Student", "email": f"s{sid}@university.com", "password": "Password123",
+            "subjects": [{"id": subject, "title": f"Subject-{subject}", "mark": mark, "grade": "C"}
+                         for subject, mark in marks.items()]}
+
+
+def _index(tmp_path):
+    db = Database(path=str(tmp_path / "students.data"), log_structured=False, verbose=False)
+    db.upsert_many([_record("000001", {"001": 90, "002": 40}), _record("000002", {"001": 60}),
+                    _record("000003", {"003": 70})])
+    catalog = SubjectCatalog.for_database(db)
+    return db, catalog, EnrolmentIndex(db, catalog)
+
+
+def test_queries_are_answered_from_the_index(tmp_path):
+    db, catalog, index = _index(tmp_path)
+    assert index.roster("001") == ["000001", "000002"]
+    assert index.mean("001") == 75 and index.mean("999") is None
+    assert index.grade_distribution("001") == {"HD": 1, "D": 0, "C": 0, "P": 1, "F": 0}
+    assert index.most_enrolled(2) == [("001", 2), ("002", 1)]
+
+
+def test_own_updates_are_applied_without_a_rebuild(tmp_path, monkeypatch):
+    db, catalog, index = _index(tmp_path)
+    index.roster("001")
+    rebuilds = []
+    monkeypatch.setattr(index, "rebuild", lambda: rebuilds.append(1))
+
+    assert catalog.enrol("003")
+    index.add("003", "000002", 50)
+    catalog.drop("001")
+    index.discard("001", "000001")
+    catalog.drop("003")
+    index.remove_student("000003", ["003"])
+
+    assert index.roster("001") == ["000002"]
+    assert index.marks("003") == {"000002": 50}
+    assert index.mean("001") == 60
+    assert rebuilds == []
+
+
+def test_changes_made_elsewhere_trigger_a_rebuild(tmp_path):
+    db, catalog, index = _index(tmp_path)
+    assert index.roster("002") == ["000001"]
+
+    # Another process enrols a student: it counts the place and saves the record
+    other = SubjectCatalog(catalog.path)
+    assert other.enrol("002")
+    db.patch("000002", {"subjects": _record("000002", {"001": 60, "002": 80})["subjects"]})
+
+    assert index.roster("002") == ["000001", "000002"]
+    assert index.mean("002") == 60
+    other.close()
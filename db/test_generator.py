@@ -0,0 +1,58 @@
+import pytest
+from db.database import Database
+from db.generator import generate, write_population
+from db.id_allocator import IdAllocator
+from db.subject_catalog import SubjectCatalog
+from models.student_model import Student
+from models.subject_model import MAX_SUBJECTS
+
+
+def _population(n: int, **kwargs) -> list:
+    return [record for batch in generate(n, batch_size=64, **kwargs) for record in batch]
+
+
+def test_generated_students_are_valid_and_unique():
+    records = _population(500, mark_distribution="normal", mark_min=40, mark_max=90)
+    assert len({record["id"] for record in records}) == 500
+    assert len({record["email"] for record in records}) == 500
+    for record in records:
+        student = Student.from_dict(record)
+        assert student.validate_email(student.email) and student.validate_password(student.password)
+        assert 0 <= len(student.subjects) <= MAX_SUBJECTS
+        assert len({sub.id for sub in student.subjects}) == len(student.subjects)
+        assert all(40 <= sub.mark <= 90 for sub in student.subjects)
+        assert student.mark_count == len(student.subjects)
+
+
+def test_same_seed_gives_the_same_population():
+    assert _population(200, seed=7) == _population(200, seed=7)
+    assert _population(200, seed=7) != _population(200, seed=8)
+
+
+@pytest.mark.parametrize("overrides", [{"mark_min": 80, "mark_max": 60}, {"mark_distribution": "skewed"},
+                                       {"subject_count_weights": [1, 1]},
+                                       {"mark_distribution": "normal", "mark_std": 0}])
+def test_invalid_configuration_is_rejected_up_front(overrides):
+    with pytest.raises(ValueError):
+        generate(10, **overrides)
+
+
+def test_population_must_fit_the_id_space():
+    with pytest.raises(ValueError):
+        generate(1_000_000)
+
+
+@pytest.mark.parametrize("log_structured", [False, True])
+def test_write_population_resets_the_allocator_and_catalog(tmp_path, log_structured):
+    db = Database(path=str(tmp_path / "students.data"), log_structured=log_structured, verbose=False)
+    db.upsert({"id": "999999", "name": "Old", "email": "old@university.com", "password": "Password123",
+               "subjects": []})
+    records = _population(300)
+    assert write_population(db, generate(300, batch_size=64)) == 300
+
+    assert sorted(record["id"] for record in db.iterate()) == sorted(record["id"] for record in records)
+    ids = IdAllocator.for_database(db)
+    assert all(ids.is_used(record["id"]) for record in records) and not ids.is_used("999999")
+    catalog = SubjectCatalog.for_database(db)
+    enrolled = sum(len(record["subjects"]) for record in records)
+    assert sum(catalog.enrolled(f"{i:03d}") for i in range(1, 1000)) == enrolled
@@ -0,0 +1,91 @@
+from controller.admin_controller import AdminController, _group_shard, _partition_shard
+from controller.student_controller import StudentController
+from controller.subject_controller import SubjectController
+from db.async_database import AsyncDatabase
+from db.database import Database
+from db.enrolment_index import EnrolmentIndex
+from db.id_allocator import IdAllocator
+from db.student_repository import StudentRepository
+from db.subject_catalog import SubjectCatalog
+from db.unit_of_work import UnitOfWork
+
+
+def _app(tmp_path):
+    """Wire the controllers the way the apps do, with a buffered session."""
+    db = Database(path=str(tmp_path / "students.data"), log_structured=False)
+    ids = IdAllocator.for_database(db)
+    catalog = SubjectCatalog.for_database(db)
+    session = UnitOfWork(db, autocommit=False, idle_commit_seconds=None)
+    enrolments = EnrolmentIndex(session, catalog)
+    students = StudentRepository(session)
+    adb = AsyncDatabase(db)
+    admin = AdminController(db, adb=adb, ids=ids, catalog=catalog, enrolments=enrolments, students=students)
+    student = StudentController(session, adb=adb, ids=ids, students=students)
+    subjects = SubjectController(session, adb=adb, catalog=catalog, enrolments=enrolments, students=students)
+    return db, session, admin, student, subjects
+
+
+def _pass_fail_ids(admin):
+    return {group: [s.id for s in members] for group, members in admin.partition_pass_fail().items()}
+
+
+def test_reports_agree_while_a_session_has_buffered_writes(tmp_path):
+    db, session, admin, student, subjects = _app(tmp_path)
+    student.register("John Smith", "john.smith@university.com", "Helloworld123")
+    student.register("Jane Doe", "jane.doe@university.com", "Helloworld123")
+    assert session.commit()
+    assert admin.pass_fail_counts() == {"PASS": 0, "FAIL": 0}  # Built before the enrolment
+
+    student.login("john.smith@university.com", "Helloworld123")
+    subjects.set_current_student(student.current_student)
+    assert subjects.enrol_auto()[0]
+    assert session.pending() == 1
+
+    # Nothing committed yet: every report still shows John without subjects
+    assert [row["subjects_count"] for row in admin.list_students()] == [0, 0]
+    assert admin.pass_fail_counts() == {"PASS": 0, "FAIL": 0}
+    assert _pass_fail_ids(admin) == {"PASS": [], "FAIL": []}
+    assert admin.verify_aggregates() == {}
+    assert session.pending() == 1  # verify did not commit the session
+
+    # Removing another student does not commit the session either
+    jane = student.find_by_email("jane.doe@university.com")
+    assert admin.remove_student_by_id(jane.id)
+    assert session.pending() == 1
+    assert db.get(jane.id) is None
+
+    assert session.commit()
+    john = student.current_student
+    assert [row["subjects_count"] for row in admin.list_students()] == [1]
+    assert sum(admin.pass_fail_counts().values()) == 1
+    assert sum(len(ids) for ids in _pass_fail_ids(admin).values()) == 1
+    assert admin.partition_pass_fail()["PASS" if john.has_passed() else "FAIL"] == [john]
+    assert admin.verify_aggregates() == {}
+
+
+def _scanned_ids(db, shard_report) -> dict:
+    return {group: [s.id for s in members] for group, members in shard_report(db.iterate()).items() if members}
+
+
+def test_reports_list_students_in_store_order(tmp_path):
+    db, session, admin, student, subjects = _app(tmp_path)
+    db.write_to_file([
+        {"id": sid, "name": "Student", "email": f"s{sid}@university.com", "password": "Password123",
+         "subjects": [{"id": "001", "title": "Subject-001", "mark": mark, "grade": "HD"}]}
+        for sid, mark in (("000009", 90), ("000003", 30), ("000007", 95), ("000001", 20), ("000005", 88))
+    ])
+    assert {g: [s.id for s in m] for g, m in admin.group_by_grade().items()} == _scanned_ids(db, _group_shard)
+    assert _pass_fail_ids(admin) == {"PASS": ["000009", "000007", "000005"], "FAIL": ["000003", "000001"]}
+
+    # An enrolment keeps the student's place; a registration goes last
+    student.login("s000003@university.com", "Password123")
+    subjects.set_current_student(student.current_student)
+    assert subjects.enrol_auto()[0]
+    student.register("New Student", "new.student@university.com", "Password123")
+    new = student.find_by_email("new.student@university.com")
+    subjects.set_current_student(new)
+    assert subjects.enrol_auto()[0]
+    assert session.commit()
+
+    assert {g: [s.id for s in m] for g, m in admin.group_by_grade().items()} == _scanned_ids(db, _group_shard)
+    assert _pass_fail_ids(admin) == {"PASS": [], "FAIL": [], **_scanned_ids(db, _partition_shard)}
@@ -0,0 +1,64 @@
+import os
+import stat
+import threading
+from db.database import Database
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+
+def _record(sid: str) -> dict:
+    return {"id": sid, "name": f"Student {sid}", "email": f"s{sid}@university.com", "password": "Password123",
+            "subjects": []}
+
+
+def _database(tmp_path) -> Database:
+    return Database(path=str(tmp_path / "students.data"), log_structured=False, verbose=False)
+
+
+def test_concurrent_writes_are_coalesced_and_all_stored(tmp_path, monkeypatch):
+    monkeypatch.setitem(DATABASE_CONFIG, "group_commit_window_ms", 50)
+    db = _database(tmp_path)
+    writes = []
+    write_snapshot = db._write_snapshot
+    monkeypatch.setattr(db, "_write_snapshot", lambda data, **kwargs: (writes.append(len(data)), write_snapshot(data, **kwargs)))
+
+    threads = [threading.Thread(target=db.upsert, args=(_record(f"{i:06d}"),)) for i in range(1, 21)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(writes) < len(threads)
+    assert sorted(record["id"] for record in _database(tmp_path).iterate()) == [f"{i:06d}" for i in range(1, 21)]
+
+
+def test_failed_write_keeps_the_previous_snapshot(tmp_path, monkeypatch):
+    db = _database(tmp_path)
+    db.upsert(_record("000001"))
+    monkeypatch.setattr(Database, "_dump_snapshot", staticmethod(lambda f, data: 1 / 0))
+
+    db.upsert(_record("000002"))
+    monkeypatch.undo()
+    assert [record["id"] for record in _database(tmp_path).iterate()] == ["000001"]
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
+
+
+def test_snapshot_writes_keep_the_file_mode(tmp_path):
+    db = _database(tmp_path)
+    os.chmod(db.path, 0o644)
+    db.upsert(_record("000001"))
+    assert stat.S_IMODE(os.stat(db.path).st_mode) == 0o644
+
+    os.chmod(db.path, 0o640)
+    db.upsert(_record("000002"))
+    assert stat.S_IMODE(os.stat(db.path).st_mode) == 0o640
+
+
+def test_first_snapshot_write_follows_the_umask(tmp_path):
+    umask = os.umask(0o022)
+    try:
+        db = _database(tmp_path)
+        os.remove(db.path)
+        db._write_snapshot([_record("000001")])
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE(os.stat(db.path).st_mode) == 0o644
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+from db.database import Database
+from db.id_allocator import IdAllocator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ALLOCATOR = """
+import sys
+from db.id_allocator import IdAllocator
+ids = IdAllocator(sys.argv[1])
+print(" ".join(ids.allocate() for _ in range(500)))
+ids.close()
+"""
+
+
+def test_allocations_are_unique_and_skip_stored_students(tmp_path):
+    db = Database(path=str(tmp_path / "students.data"), log_structured=False, verbose=False)
+    db.upsert({"id": "000001", "name": "Old", "email": "old@university.com", "password": "Password123",
+               "subjects": []})
+    ids = IdAllocator.for_database(db)
+
+    allocated = [ids.allocate() for _ in range(20)] + ids.reserve(20)
+    assert len(set(allocated)) == 40
+    assert "000000" not in allocated and "000001" not in allocated
+    assert all(ids.is_used(sid) for sid in allocated)
+    ids.close()
+
+
+def test_released_ids_are_reused_and_rebuild_resets(tmp_path):
+    ids = IdAllocator(str(tmp_path / "students.data.ids"))
+    first = [ids.allocate() for _ in range(5)]
+    ids.release(first[2])
+    ids.release("not an id")
+    assert not ids.is_used(first[2])
+    assert ids.allocate() == first[2]
+
+    ids.rebuild(["000042"])
+    assert ids.is_used("000042") and not ids.is_used(first[0])
+    assert ids.allocate() == "000001"
+    ids.close()
+    assert IdAllocator(ids.path).is_used("000001")  # Persisted in the bitmap file
+
+
+def test_processes_never_receive_the_same_id(tmp_path):
+    path = str(tmp_path / "students.data.ids")
+    IdAllocator(path).close()
+    workers = [subprocess.Popen([sys.executable, "-c", ALLOCATOR, path], cwd=ROOT, stdout=subprocess.PIPE, text=True)
+               for _ in range(3)]
+    allocated = [sid for worker in workers for sid in worker.communicate()[0].split()]
+    assert len(allocated) == 1500
+    assert len(set(allocated)) == 1500
@@ -0,0 +1,50 @@
+import csv
+from db.database import Database
+from db.importer import BulkImporter
+
+
+class FlakyDatabase(Database):
+    """A Database whose upsert_many() fails once, on the given call."""
+
+    def __init__(self, path: str, fail_on_call: int):
+        super().__init__(path=path, log_structured=False)
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+
+    def upsert_many(self, records):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            print("[ERROR][DB] Simulated failure")
+            return False
+        return super().upsert_many(records)
+
+
+def _write_intake(path: str, rows: int) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "email", "password"])
+        for i in range(rows):
+            writer.writerow([f"Student {i}", f"student{i}@university.com", "Helloworld123"])
+
+
+def test_failed_batch_is_not_checkpointed_and_is_imported_on_resume(tmp_path):
+    source = str(tmp_path / "intake.csv")
+    _write_intake(source, 10)
+    db = FlakyDatabase(str(tmp_path / "students.data"), fail_on_call=2)
+
+    importer = BulkImporter(db, source, batch_size=4, workers=1)
+    assert importer.run() == (4, 0)
+    assert importer.failed
+    assert len(db.read_from_file()) == 4
+    # The failed batch's ids went back to the allocator
+    assert [sid for sid in (f"{i:06d}" for i in range(1, 9)) if importer.ids.is_used(sid)] == \
+        sorted(record["id"] for record in db.read_from_file())
+    importer.ids.close()
+
+    resumed = BulkImporter(db, source, batch_size=4, workers=1)
+    assert resumed.run() == (10, 0)
+    assert not resumed.failed
+    stored = db.read_from_file()
+    assert sorted(record["email"] for record in stored) == sorted(f"student{i}@university.com" for i in range(10))
+    assert len({record["id"] for record in stored}) == 10
+    resumed.ids.close()
@@ -0,0 +1,63 @@
+import pytest
+from db.database import Database
+from db.index import SecondaryIndex
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+REBUILD = SecondaryIndex.rebuild
+
+
+def _record(sid: str, email: str = "") -> dict:
+    return {"id": sid, "name": f"Student {sid}", "email": email or f"s{sid}@university.com",
+            "password": "Password123", "subjects": []}
+
+
+@pytest.fixture(params=["pickle", "stream"])
+def indexed(tmp_path, monkeypatch, request):
+    monkeypatch.setitem(DATABASE_CONFIG, "secondary_indexes", True)
+    monkeypatch.setitem(DATABASE_CONFIG, "snapshot_format", request.param)
+    monkeypatch.setitem(DATABASE_CONFIG, "group_commit_window_ms", 0)
+    db = Database(path=str(tmp_path / "students.data"), log_structured=False, verbose=False)
+    db.write_to_file([_record(f"{i:06d}") for i in range(1, 6)])
+    return db
+
+
+def _rebuilt(db: Database) -> SecondaryIndex:
+    index = SecondaryIndex(db.path + ".fresh")
+    REBUILD(index, db._scan_locations(), db._generation())
+    return index
+
+
+def test_writes_update_the_index_without_rebuilding_it(indexed, monkeypatch):
+    rebuilds = []
+    monkeypatch.setattr(SecondaryIndex, "rebuild", lambda self, *args: (rebuilds.append(1), REBUILD(self, *args))[1])
+
+    indexed.upsert(_record("000009"))
+    indexed.patch("000002", {"email": "moved@university.com", "name": "A much longer name than before"})
+    indexed.delete("000001")
+    assert rebuilds == []
+
+    assert indexed.find_by_email("moved@university.com")["id"] == "000002"
+    assert indexed.find_by_email("s000002@university.com") is None
+    assert indexed.get("000001") is None
+    assert indexed.get("000005")["id"] == "000005"
+    rebuilt = _rebuilt(indexed)
+    assert (indexed.index.ids, indexed.index.emails) == (rebuilt.ids, rebuilt.emails)
+
+    reopened = Database(path=indexed.path, log_structured=False, verbose=False)
+    assert reopened.index_valid and reopened.index.ids == indexed.index.ids
+    assert rebuilds == []
+
+
+def test_full_write_rebuilds_the_index(indexed, monkeypatch):
+    rebuilds = []
+    monkeypatch.setattr(SecondaryIndex, "rebuild", lambda self, *args: (rebuilds.append(1), REBUILD(self, *args))[1])
+
+    indexed.write_to_file([_record("000007")])
+    assert rebuilds == [1]
+    assert sorted(indexed.index.ids) == ["000007"]
+
+
+def test_write_after_another_process_wrote_rebuilds_the_index(indexed):
+    Database(path=indexed.path, log_structured=False, verbose=False).upsert(_record("000008"))
+    indexed.upsert(_record("000009"))
+    assert indexed.index.ids == _rebuilt(indexed).ids
@@ -0,0 +1,55 @@
+import pytest
+from db.database import Database
+from db.mvcc import VersionStore
+from db.wal import OP_PATCH, OP_UPSERT
+
+
+def _record(sid: str) -> dict:
+    return {"id": sid, "name": f"Student {sid}", "email": f"s{sid}@university.com", "password": "Password123",
+            "subjects": []}
+
+
+def test_superseded_generations_live_until_their_last_reader_releases():
+    versions = VersionStore()
+    versions.install([_record("000001")], token=1)
+    first, second = versions.pin(), versions.pin()
+    versions.install([_record("000001"), _record("000002")], token=2)
+
+    assert len(first) == 1 and len(versions.pin()) == 2
+    assert versions.live_generations() == [first.generation, versions.current]
+    first.release()
+    first.release()  # Releasing twice is harmless
+    assert versions.live_generations() == [second.generation, versions.current]
+    second.release()
+    assert versions.live_generations() == [versions.current]
+
+
+@pytest.mark.parametrize("log_structured", [False, True])
+def test_snapshot_sees_a_batch_entirely_or_not_at_all(tmp_path, log_structured):
+    db = Database(path=str(tmp_path / "students.data"), log_structured=log_structured, verbose=False)
+    db.upsert_many([_record("000001"), _record("000002")])
+
+    with db.snapshot() as before:
+        assert db.commit_batch([
+            (OP_PATCH, ("000001", {"name": "Enrolled"})),
+            (OP_UPSERT, _record("000003")),
+        ])
+        assert [record["name"] for record in before] == ["Student 000001", "Student 000002"]
+        assert before.get("000003") is None
+
+        with db.snapshot() as after:
+            assert after.get("000001")["name"] == "Enrolled"
+            assert after.find_by_email("S000003@university.com")["id"] == "000003"
+
+
+def test_snapshot_picks_up_writes_from_another_handle(tmp_path):
+    path = str(tmp_path / "students.data")
+    db = Database(path=path, log_structured=False, verbose=False)
+    db.upsert(_record("000001"))
+    with db.snapshot() as snap:
+        assert len(snap) == 1
+
+    Database(path=path, log_structured=False, verbose=False).upsert(_record("000002"))
+    with db.snapshot() as snap:
+        assert len(snap) == 2
+    assert db.versions.live_generations() == [db.versions.current]
@@ -0,0 +1,51 @@
+import pytest
+from db.database import Database
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+
+def _record(sid: str) -> dict:
+    return {"id": sid, "name": f"Student {sid}", "email": f"s{sid}@university.com", "password": "Password123",
+            "subjects": [{"id": "001", "title": "Subject-001", "mark": 70, "grade": "D"}]}
+
+
+def _database(tmp_path) -> Database:
+    db = Database(path=str(tmp_path / "students.data"), log_structured=False, verbose=False)
+    db.write_to_file([_record("000001"), _record("000002")])
+    return db
+
+
+def test_cache_is_reused_until_the_file_changes(tmp_path):
+    db = _database(tmp_path)
+    db.read_from_file()
+    hits = db.cache_hits
+    db.read_from_file()
+    assert db.cache_hits == hits + 1
+
+    Database(path=db.path, log_structured=False, verbose=False).upsert(_record("000003"))
+    assert [record["id"] for record in db.read_from_file()] == ["000001", "000002", "000003"]
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_mutating_returned_records_leaves_the_store_unchanged(tmp_path, monkeypatch, indexed):
+    monkeypatch.setitem(DATABASE_CONFIG, "secondary_indexes", indexed)
+    db = _database(tmp_path)
+    with db.snapshot() as snap:
+        record = db.get("000001")
+        record["name"] = "Changed"
+        record["subjects"].append({"id": "002", "title": "Subject-002", "mark": 10, "grade": "F"})
+        for record in db.iterate():
+            record["email"] = "changed@university.com"
+
+        assert db.get("000001")["name"] == "Student 000001"
+        assert len(db.get("000001")["subjects"]) == 1
+        assert snap.get("000001")["name"] == "Student 000001"
+        assert all(record["email"] != "changed@university.com" for record in snap)
+
+    # An unrelated write must not persist the mutations either
+    written = _record("000003")
+    db.upsert(written)
+    written["name"] = "Changed"
+    stored = {record["id"]: record for record in Database(path=db.path, log_structured=False, verbose=False).iterate()}
+    assert stored["000001"]["name"] == "Student 000001"
+    assert stored["000002"]["email"] == "s000002@university.com"
+    assert stored["000003"]["name"] == "Student 000003"
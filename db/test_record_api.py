@@ -0,0 +1,58 @@
+import pytest
+from db.database import Database
+from db.record_file import RecordFileDatabase
+from db.sharded_database import ShardedDatabase
+from db.sqlite_database import SQLiteDatabase
+
+
+def _record(sid: str, name: str = "Student") -> dict:
+    return {"id": sid, "name": name, "email": f"s{sid}@university.com", "password": "Password123",
+            "subjects": [{"id": "001", "title": "Subject-001", "mark": 70, "grade": "D"}]}
+
+
+@pytest.fixture(params=["snapshot", "log", "sqlite", "record", "sharded"])
+def db(tmp_path, request):
+    if request.param == "sqlite":
+        db = SQLiteDatabase(str(tmp_path / "students.sqlite3"))
+    elif request.param == "record":
+        db = RecordFileDatabase(str(tmp_path / "students.rec"))
+    elif request.param == "sharded":
+        db = ShardedDatabase(str(tmp_path / "students.data"), shard_count=3, log_structured=False)
+    else:
+        db = Database(path=str(tmp_path / "students.data"), log_structured=request.param == "log", verbose=False)
+    yield db
+    db.close()
+
+
+def _names(db) -> dict:
+    return {record["id"]: record["name"] for record in db.iterate()}
+
+
+def test_point_writes_touch_only_their_record(db):
+    for sid in ("000001", "000002", "000003"):
+        db.upsert(_record(sid))
+    assert db.upsert(_record("000002", "Replaced"))
+    assert db.patch("000003", {"name": "Patched"})
+    assert db.delete("000001")
+
+    assert _names(db) == {"000002": "Replaced", "000003": "Patched"}
+    if not isinstance(db, ShardedDatabase):  # A sharded scan goes shard by shard
+        assert list(_names(db)) == ["000002", "000003"]  # Replaced in place, not moved to the end
+    assert db.get("000003")["subjects"][0]["mark"] == 70
+    assert db.get("000001") is None
+    assert not db.delete("000001")
+    assert not db.patch("000001", {"name": "Nobody"})
+
+
+def test_find_by_email_ignores_case(db):
+    db.upsert_many([_record("000001"), _record("000002")])
+    assert db.find_by_email("  S000002@University.COM ")["id"] == "000002"
+    assert db.find_by_email("nobody@university.com") is None
+
+
+def test_whole_list_calls_still_work(db):
+    db.upsert(_record("000009"))
+    db.write_to_file([_record("000001"), _record("000002")])
+    assert sorted(record["id"] for record in db.read_from_file()) == ["000001", "000002"]
+    db.clear_all()
+    assert list(db.iterate()) == []
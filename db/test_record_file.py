@@ -0,0 +1,90 @@
+import os
+import subprocess
+import sys
+from db.record_file import RecordFileDatabase
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _record(sid: str) -> dict:
+    return {"id": sid, "name": f"Student {sid}", "email": f"s{sid}@university.com", "password": "Password123",
+            "subjects": [{"id": "001", "title": "Subject-001", "mark": 70, "grade": "D"}]}
+
+
+WRITER = """
+import sys
+from db.record_file import RecordFileDatabase
+db = RecordFileDatabase(sys.argv[1])
+for i in range(2, 200):  # Grows the file well past its initial capacity
+    db.upsert({"id": f"{i:06d}", "name": "Other", "email": f"o{i}@university.com", "password": "Password123",
+               "subjects": []})
+db.delete("000001")
+db.close()
+"""
+
+
+def test_sees_inserts_deletes_and_growth_from_another_process(tmp_path):
+    path = str(tmp_path / "students.rec")
+    db = RecordFileDatabase(path)
+    db.upsert(_record("000001"))
+    token = db.change_token()
+
+    subprocess.run([sys.executable, "-c", WRITER, path], check=True, cwd=ROOT)
+
+    assert db.change_token() != token
+    assert db.get("000001") is None
+    assert db.get("000199")["name"] == "Other"
+    assert len(list(db.iterate())) == 198
+    db.upsert(_record("000200"))
+    db.close()
+    assert RecordFileDatabase(path).get("000200")["email"] == "s000200@university.com"
+
+
+def test_failed_rewrite_keeps_every_record(tmp_path, monkeypatch):
+    path = str(tmp_path / "students.rec")
+    db = RecordFileDatabase(path)
+    db.write_to_file([_record("000001"), _record("000002")])
+
+    bad = dict(_record("000004"), subjects=[{"id": "001", "mark": 70, "grade": "D"}] * 5)
+    db.write_to_file([_record("000003"), bad])
+    assert sorted(record["id"] for record in db.iterate()) == ["000001", "000002"]
+
+    def crash(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("db.record_file.os.replace", crash)
+    db.compact()
+    db.write_to_file([])
+    monkeypatch.undo()
+    assert sorted(record["id"] for record in db.iterate()) == ["000001", "000002"]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+    db.close()
+    assert RecordFileDatabase(path).get("000002")["email"] == "s000002@university.com"
+
+
+def test_rewrite_is_seen_by_other_handles(tmp_path):
+    path = str(tmp_path / "students.rec")
+    db = RecordFileDatabase(path)
+    other = RecordFileDatabase(path)
+    for _ in range(5):
+        db.upsert(_record("000001"))
+        db.patch("000001", {"name": "Renamed"})
+    db.upsert(_record("000002"))
+    assert other.get("000001")["name"] == "Renamed"
+    size = os.path.getsize(path + ".strings")
+
+    other.compact()
+    strings = [name for name in os.listdir(tmp_path) if ".strings" in name]
+    assert len(strings) == 1 and os.path.getsize(tmp_path / strings[0]) < size
+
+    assert db.get("000001")["name"] == "Renamed"
+    db.upsert(_record("000003"))
+    db.delete("000002")
+    assert sorted(record["id"] for record in other.iterate()) == ["000001", "000003"]
+
+    db.clear_all()
+    assert other.get("000001") is None
+    other.upsert(_record("000004"))
+    assert [record["id"] for record in db.iterate()] == ["000004"]
+    db.close()
+    other.close()
@@ -0,0 +1,58 @@
+import pytest
+from db.database import Database
+from db.sharded_database import ShardedDatabase, migrate_to_shards, shard_for
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+
+def _record(sid: str) -> dict:
+    return {"id": sid, "name": f"Student {sid}", "email": f"s{sid}@university.com", "password": "Password123",
+            "subjects": []}
+
+
+def _ids(records) -> list:
+    return sorted(record["id"] for record in records)
+
+
+def _sharded(tmp_path) -> ShardedDatabase:
+    return ShardedDatabase(str(tmp_path / "students.data"), shard_count=4, log_structured=False)
+
+
+def test_students_live_only_in_their_owning_shard(tmp_path):
+    db = _sharded(tmp_path)
+    db.upsert_many([_record(f"{i:06d}") for i in range(1, 41)])
+    db.patch("000007", {"name": "Renamed"})
+    db.delete("000008")
+
+    for i, shard in enumerate(db.shards):
+        assert all(shard_for(record["id"], 4) == i for record in shard.iterate())
+    assert shard_for("000007", 4) == shard_for(" 000007 ", 4)
+    assert db.get("000007")["name"] == "Renamed"
+    assert db.get("000008") is None
+    assert _ids(db.iterate()) == [f"{i:06d}" for i in range(1, 41) if i != 8]
+    db.close()
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_map_shards_returns_one_result_per_shard(tmp_path, monkeypatch, parallel):
+    monkeypatch.setitem(DATABASE_CONFIG, "parallel_scan", parallel)
+    db = _sharded(tmp_path)
+    db.write_to_file([_record(f"{i:06d}") for i in range(1, 41)])
+
+    parts = db.map_shards(_ids)
+    assert len(parts) == 4
+    assert parts == [_ids(shard.iterate()) for shard in db.shards]
+    assert sorted(sid for part in parts for sid in part) == [f"{i:06d}" for i in range(1, 41)]
+    db.close()
+
+
+def test_migrate_and_snapshot_cover_every_shard(tmp_path):
+    source = Database(path=str(tmp_path / "single.data"), log_structured=False, verbose=False)
+    source.write_to_file([_record(f"{i:06d}") for i in range(1, 21)])
+    db = _sharded(tmp_path)
+    assert migrate_to_shards(source, db) == 20
+
+    with db.snapshot() as snap:
+        db.delete("000001")
+        assert _ids(snap) == [f"{i:06d}" for i in range(1, 21)]
+    assert db.find_by_email("S000020@university.com")["id"] == "000020"
+    db.close()
@@ -0,0 +1,50 @@
+import os
+import pytest
+from db.database import Database, STREAM_MAGIC
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+
+def _record(sid: str) -> dict:
+    return {"id": sid, "name": f"Student {sid}", "email": f"s{sid}@university.com", "password": "Password123",
+            "subjects": [{"id": "001", "title": "Subject-001", "mark": 70, "grade": "D"}]}
+
+
+@pytest.fixture
+def stream_db(tmp_path, monkeypatch) -> Database:
+    monkeypatch.setitem(DATABASE_CONFIG, "snapshot_format", "stream")
+    monkeypatch.setitem(DATABASE_CONFIG, "compression", "none")
+    db = Database(path=str(tmp_path / "students.data"), log_structured=False, verbose=False)
+    db.write_to_file([_record(f"{i:06d}") for i in range(1, 101)])
+    db._invalidate_cache()
+    return db
+
+
+def test_stream_snapshot_is_read_one_record_at_a_time(stream_db):
+    with open(stream_db.path, "rb") as f:
+        assert f.read(len(STREAM_MAGIC)) == STREAM_MAGIC
+
+    records = stream_db.iter_records()
+    assert next(records)["id"] == "000001"
+    assert stream_db._cache is None  # Nothing materialized while streaming
+    assert [record["id"] for record in records] == [f"{i:06d}" for i in range(2, 101)]
+    assert stream_db.map_shards(lambda records: sum(1 for _ in records)) == [100]
+
+
+def test_truncated_stream_is_an_error_not_a_shorter_population(stream_db):
+    with open(stream_db.path, "r+b") as f:
+        f.truncate(os.path.getsize(stream_db.path) - 5)
+    with pytest.raises(ValueError, match="truncated"):
+        list(stream_db.iter_records())
+    assert stream_db.read_from_file() == []  # Reported and treated as unreadable
+    assert not stream_db.upsert(_record("000999"))  # Writers refuse to overwrite what they could not read
+
+
+def test_pickle_snapshots_are_still_readable(stream_db, monkeypatch):
+    monkeypatch.setitem(DATABASE_CONFIG, "snapshot_format", "pickle")
+    stream_db.upsert(_record("000101"))
+    with open(stream_db.path, "rb") as f:
+        assert f.read(len(STREAM_MAGIC)) != STREAM_MAGIC
+
+    monkeypatch.setitem(DATABASE_CONFIG, "snapshot_format", "stream")
+    reader = Database(path=stream_db.path, log_structured=False, verbose=False)
+    assert len(list(reader.iter_records())) == 101
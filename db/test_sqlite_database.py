@@ -0,0 +1,83 @@
+import os
+import pytest
+from db.database import Database
+from db.sqlite_database import SQLiteDatabase, migrate_pickle_to_sqlite
+from db.student_repository import StudentRepository
+from db.wal import OP_PATCH, OP_UPSERT
+from models.student_model import Student
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+
+def _record(sid: str) -> dict:
+    return {"id": sid, "name": f"Student {sid}", "email": f"s{sid}@university.com", "password": "Password123",
+            "subjects": [{"id": "001", "title": "Subject-001", "mark": 70, "grade": "D"}]}
+
+
+def _migrated(source: str, tmp_path) -> dict:
+    target = str(tmp_path / "students.sqlite3")
+    migrate_pickle_to_sqlite(source, target)
+    db = SQLiteDatabase(target)
+    try:
+        return {record["id"]: record for record in db.iterate()}
+    finally:
+        db.close()
+
+
+def test_migrates_log_tail_that_was_not_compacted(tmp_path):
+    source = str(tmp_path / "students.data")
+    db = Database(path=source, log_structured=True)
+    db.upsert_many([_record("000001"), _record("000002")])
+    db.compact()
+    db.upsert(_record("000003"))
+    db.patch("000001", {"name": "Renamed"})
+    db.delete("000002")
+    db.close()
+    assert os.path.getsize(source + ".log") > 0
+
+    migrated = _migrated(source, tmp_path)
+    assert sorted(migrated) == ["000001", "000003"]
+    assert migrated["000001"]["name"] == "Renamed"
+    assert migrated["000003"]["subjects"][0]["mark"] == 70
+
+
+def test_migrates_stream_and_compressed_snapshots(tmp_path, monkeypatch):
+    for fmt, codec in (("stream", "none"), ("pickle", "zlib"), ("stream", "zlib")):
+        monkeypatch.setitem(DATABASE_CONFIG, "snapshot_format", fmt)
+        monkeypatch.setitem(DATABASE_CONFIG, "compression", codec)
+        case = tmp_path / f"{fmt}-{codec}"
+        case.mkdir()
+        source = str(case / "students.data")
+        Database(path=source, log_structured=False).write_to_file([_record("000001"), _record("000002")])
+
+        migrated = _migrated(source, case)
+        assert sorted(migrated) == ["000001", "000002"]
+
+
+def test_rejected_student_is_not_mapped_or_announced(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / "students.sqlite3"))
+    db.upsert(_record("000001"))
+    repository = StudentRepository(db)
+    events = []
+    repository.subscribe(lambda event, sid, student: events.append((event, sid)))
+
+    duplicate = Student.create("Other", "s000001@university.com", "Password123", student_id="000002")
+    assert not repository.add(duplicate)
+    assert events == []
+    assert repository.get("000002") is None
+    assert repository.find_by_email("s000001@university.com").id == "000001"
+    db.close()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "snapshot", "log"])
+def test_batch_patching_a_missing_student_writes_nothing(tmp_path, backend):
+    if backend == "sqlite":
+        db = SQLiteDatabase(str(tmp_path / "students.sqlite3"))
+    else:
+        db = Database(path=str(tmp_path / "students.data"), log_structured=backend == "log", verbose=False)
+    db.upsert(_record("000001"))
+
+    assert not db.commit_batch([(OP_UPSERT, _record("000002")), (OP_PATCH, ("000009", {"name": "Lost"}))])
+    assert [record["id"] for record in db.iterate()] == ["000001"]
+    assert db.commit_batch([(OP_UPSERT, _record("000002")), (OP_PATCH, ("000002", {"name": "Renamed"}))])
+    assert db.get("000002")["name"] == "Renamed"
+    db.close()
@@ -0,0 +1,75 @@
+from db.database import Database
+from db.student_repository import StudentRepository
+from models.student_model import Student
+
+
+def _record(sid: str, email: str = "") -> dict:
+    return {"id": sid, "name": f"Student {sid}", "email": email or f"s{sid}@university.com",
+            "password": "Password123", "subjects": []}
+
+
+def _repository(tmp_path):
+    db = Database(path=str(tmp_path / "students.data"), log_structured=False, verbose=False)
+    db.upsert_many([_record("000001"), _record("000002")])
+    return db, StudentRepository(db)
+
+
+def test_email_lookups_use_the_index_not_the_store(tmp_path, monkeypatch):
+    db, repository = _repository(tmp_path)
+    assert repository.email_exists("S000001@University.com ")
+    scans = []
+    monkeypatch.setattr(db, "find_by_email", lambda email: scans.append(email))
+    monkeypatch.setattr(db, "snapshot", lambda: scans.append("snapshot"))
+
+    assert repository.find_by_email("s000002@university.com").id == "000002"
+    assert not repository.email_exists("nobody@university.com")
+    assert repository.add(Student.create("New", "New.Student@university.com", "Password123", student_id="000003"))
+    assert repository.find_by_email("new.student@university.com").id == "000003"
+    assert scans == []
+
+
+def test_email_index_follows_writes_from_elsewhere(tmp_path):
+    db, repository = _repository(tmp_path)
+    assert repository.find_by_email("s000001@university.com").id == "000001"
+
+    other = Database(path=db.path, log_structured=False, verbose=False)
+    other.patch("000001", {"email": "moved@university.com"})
+    other.upsert(_record("000004"))
+
+    assert repository.find_by_email("s000001@university.com") is None
+    assert repository.find_by_email("moved@university.com").id == "000001"
+    assert repository.email_exists("s000004@university.com")
+
+
+def test_every_lookup_returns_the_one_live_student(tmp_path):
+    db, repository = _repository(tmp_path)
+    student = repository.get("000001")
+    assert repository.get(" 000001 ") is student
+    assert repository.find_by_email("s000001@university.com") is student
+    assert repository.get_many(["000001", "000009"]) == {"000001": student}
+    assert repository.lock("000001") is repository.lock("000001")
+
+
+def test_unreferenced_students_are_dropped_from_the_map(tmp_path):
+    db, repository = _repository(tmp_path)
+    student = repository.get("000001")
+    student.name = "Changed in memory only"
+    del student
+    assert repository.get("000001").name == "Student 000001"
+
+
+def test_writes_from_elsewhere_reload_clean_students_in_place(tmp_path):
+    db, repository = _repository(tmp_path)
+    clean, dirty = repository.get("000001"), repository.get("000002")
+    dirty.change_password("Unsaved456")
+
+    other = Database(path=db.path, log_structured=False, verbose=False)
+    other.patch("000001", {"name": "Renamed"})
+    other.patch("000002", {"name": "Renamed"})
+    generation = repository.generation
+
+    assert repository.get("000001") is clean and clean.name == "Renamed"
+    assert repository.get("000002") is dirty and dirty.password == "Unsaved456"  # Unsaved changes are kept
+    assert repository.generation == generation + 1
+    other.delete("000001")
+    assert repository.get("000001") is None
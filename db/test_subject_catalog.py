@@ -0,0 +1,52 @@
+from db.database import Database
+from db.subject_catalog import SubjectCatalog
+from resources.parameters.app_parameters import SUBJECT_CONFIG
+
+
+def _catalog(tmp_path, monkeypatch, size: int = 5, capacity=None) -> SubjectCatalog:
+    monkeypatch.setitem(SUBJECT_CONFIG, "catalog_size", size)
+    monkeypatch.setitem(SUBJECT_CONFIG, "default_capacity", capacity)
+    return SubjectCatalog(str(tmp_path / "students.data.subjects"))
+
+
+def test_claims_respect_capacity_and_exclusions(tmp_path, monkeypatch):
+    catalog = _catalog(tmp_path, monkeypatch, size=3, capacity=2)
+    claimed = [catalog.claim(exclude=["001"]) for _ in range(4)]
+    assert sorted(claimed) == ["002", "002", "003", "003"]
+    assert catalog.claim(exclude=["001"]) is None
+    assert catalog.get("002") == {"id": "002", "title": "Subject-002", "capacity": 2, "enrolled": 2}
+    assert not catalog.enrol("002")
+
+    catalog.drop("002")  # A place opens up again
+    assert catalog.claim(exclude=["001", "003"]) == "002"
+    assert catalog.get("004") is None and catalog.claim(exclude=["001", "002", "003"]) is None
+    catalog.close()
+
+
+def test_offer_withdraw_and_counts_are_shared_through_the_file(tmp_path, monkeypatch):
+    catalog = _catalog(tmp_path, monkeypatch)
+    other = SubjectCatalog(catalog.path)
+    catalog.offer("007", capacity=1)
+    catalog.withdraw("001")
+
+    assert other.get("001") is None and other.get("007")["capacity"] == 1
+    changes = other.changes()
+    assert other.enrol("007")
+    assert catalog.enrolled("007") == 1 and catalog.changes() == changes + 1
+    assert not catalog.enrol("007")
+    assert [entry["id"] for entry in catalog.subjects()] == ["002", "003", "004", "005", "007"]
+    catalog.close()
+    other.close()
+
+
+def test_new_catalog_counts_the_stored_enrolments(tmp_path, monkeypatch):
+    monkeypatch.setitem(SUBJECT_CONFIG, "catalog_size", 5)
+    db = Database(path=str(tmp_path / "students.data"), log_structured=False, verbose=False)
+    db.upsert_many([
+        {"id": f"{i:06d}", "name": "Student", "email": f"s{i}@university.com", "password": "Password123",
+         "subjects": [{"id": sid, "title": f"Subject-{sid}", "mark": 70, "grade": "C"} for sid in subjects]}
+        for i, subjects in enumerate((["001", "002"], ["002"], []), start=1)
+    ])
+    catalog = SubjectCatalog.for_database(db)
+    assert [catalog.enrolled(sid) for sid in ("001", "002", "003")] == [1, 2, 0]
+    catalog.close()
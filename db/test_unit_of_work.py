@@ -0,0 +1,101 @@
+import time
+import pytest
+from db.database import Database
+from db.student_repository import StudentRepository
+from db.unit_of_work import UnitOfWork
+from models.student_model import Student
+
+
+def _session(tmp_path, idle_commit_seconds=None):
+    db = Database(path=str(tmp_path / "students.data"), log_structured=False)
+    session = UnitOfWork(db, autocommit=False, idle_commit_seconds=idle_commit_seconds)
+    repo = StudentRepository(session)
+    student = Student(id="000001", name="John Smith", email="john.smith@university.com", password="Helloworld123")
+    repo.add(student)
+    assert session.commit()
+    return db, session, repo, student
+
+
+def test_buffered_writes_are_merged_into_one_batch(tmp_path, monkeypatch):
+    db, session, repo, student = _session(tmp_path)
+    batches = []
+    commit_batch = db.commit_batch
+    monkeypatch.setattr(db, "commit_batch", lambda entries: (batches.append(entries), commit_batch(entries))[1])
+
+    for subject_id in ("001", "002", "003"):
+        student.enrol_subject(subject_id)
+        repo.save(student)
+    student.change_password("Newpassword456")
+    repo.save(student)
+    assert session.pending() == 1
+    assert session.get("000001")["password"] == "Newpassword456"  # Reads through the session see it
+    assert db.get("000001")["subjects"] == []  # The store does not, yet
+
+    assert session.commit()
+    assert len(batches) == 1 and len(batches[0]) == 1
+    stored = db.get("000001")
+    assert [sub["id"] for sub in stored["subjects"]] == ["001", "002", "003"]
+    assert stored["password"] == "Newpassword456"
+
+
+def test_rollback_runs_compensations_newest_first(tmp_path):
+    db, session, repo, student = _session(tmp_path)
+    undone = []
+    session.on_rollback(lambda: undone.append("first"))
+    session.on_rollback(lambda: undone.append("second"))
+    student.enrol_subject("001")
+    repo.save(student)
+    with pytest.raises(RuntimeError):
+        with session:
+            raise RuntimeError("abandoned")
+    assert undone == ["second", "first"]
+    assert student.subjects == [] and db.get("000001")["subjects"] == []
+
+
+def test_autocommit_writes_straight_through(tmp_path):
+    db = Database(path=str(tmp_path / "students.data"), log_structured=False)
+    session = UnitOfWork(db, autocommit=True)
+    assert session.upsert({"id": "000001", "name": "John Smith", "email": "john.smith@university.com",
+                           "password": "Helloworld123", "subjects": []})
+    assert session.pending() == 0
+    assert db.get("000001")["name"] == "John Smith"
+
+
+def _fail_commits(monkeypatch, db):
+    monkeypatch.setattr(db, "commit_batch", lambda entries: False)
+
+
+def test_failed_commit_reloads_live_students(tmp_path, monkeypatch):
+    db, session, repo, student = _session(tmp_path)
+    generation = repo.generation
+    student.enrol_subject("001")
+    repo.save(student)
+    assert not student.is_dirty()  # save() marks it clean before the commit
+
+    _fail_commits(monkeypatch, db)
+    assert not session.commit()
+    assert student.subjects == []  # Reloaded with the stored state
+    assert repo.generation > generation
+    assert session.pending() == 0
+
+    # The next change is saved and written, not skipped as already clean
+    monkeypatch.undo()
+    student.enrol_subject("002")
+    repo.save(student)
+    assert session.commit()
+    assert [sub["id"] for sub in db.get("000001")["subjects"]] == ["002"]
+
+
+def test_failed_idle_commit_reloads_live_students(tmp_path, monkeypatch):
+    db, session, repo, student = _session(tmp_path, idle_commit_seconds=0.05)
+    _fail_commits(monkeypatch, db)
+    student.change_password("Newpassword123")
+    repo.save(student)
+
+    deadline = time.time() + 5
+    while student.password != "Helloworld123" and time.time() < deadline:
+        time.sleep(0.02)
+    assert student.password == "Helloworld123"
+    assert session.pending() == 0
+    assert db.get("000001")["password"] == "Helloworld123"
+    session.close()
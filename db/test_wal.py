@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+from db.database import Database
+from db.wal import encode_frame, OP_UPSERT
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WRITER = """
+import sys
+from db.database import Database
+db = Database(path=sys.argv[1], log_structured=True, verbose=False)
+for i in range(1000, 1300):
+    db.upsert({"id": f"{i:06d}", "name": "Other", "email": f"o{i}@university.com", "password": "Password123",
+               "subjects": []})
+db.close()
+"""
+
+
+def _record(sid: str, name: str = "Student") -> dict:
+    return {"id": sid, "name": name, "email": f"s{sid}@university.com", "password": "Password123", "subjects": []}
+
+
+def _database(tmp_path) -> Database:
+    return Database(path=str(tmp_path / "students.data"), log_structured=True, verbose=False)
+
+
+def test_mutations_are_logged_and_replayed_on_open(tmp_path):
+    db = _database(tmp_path)
+    db.upsert_many([_record("000001"), _record("000002")])
+    db.patch("000001", {"name": "Renamed"})
+    db.delete("000002")
+    db.upsert(_record("000003"))
+    assert os.path.getsize(db.path + ".log") > 0
+
+    reopened = _database(tmp_path)
+    assert {record["id"]: record["name"] for record in reopened.iterate()} == {"000001": "Renamed", "000003": "Student"}
+
+
+def test_compaction_folds_the_log_into_the_snapshot(tmp_path):
+    db = _database(tmp_path)
+    db.upsert_many([_record("000001"), _record("000002")])
+    db.compact()
+    assert os.path.getsize(db.path + ".log") == 0
+    assert sorted(record["id"] for record in _database(tmp_path).iterate()) == ["000001", "000002"]
+
+
+def test_readers_leave_an_unfinished_append_alone(tmp_path):
+    writer = _database(tmp_path)
+    writer.upsert(_record("000001"))
+    log = writer.path + ".log"
+    frame = encode_frame((OP_UPSERT, _record("000002")))
+    with open(log, "ab") as f:
+        f.write(frame[:7])  # Another process is part-way through this append
+    size = os.path.getsize(log)
+
+    reader = _database(tmp_path)
+    assert [record["id"] for record in reader.iterate()] == ["000001"]
+    assert os.path.getsize(log) == size
+
+    with open(log, "ab") as f:
+        f.write(frame[7:])
+    assert sorted(record["id"] for record in reader.iterate()) == ["000001", "000002"]
+
+
+def test_writer_cuts_off_a_torn_tail_before_appending(tmp_path):
+    db = _database(tmp_path)
+    db.upsert(_record("000001"))
+    with open(db.path + ".log", "ab") as f:
+        f.write(encode_frame((OP_UPSERT, _record("000002")))[:7])  # Left by a crash mid-append
+
+    writer = _database(tmp_path)
+    writer.upsert(_record("000003"))
+    assert sorted(record["id"] for record in _database(tmp_path).iterate()) == ["000001", "000003"]
+
+
+def test_compaction_keeps_appends_from_another_process(tmp_path):
+    db = _database(tmp_path)
+    db.upsert(_record("000001"))
+    writer = subprocess.Popen([sys.executable, "-c", WRITER, db.path], cwd=ROOT)
+    while writer.poll() is None:
+        db.compact()
+    assert writer.returncode == 0
+    db.compact()
+
+    stored = {record["id"] for record in _database(tmp_path).iterate()}
+    assert stored == {"000001"} | {f"{i:06d}" for i in range(1000, 1300)}
@@ -0,0 +1,367 @@
+import copy
+import threading
+from typing import Callable, Dict, List, Optional, Set
+from db.index import normalize_email
+from db.mvcc import Snapshot
+from db.wal import OP_UPSERT, OP_DELETE, OP_PATCH
+from resources.parameters.app_parameters import DATABASE_CONFIG
+
+# Store token seen before the first change_token() call (never equal to a real token)
+_UNSET = object()
+
+
+class UnitOfWork:
+    """
+    Session around a database that buffers a student's writes and commits them together.
+
+    upsert / patch / delete calls are coalesced per student id in memory (a
+    password change after three enrolments is still one patch) and written
+    with a single Database.commit_batch() call, which the backends apply as
+    one atomic write: one log frame, one snapshot rewrite or one SQLite
+    transaction. A commit happens on commit() (the controllers call it at
+    logout), when the session is used as a context manager and the block
+    succeeds, or after `idle_commit_seconds` without a new write.
+
+    Reads through the session (get, find_by_email, snapshot) see the pending
+    writes; other attributes (iterate, map_shards, path, ...) are passed to
+    the wrapped database and see committed state only.
+
+    rollback() discards the pending writes and runs the compensations
+    registered with on_rollback() (e.g. giving a claimed catalog place back)
+    in reverse order, then notifies the listeners added with
+    add_rollback_listener() (the StudentRepository reloads its live
+    students). A failed commit, including one started by the idle timer,
+    rolls back the same way. Listeners added with add_commit_listener() run
+    after every successful commit (the repository sends its deferred
+    events then).
+
+    delete_now() bypasses the buffer for writes that are not part of the
+    session (an admin removing a student), so they never commit it.
+
+    With `autocommit` every write goes straight to the database, exactly as
+    without a session, and commit()/rollback() have nothing to do.
+    """
+
+    def __init__(self, db, autocommit: Optional[bool] = None, idle_commit_seconds: Optional[float] = -1):
+        """
+        Wrap a database. Unset options come from DATABASE_CONFIG
+        ("session_autocommit", "session_idle_commit_seconds").
+        """
+        self.db = db
+        self.autocommit = DATABASE_CONFIG["session_autocommit"] if autocommit is None else autocommit
+        if idle_commit_seconds == -1:
+            idle_commit_seconds = DATABASE_CONFIG["session_idle_commit_seconds"]
+        self.idle_commit_seconds = idle_commit_seconds
+        self._lock = threading.RLock()
+        self._pending: Dict[str, tuple] = {}  # Student id → the log entry to commit for it
+        self._undo: List[Callable[[], None]] = []
+        self._rollback_listeners: List[Callable[[], None]] = []
+        self._commit_listeners: List[Callable[[], None]] = []
+        self._timer: Optional[threading.Timer] = None
+        self._seen_token = _UNSET
+        self._version = 0
+
+    def __getattr__(self, name: str):
+        if name == "db":  # Not set yet (e.g. while unpickling)
+            raise AttributeError(name)
+        return getattr(self.db, name)
+
+    # ---------- Pending writes ----------
+
+    @staticmethod
+    def _merge(stored: Optional[dict], entry: tuple) -> Optional[dict]:
+        """The record as it will be once `entry` is committed over `stored`."""
+        op, payload = entry
+        if op == OP_UPSERT:
+            return payload
+        if op == OP_PATCH and stored is not None:
+            return {**stored, **payload[1]}
+        return None
+
+    def pending(self) -> int:
+        """Number of students with uncommitted writes."""
+        return len(self._pending)
+
+    def pending_ids(self) -> Set[str]:
+        """Ids of the students with uncommitted writes."""
+        with self._lock:
+            return set(self._pending)
+
+    def _touch(self) -> None:
+        """Restart the idle-commit countdown after a buffered write."""
+        if self.idle_commit_seconds is None:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.idle_commit_seconds, self.commit)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    # ---------- Record-level API ----------
+
+    def get(self, student_id: str) -> Optional[dict]:
+        """
+        Return the record with the given id, including pending writes.
+        """
+        sid = str(student_id).strip()
+        with self._lock:
+            entry = self._pending.get(sid)
+            if entry is None:
+                return self.db.get(sid)
+            stored = self.db.get(sid) if entry[0] == OP_PATCH else None
+            return copy.deepcopy(self._merge(stored, entry))
+
+    def find_by_email(self, email: str) -> Optional[dict]:
+        """
+        Return the record whose email matches (case-insensitive), including pending writes.
+        """
+        key = normalize_email(email)
+        with self._lock:
+            for sid, (op, payload) in self._pending.items():
+                if op == OP_UPSERT and normalize_email(payload.get("email", "")) == key:
+                    return copy.deepcopy(payload)
+                if op == OP_PATCH and normalize_email(payload[1].get("email", "")) == key:
+                    return self.get(sid)
+            record = self.db.find_by_email(key)
+            if record is None or record.get("id") not in self._pending:
+                return record
+            record = self.get(record["id"])
+            return record if record and normalize_email(record.get("email", "")) == key else None
+
+    def upsert(self, record: dict) -> bool:
+        """
+        Insert or replace a record at the next commit.
+
+        Returns:
+            True once buffered (in autocommit mode, whether the write succeeded).
+        """
+        if self.autocommit:
+            return self.db.upsert(record)
+        with self._lock:
+            self._pending[self.db._record_id(record)] = (OP_UPSERT, copy.deepcopy(record))
+            self._touch()
+        return True
+
+    def upsert_many(self, records: List[dict]) -> bool:
+        """
+        Insert or replace many records at the next commit.
+
+        Returns:
+            True once buffered (in autocommit mode, whether the write succeeded).
+        """
+        if self.autocommit:
+            return self.db.upsert_many(records)
+        with self._lock:
+            for record in records:
+                self.upsert(record)
+        return True
+
+    def patch(self, student_id: str, changes: dict) -> bool:
+        """
+        Update the given fields of a record at the next commit.
+
+        Returns:
+            True if the record exists (stored or pending), False otherwise.
+        """
+        if self.autocommit:
+            return self.db.patch(student_id, changes)
+        sid = str(student_id).strip()
+        changes = copy.deepcopy(changes)
+        with self._lock:
+            entry = self._pending.get(sid)
+            if entry is None:
+                if self.db.get(sid) is None:
+                    return False
+                self._pending[sid] = (OP_PATCH, (sid, changes))
+            elif entry[0] == OP_UPSERT:
+                self._pending[sid] = (OP_UPSERT, {**entry[1], **changes})
+            elif entry[0] == OP_PATCH:
+                self._pending[sid] = (OP_PATCH, (sid, {**entry[1][1], **changes}))
+            else:
+                return False
+            self._touch()
+            return True
+
+    def delete(self, student_id: str) -> bool:
+        """
+        Delete a record at the next commit.
+
+        Returns:
+            True if the record exists (stored or pending), False otherwise.
+        """
+        if self.autocommit:
+            return self.db.delete(student_id)
+        sid = str(student_id).strip()
+        with self._lock:
+            if self.get(sid) is None:
+                return False
+            self._pending[sid] = (OP_DELETE, sid)
+            self._touch()
+            return True
+
+    def delete_now(self, student_id: str) -> bool:
+        """
+        Delete a record straight from the database, outside the session
+        (nothing pending is committed); a pending write for it is dropped.
+
+        Returns:
+            True if a stored record was removed.
+        """
+        sid = str(student_id).strip()
+        with self._lock:
+            self._pending.pop(sid, None)
+            before = self.db.change_token()
+            deleted = self.db.delete(sid)
+            if before is not None and before == self._seen_token:
+                self._seen_token = self.db.change_token()  # Our own write: nothing new to see
+            return deleted
+
+    def snapshot(self) -> Snapshot:
+        """
+        Pin a snapshot of the database with the pending writes laid over it.
+        """
+        with self._lock:
+            base = self.db.snapshot()
+            if not self._pending:
+                return base
+            pending = dict(self._pending)
+        records = []
+        for record in base:
+            entry = pending.pop(self.db._record_id(record), None)
+            if entry is not None:
+                record = self._merge(record, entry)
+            if record is not None:
+                records.append(record)
+        records.extend(entry[1] for entry in pending.values() if entry[0] == OP_UPSERT)
+        return Snapshot(base.generation, tuple(records), base.release)
+
+    def change_token(self):
+        """
+        Token that changes whenever the state seen through the session does:
+        a write by anyone else or a rollback. The session's own buffered
+        writes and commits keep it, so derived indexes the controllers update
+        alongside their writes stay valid. None if the backend cannot tell.
+        """
+        token = self.db.change_token()
+        if token is None:
+            return None
+        with self._lock:
+            if token != self._seen_token:
+                self._seen_token = token
+                self._version += 1
+            return self._version
+
+    # ---------- Commit / rollback ----------
+
+    def on_rollback(self, callback: Callable[[], None]) -> None:
+        """
+        Register a compensation to run if the pending writes are rolled back.
+        Dropped at commit; ignored in autocommit mode.
+        """
+        if self.autocommit:
+            return
+        with self._lock:
+            self._undo.append(callback)
+
+    def add_rollback_listener(self, callback: Callable[[], None]) -> None:
+        """
+        Call `callback()` after every rollback (explicit or after a failed
+        commit), once the compensations have run. Kept for the session's lifetime.
+        """
+        self._rollback_listeners.append(callback)
+
+    def add_commit_listener(self, callback: Callable[[], None]) -> None:
+        """
+        Call `callback()` after every commit that wrote pending changes.
+        Kept for the session's lifetime.
+        """
+        self._commit_listeners.append(callback)
+
+    def commit(self) -> bool:
+        """
+        Write every pending change as one batch.
+
+        Returns:
+            True if the changes were written (or there were none); False if
+            the write failed, in which case the session was rolled back.
+        """
+        with self._lock:
+            self._cancel_timer()
+            if not self._pending:
+                self._undo.clear()
+                return True
+            before = self.db.change_token()
+            committed = self.db.commit_batch(list(self._pending.values()))
+            if committed:
+                self._pending.clear()
+                self._undo.clear()
+                if before is not None and before == self._seen_token:
+                    self._seen_token = self.db.change_token()  # Our own commit: nothing new to see
+            else:
+                print(f"[ERROR][DB] Session commit to {self.db.path} failed; rolling back")
+        # Outside our lock: the listeners take the repository's lock, which writers hold while calling us
+        if not committed:
+            self.rollback()
+            return False
+        for listener in self._commit_listeners:
+            try:
+                listener()
+            except Exception as e:
+                print(f"[ERROR][DB] Commit listener failed: {e}")
+        return True
+
+    def rollback(self) -> None:
+        """
+        Discard the pending writes, run the registered compensations (newest
+        first), then notify the rollback listeners.
+        """
+        with self._lock:
+            self._cancel_timer()
+            self._pending.clear()
+            undo, self._undo = self._undo, []
+            self._version += 1
+        for callback in reversed(undo):
+            try:
+                callback()
+            except Exception as e:
+                print(f"[ERROR][DB] Rollback step failed: {e}")
+        for listener in self._rollback_listeners:
+            try:
+                listener()
+            except Exception as e:
+                print(f"[ERROR][DB] Rollback listener failed: {e}")
+
+    def write_to_file(self, data_list: List):
+        """
+        Commit the pending writes, then replace the whole store.
+        """
+        self.commit()
+        self.db.write_to_file(data_list)
+
+    def clear_all(self):
+        """
+        Roll back the pending writes (the store is about to be emptied, so
+        they are not committed), then empty the store.
+        """
+        self.rollback()
+        self.db.clear_all()
+
+    def close(self) -> None:
+        """
+        Commit anything pending and stop the idle timer. The wrapped database stays open.
+        """
+        self.commit()
+
+    def __enter__(self) -> "UnitOfWork":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
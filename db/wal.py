@@ -0,0 +1,171 @@
+import os
+import pickle
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are serialized within a process only
+    fcntl = None
+
+# Frame header: payload length (uint32) + CRC32 of the payload (uint32)
+FRAME_HEADER = struct.Struct(">II")
+
+# Log operations
+OP_UPSERT = "upsert"
+OP_DELETE = "delete"
+OP_CLEAR = "clear"
+OP_PATCH = "patch"  # Payload: (id, {field: new value}) for an existing record
+OP_BATCH = "batch"  # Payload: list of the entries above, applied together or not at all
+
+
+def encode_frame(entry: object) -> bytes:
+    """
+    Encode a single log entry (or snapshot record) as a length-prefixed, checksummed frame.
+    """
+    payload = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+    return FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def iter_frames(f: BinaryIO, strict: bool = False) -> Iterator[object]:
+    """
+    Decode frames from the current position of an open file, one at a time.
+
+    Stops at the end of the file. A torn or corrupt frame also ends the
+    iteration quietly, or raises ValueError when `strict` is set.
+    """
+    while True:
+        header = f.read(FRAME_HEADER.size)
+        if not header:
+            return
+        payload = b""
+        if len(header) == FRAME_HEADER.size:
+            length, crc = FRAME_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) == length and zlib.crc32(payload) == crc:
+                yield pickle.loads(payload)
+                continue
+        if strict:
+            raise ValueError("torn or corrupt frame")
+        return
+
+
+class WriteAheadLog:
+    """
+    Append-only log of student mutations stored next to `students.data`.
+
+    Each entry is one of:
+      - ("upsert", record_dict)
+      - ("delete", student_id)
+      - ("clear", None)
+
+    Entries are idempotent, so replaying the log on top of a snapshot that
+    already contains some of them still produces the correct state.
+
+    Readers never modify the file: a torn frame at the end may be an append
+    still in progress in another process. Only a writer repairs it, by
+    passing the end of the last complete frame it read to append().
+
+    Writers in every process hold locked() around their reads, appends and
+    replace(), so no append can land between a compactor's snapshot and its
+    replace() and be lost.
+    """
+
+    def __init__(self, path: str, fsync: bool = True):
+        """
+        Open (or create) the log file at the given path.
+        """
+        self.path = path
+        self.fsync = fsync
+        if not os.path.exists(self.path):
+            open(self.path, "ab").close()
+        self._lock = threading.RLock()
+        self._lock_file = None
+        self._depth = 0
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """
+        Hold the writer lock: a thread lock plus, where available, an
+        exclusive flock on "<log>.lock" (the log itself is swapped out by
+        replace(), so it cannot carry the lock). Reentrant.
+        """
+        with self._lock:
+            if not self._depth and fcntl is not None:
+                if self._lock_file is None:
+                    self._lock_file = open(self.path + ".lock", "ab")
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if not self._depth and fcntl is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def append(self, entries: List[Tuple], end: Optional[int] = None) -> int:
+        """
+        Append the given entries to the log as one write.
+
+        `end` is where the caller's replay stopped (the end of the last
+        complete frame). Anything after it is a torn tail left by a crash
+        and is cut off first, so the new frames stay readable.
+
+        Returns:
+            The size of the log in bytes after the append.
+        """
+        if not entries:
+            return self.size()
+        blob = b"".join(encode_frame(e) for e in entries)
+        with open(self.path, "ab") as f:
+            if end is not None and f.seek(0, os.SEEK_END) > end:
+                print(f"[WARN][WAL] Truncating torn tail of {self.path} at byte {end}")
+                f.truncate(end)
+            f.write(blob)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            return f.tell()
+
+    def replay(self, start: int = 0) -> Tuple[List[Tuple], int]:
+        """
+        Read every complete entry in the log from the given byte offset.
+
+        A torn or corrupt frame (a crash mid-append, or an append still in
+        progress) ends the replay. The file is left as it is.
+
+        Returns:
+            The entries, and the offset just past the last complete frame.
+        """
+        entries = []
+        end = start
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            for entry in iter_frames(f):
+                entries.append(entry)
+                end = f.tell()
+        return entries, end
+
+    def replace(self, data: bytes) -> None:
+        """
+        Atomically replace the whole log with the given raw frames.
+        """
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def size(self) -> int:
+        """
+        Current size of the log file in bytes.
+        """
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
@@ -1,9 +1,12 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional, List, Tuple, Dict
+from typing import Optional, Iterable, List, Tuple, Dict, Union
 from models.user_model import User
 from models.student_model import Student
-from models.subject_model import grade_from_mark
+from models.student_table import StudentTable
+
+# What the Admin reports accept: students one at a time, or a columnar table
+Population = Union[Iterable[Student], StudentTable]
 
 def overall_grade_for(student: Student) -> Optional[str]:
     """
@@ -13,13 +16,10 @@ def overall_grade_for(student: Student) -> Optional[str]:
         str: grade letter corresponding to the student's average.
         None: if the student has no subjects or marks.
     """
-    avg = student.average_mark()
-    if avg is None:
-        return None
-    return grade_from_mark(int(round(avg)))
+    return student.overall_grade
 
 
-@dataclass
+@dataclass(slots=True)
 class Admin(User):
     """
     Administrator utilities.
@@ -46,9 +46,11 @@ class Admin(User):
     # ---------- Queries / transforms over students (static) ----------
 
     @staticmethod
-    def list_students(students: List[Student]) -> List[dict]:
+    def list_students(students: Population) -> List[dict]:
         """
         Return a list of students with their key summary information.
+        Accepts any iterable, so students can be streamed one at a time,
+        or a StudentTable, which is summarized in one vectorized pass.
 
         Each record includes:
           - id, name, email
@@ -56,6 +58,8 @@ class Admin(User):
           - average mark
           - overall grade
         """
+        if isinstance(students, StudentTable):
+            return students.summary_rows()
         out: List[dict] = []
         for s in students:
             avg = s.average_mark()
@@ -70,13 +74,17 @@ class Admin(User):
         return out
 
     @staticmethod
-    def partition_pass_fail(students: List[Student]) -> Dict[str, List[Student]]:
+    def partition_pass_fail(students: Population) -> Dict[str, List[Student]]:
         """
         Separate students into PASS and FAIL groups based on their average mark.
+        Consumes the iterable in a single pass.
 
         Returns:
             dict: {"PASS": [...], "FAIL": [...]}
         """
+        if isinstance(students, StudentTable):
+            passed, failed = students.pass_fail_rows()
+            return {"PASS": students.students(passed), "FAIL": students.students(failed)}
         result: Dict[str, List[Student]] = {"PASS": [], "FAIL": []}
         for s in students:
             avg = s.average_mark()
@@ -106,13 +114,16 @@ class Admin(User):
         return []
 
     @staticmethod
-    def group_by_grade(students: List[Student]) -> Dict[str, List[Student]]:
+    def group_by_grade(students: Population) -> Dict[str, List[Student]]:
         """
         Group students by their overall grade (HD, D, C, P, F).
+        Consumes the iterable in a single pass.
 
         Returns:
             dict: grade → list of students
         """
+        if isinstance(students, StudentTable):
+            return {grade: students.students(rows) for grade, rows in students.grade_buckets().items()}
         buckets: Dict[str, List[Student]] = {}
         for s in students:
             g = overall_grade_for(s)
@@ -1,29 +1,102 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Set
 import random
+import sys
 from models.user_model import User, gen_student_id
-from models.subject_model import Subject, gen_subject_id, grade_from_mark, MAX_SUBJECTS
+from models.subject_model import Subject, gen_subject_id, grade_from_mark, subject_title, MAX_SUBJECTS
 
-@dataclass
-class Student(User):
+class _WeakReferenceable:
+    """Adds a __weakref__ slot (dataclass's weakref_slot needs Python 3.11)."""
+
+    __slots__ = ("__weakref__",)
+
+
+@dataclass(slots=True)
+class Student(User, _WeakReferenceable):
     """
     Represents a student user in the system.
 
     Inherits from `User` and extends it with subject enrolment
     management. Each student may enrol in up to MAX_SUBJECTS subjects.
+    Slot-based, so instances carry no per-instance __dict__ (just a weakref
+    slot, for the StudentRepository's identity map).
+
+    A running mark sum and subject count, plus the overall grade derived from
+    them, are kept up to date by enrol_subject() and remove_subject(), so
+    average_mark(), has_passed() and overall_grade are O(1) reads.
+
+    The mutators also record which fields changed since the student was last
+    saved, so controllers can persist just delta() (or skip the write).
     """
 
     subjects: List[Subject] = field(default_factory=list)
+    mark_sum: int = field(default=0, repr=False, compare=False)
+    mark_count: int = field(default=0, repr=False, compare=False)
+    overall_grade: Optional[str] = field(default=None, repr=False, compare=False)
+    changed: Optional[Set[str]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Derive the aggregates when they were not supplied with the subjects."""
+        if self.mark_count != len(self.subjects):
+            self._recompute_aggregates()
+
+    # ---------- Running aggregates ----------
+
+    def _recompute_aggregates(self) -> None:
+        """Rebuild the running totals from the subjects list."""
+        self.mark_sum = sum(s.mark for s in self.subjects if s.mark is not None)
+        self.mark_count = len(self.subjects)
+        self._update_grade()
+
+    def _update_grade(self) -> None:
+        """Re-derive the overall grade from the running totals."""
+        avg = self.average_mark()
+        self.overall_grade = None if avg is None else grade_from_mark(int(round(avg)))
+
+    # ---------- Dirty tracking ----------
+
+    def mark_dirty(self, *fields: str) -> None:
+        """Record that the given fields (name, email, password, subjects) changed."""
+        if self.changed is None:
+            self.changed = set()
+        self.changed.update(fields)
+
+    def is_dirty(self) -> bool:
+        """True if anything changed since the student was loaded or last saved."""
+        return bool(self.changed)
+
+    def delta(self) -> dict:
+        """
+        The changed fields in to_dict() form. A subjects change carries the
+        running aggregates along with it.
+        """
+        data = {}
+        for name in self.changed or ():
+            if name == "subjects":
+                data["subjects"] = [s.to_dict() for s in self.subjects]
+                data["mark_sum"] = self.mark_sum
+                data["mark_count"] = self.mark_count
+                data["overall_grade"] = self.overall_grade
+            else:
+                data[name] = getattr(self, name)
+        return data
+
+    def mark_clean(self) -> None:
+        """Forget the recorded changes (after they were saved)."""
+        self.changed = None
 
     @staticmethod
-    def create(name: str, email: str, password: str) -> "Student":
+    def create(name: str, email: str, password: str, student_id: Optional[str] = None) -> "Student":
         """
         Create a new Student instance after validating email and password.
 
         Validation rules come from User validators to ensure consistency:
           - Email must end with '@university.com'
           - Password must start with uppercase, include ≥5 letters, and ≥3 digits
+
+        `student_id` should come from the database's IdAllocator; without one a
+        random id is drawn (which may collide with a stored student).
         """
         if not User.validate_email(email):
             raise ValueError("Email must end with @university.com.")
@@ -31,29 +104,30 @@ class Student(User):
             raise ValueError("Password must start with an uppercase, have ≥5 letters, then ≥3 digits.")
 
         return Student(
-            id=gen_student_id(),
+            id=student_id or gen_student_id(),
             name=name.strip(),
             email=email.strip().lower(),   # normalize for uniqueness
             password=password.strip(),
             subjects=[]
         )
 
-    def enrol_subject(self, title: str) -> Subject:
+    def enrol_subject(self, subject_id: Optional[str] = None) -> Subject:
         """
-        Enrol the student in a new subject.
+        Enrol the student in a subject.
 
-        A random subject ID is generated, and the title is standardized
-        as 'Subject-<id>' to match CLI output format.
+        `subject_id` normally comes from the SubjectCatalog; without one a
+        random subject ID is drawn. The title is standardized as
+        'Subject-<id>' to match CLI output format.
 
         Raises:
-            ValueError: if the student already has MAX_SUBJECTS or if
-                        the randomly generated subject ID is duplicated.
+            ValueError: if the student already has MAX_SUBJECTS or is
+                        already enrolled in the subject.
         """
         if len(self.subjects) >= MAX_SUBJECTS:
             raise ValueError(f"students are allowed to enrol in {MAX_SUBJECTS} subjects only")
 
-        new_id = gen_subject_id()
-        norm_title = f"Subject-{new_id}"
+        new_id = sys.intern(subject_id.strip() if subject_id else gen_subject_id())
+        norm_title = subject_title(new_id)
 
         # Prevent duplicate enrolments by ID
         if any(s.id == new_id for s in self.subjects):
@@ -63,6 +137,10 @@ class Student(User):
         mark = random.randint(25, 100)
         sub = Subject(id=new_id, title=norm_title, mark=mark, grade=grade_from_mark(mark))
         self.subjects.append(sub)
+        self.mark_sum += mark
+        self.mark_count += 1
+        self._update_grade()
+        self.mark_dirty("subjects")
         return sub
 
     def remove_subject(self, subject_id: str) -> bool:
@@ -76,6 +154,10 @@ class Student(User):
         for i, s in enumerate(self.subjects):
             if s.id == sid:
                 del self.subjects[i]
+                self.mark_sum -= s.mark or 0
+                self.mark_count -= 1
+                self._update_grade()
+                self.mark_dirty("subjects")
                 return True
         return False
 
@@ -89,17 +171,19 @@ class Student(User):
         if not User.validate_password(new_password):
             raise ValueError("Incorrect password format")
         self.password = new_password.strip()
+        self.mark_dirty("password")
 
     def average_mark(self) -> Optional[float]:
         """
-        Compute the student's average mark across all enrolled subjects.
+        The student's average mark across all enrolled subjects,
+        read from the running totals.
 
         Returns:
             The average (float) or None if the student has no subjects.
         """
-        if not self.subjects:
+        if not self.mark_count:
             return None
-        return sum(subj.mark for subj in self.subjects if subj.mark is not None) / len(self.subjects)
+        return self.mark_sum / self.mark_count
 
     def has_passed(self) -> bool:
         """
@@ -119,21 +203,38 @@ class Student(User):
             "name": self.name,
             "email": self.email,
             "password": self.password,
-            "subjects": [s.to_dict() for s in self.subjects]
+            "subjects": [s.to_dict() for s in self.subjects],
+            "mark_sum": self.mark_sum,
+            "mark_count": self.mark_count,
+            "overall_grade": self.overall_grade
         }
 
     @staticmethod
     def from_dict(data: dict) -> "Student":
         """
         Rebuild a Student instance from its dictionary form.
-        Used when loading from the database file.
-        """
+        Used when loading from the database file. Stored aggregates are
+        reused when present; otherwise (older records, or backends that do
+        not keep them) they are recomputed from the subjects.
+        """
+        subjects = [Subject.from_dict(s) for s in data.get("subjects", [])]
+        if data.get("mark_count") == len(subjects):
+            return Student(
+                id=data["id"],
+                name=data["name"],
+                email=data["email"],
+                password=data["password"],
+                subjects=subjects,
+                mark_sum=data["mark_sum"],
+                mark_count=data["mark_count"],
+                overall_grade=data.get("overall_grade")
+            )
         return Student(
             id=data["id"],
             name=data["name"],
             email=data["email"],
             password=data["password"],
-            subjects=[Subject.from_dict(s) for s in data.get("subjects", [])]
+            subjects=subjects
         )
 
 
@@ -142,6 +243,12 @@ def students_from_dicts(data: list[dict]) -> list["Student"]:
     return [Student.from_dict(d) for d in data]
 
 
+def iter_students_from_dicts(data: Iterable[dict]) -> Iterator["Student"]:
+    """Lazily convert student dictionaries into Student objects, one at a time."""
+    for d in data:
+        yield Student.from_dict(d)
+
+
 def students_to_dicts(students: list["Student"]) -> list[dict]:
     """Convert a list of Student objects into dictionaries for storage."""
     return [s.to_dict() for s in students]
@@ -0,0 +1,130 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence
+from models.student_model import Student
+from models.subject_model import GRADE_ORDER, MAX_SUBJECTS
+
+try:
+    import numpy as np
+except ImportError:  # Optional: without NumPy, Admin keeps its per-student path
+    np = None
+
+# Lower mark bound of each grade, aligned with GRADE_ORDER (see grade_from_mark)
+GRADE_FLOORS = [85, 75, 65, 50, 0]
+
+
+class StudentTable:
+    """
+    Struct-of-arrays view of a student population for vectorized reporting.
+
+    Columns:
+      - ids, names, emails: Python lists (one entry per student)
+      - marks: (N, MAX_SUBJECTS) uint8 matrix, unused cells are 0
+      - counts: uint8 vector, number of subjects per student
+
+    Averages, overall grades, pass/fail masks and grade buckets are computed
+    for the whole population at once with NumPy. Student objects are only
+    built for the rows a report actually returns.
+    """
+
+    available = np is not None
+
+    def __init__(self, records: Sequence[dict]):
+        """
+        Build the columns from stored student records.
+        """
+        if np is None:
+            raise RuntimeError("StudentTable requires NumPy")
+        self._records = records
+        n = len(records)
+        self.ids: List[str] = [r["id"] for r in records]
+        self.names: List[str] = [r["name"] for r in records]
+        self.emails: List[str] = [r["email"] for r in records]
+        self.counts = np.fromiter((len(r.get("subjects", ())) for r in records), dtype=np.uint8, count=n)
+        # A missing mark counts as 0 but still counts as a subject (as in Student.average_mark)
+        flat = [0] * (n * MAX_SUBJECTS)
+        for i, r in enumerate(records):
+            base = i * MAX_SUBJECTS
+            for j, sub in enumerate(r.get("subjects", ())[:MAX_SUBJECTS]):
+                flat[base + j] = sub.get("mark") or 0
+        self.marks = np.asarray(flat, dtype=np.uint8).reshape(n, MAX_SUBJECTS)
+        self._averages: Optional["np.ndarray"] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---------- Vectorized columns ----------
+
+    def averages(self) -> "np.ndarray":
+        """Average mark per student (NaN for students with no subjects)."""
+        if self._averages is None:
+            totals = self.marks.sum(axis=1, dtype=np.float64)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self._averages = np.where(self.counts > 0, totals / self.counts, np.nan)
+        return self._averages
+
+    def has_subjects(self) -> "np.ndarray":
+        """Mask of students with at least one subject."""
+        return self.counts > 0
+
+    def pass_mask(self) -> "np.ndarray":
+        """Mask of students whose average is at least 50."""
+        with np.errstate(invalid="ignore"):
+            return self.averages() >= 50.0
+
+    def pass_fail_rows(self) -> tuple:
+        """Row indices of passing and failing students (students with no subjects are in neither)."""
+        graded, passed = self.has_subjects(), self.pass_mask()
+        return np.flatnonzero(graded & passed), np.flatnonzero(graded & ~passed)
+
+    def grade_codes(self) -> "np.ndarray":
+        """
+        Index into GRADE_ORDER of each student's overall grade (-1 for none).
+        The average is rounded half-to-even first, like round() in overall_grade_for().
+        """
+        rounded = np.rint(np.nan_to_num(self.averages(), nan=-1.0))
+        codes = np.full(len(self), len(GRADE_ORDER) - 1, dtype=np.int8)
+        for code in range(len(GRADE_ORDER) - 2, -1, -1):
+            codes[rounded >= GRADE_FLOORS[code]] = code
+        codes[~self.has_subjects()] = -1
+        return codes
+
+    def grades(self) -> List[Optional[str]]:
+        """Overall grade letter per student (None for no subjects)."""
+        return [GRADE_ORDER[c] if c >= 0 else None for c in self.grade_codes().tolist()]
+
+    def grade_buckets(self) -> Dict[str, "np.ndarray"]:
+        """Row indices per grade letter (grades with no students are left out)."""
+        codes = self.grade_codes()
+        buckets = {}
+        for code, grade in enumerate(GRADE_ORDER):
+            rows = np.flatnonzero(codes == code)
+            if rows.size:
+                buckets[grade] = rows
+        return buckets
+
+    # ---------- Report helpers ----------
+
+    def student(self, row: int) -> Student:
+        """Decode one row back into a Student."""
+        return Student.from_dict(self._records[row])
+
+    def students(self, rows: "np.ndarray") -> List[Student]:
+        """Decode the given rows into Students."""
+        return [Student.from_dict(self._records[i]) for i in rows.tolist()]
+
+    def summary_rows(self) -> List[dict]:
+        """Rows in the format of Admin.list_students()."""
+        averages = np.round(self.averages(), 2).tolist()
+        counts = self.counts.tolist()
+        return [
+            {
+                "id": sid,
+                "name": name,
+                "email": email,
+                "subjects_count": count,
+                "avg": None if count == 0 else avg,
+                "grade": grade,
+            }
+            for sid, name, email, count, avg, grade in zip(
+                self.ids, self.names, self.emails, counts, averages, self.grades())
+        ]
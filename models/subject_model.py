@@ -1,6 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
 import random
+import sys
 
 # Grade order used for admin grade grouping and reporting
 GRADE_ORDER = ["HD", "D", "C", "P", "F"]
@@ -17,6 +18,14 @@ def gen_subject_id() -> str:
     return f"{random.randint(1, 999):03d}"
 
 
+def subject_title(subject_id: str) -> str:
+    """
+    Derived title for a subject id, e.g. "Subject-123".
+    Interned, so every enrolment in the same subject shares one string.
+    """
+    return sys.intern(f"Subject-{subject_id}")
+
+
 def grade_from_mark(mark: int) -> str:
     """
     Convert a numeric mark (0–100) into a grade letter:
@@ -36,11 +45,14 @@ def grade_from_mark(mark: int) -> str:
         return "P"
     return "F"
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Subject:
     """
     Represents a subject enrolment with its unique ID, title, mark, and grade.
     Instances are usually created through Student.enrol_subject().
+
+    Immutable and slot-based (no per-instance __dict__); the id, title and
+    grade strings are interned when loaded, so they are shared across records.
     """
     id: str       # 3-digit subject ID, e.g. "123"
     title: str    # Human-readable title, e.g. "Subject-123"
@@ -66,8 +78,8 @@ class Subject:
         Expected keys: id, title, mark, grade
         """
         return Subject(
-            id=data["id"],
-            title=data["title"],
+            id=sys.intern(data["id"]),
+            title=sys.intern(data["title"]),
             mark=data["mark"],
-            grade=data["grade"]
+            grade=sys.intern(data["grade"])
         )
@@ -0,0 +1,75 @@
+import dataclasses
+import weakref
+import pytest
+from models.student_model import Student
+from models.subject_model import Subject
+
+
+def _record(sid: str, marks=(70, 40)) -> dict:
+    return {"id": sid, "name": "Student", "email": f"s{sid}@university.com", "password": "Password123",
+            "subjects": [{"id": f"{i:03d}", "title": f"Subject-{i:03d}", "mark": mark, "grade": "C"}
+                         for i, mark in enumerate(marks, start=1)]}
+
+
+def test_students_and_subjects_carry_no_instance_dict():
+    student = Student.from_dict(_record("000001"))
+    assert not hasattr(student, "__dict__")
+    assert not hasattr(student.subjects[0], "__dict__")
+    assert weakref.ref(student)() is student  # The repository's identity map holds weak references
+    with pytest.raises(AttributeError):
+        student.nickname = "Sam"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        student.subjects[0].mark = 100
+
+
+def test_loaded_subjects_share_their_strings():
+    first, second = Student.from_dict(_record("000001")), Student.from_dict(_record("000002"))
+    assert first.subjects[0].title is second.subjects[0].title
+    assert first.subjects[1].id is second.subjects[1].id
+
+
+def _expected(student: Student) -> tuple:
+    marks = [sub.mark for sub in student.subjects]
+    return sum(marks), len(marks), Student(student.id, student.name, student.email, student.password,
+                                           list(student.subjects)).overall_grade
+
+
+def test_running_aggregates_follow_enrolments_and_drops():
+    student = Student.create("Sam Lee", "sam.lee@university.com", "Password123", student_id="000001")
+    assert (student.average_mark(), student.overall_grade, student.has_passed()) == (None, None, False)
+    for subject_id in ("001", "002", "003"):
+        student.enrol_subject(subject_id)
+        assert (student.mark_sum, student.mark_count, student.overall_grade) == _expected(student)
+    student.remove_subject("002")
+    assert not student.remove_subject("999")
+    assert (student.mark_sum, student.mark_count, student.overall_grade) == _expected(student)
+    assert student.average_mark() == pytest.approx(sum(s.mark for s in student.subjects) / 2)
+
+
+def test_stored_aggregates_are_reused_or_recomputed():
+    stale = Student.from_dict({**_record("000001"), "mark_sum": 999, "mark_count": 2, "overall_grade": "HD"})
+    assert (stale.mark_sum, stale.overall_grade) == (999, "HD")  # Trusted when the count matches
+
+    legacy = Student.from_dict(_record("000001", marks=(90, 60)))
+    assert (legacy.mark_sum, legacy.mark_count, legacy.overall_grade) == (150, 2, "D")
+    assert legacy.has_passed()
+    stored = legacy.to_dict()
+    assert (stored["mark_sum"], stored["mark_count"], stored["overall_grade"]) == (150, 2, "D")
+
+
+def test_mutators_record_only_the_fields_they_change():
+    student = Student.from_dict(_record("000001"))
+    assert not student.is_dirty() and student.delta() == {}
+
+    student.change_password("Newpassword456")
+    assert student.delta() == {"password": "Newpassword456"}
+    student.enrol_subject("003")
+    delta = student.delta()
+    assert set(delta) == {"password", "subjects", "mark_sum", "mark_count", "overall_grade"}
+    assert [sub["id"] for sub in delta["subjects"]] == ["001", "002", "003"]
+
+    student.mark_clean()
+    assert not student.is_dirty()
+    with pytest.raises(ValueError):
+        student.change_password("weak")
+    assert not student.is_dirty()
@@ -21,7 +21,7 @@ def gen_student_id() -> str:
     return f"{random.randint(1, 999_999):06d}"
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """
     Base class representing a generic user of the system.
@@ -253,3 +253,84 @@ RADIO_CONFIG = {
     "layout": "grid",
     "padding": (5, 5)
 }
+
+# DATABASE CONFIGS
+
+DATABASE_CONFIG = {
+    # Storage backend: "pickle", "sharded", "sqlite" or "record"
+    "backend": "pickle",
+    "directory": "db",
+    "filename": "students.data",
+    "sqlite_filename": "students.sqlite3",
+    "record_filename": "students.rec",
+    # Sharded backend: number of shard files and whether admin scans load them in parallel
+    "shard_count": 8,
+    "parallel_scan": True,
+    # Append mutations to "<filename>.log" instead of rewriting the whole file
+    "log_structured": False,
+    # Snapshot file layout: "pickle" (one pickled list) or "stream" (one framed record at a time)
+    "snapshot_format": "pickle",
+    # Snapshot compression: "none", "zlib", "lzma" or "bz2" (detected automatically on read)
+    "compression": "none",
+    # Fold the log into a new snapshot once it grows past either threshold
+    "compact_max_log_bytes": 4 * 1024 * 1024,
+    "compact_min_log_bytes": 64 * 1024,
+    "compact_ratio": 1.0,
+    "log_fsync": True,
+    # Keep decoded records in memory until the file's stat signature changes
+    "read_cache": True,
+    # Snapshot writes arriving within this window are coalesced into one fsynced commit
+    "group_commit_window_ms": 2,
+    # Persistent email → id and id → location indexes next to the data file
+    "secondary_indexes": False,
+    "index_autorebuild": True,
+    # AsyncDatabase thread pools: point reads/writes, and whole-population scans
+    "async_workers": 4,
+    "async_scan_workers": 1,
+    "async_batch_size": 256,
+    # Bulk importer (python -m db.importer): rows per committed batch, validation processes (None = CPU count)
+    "import_batch_size": 5000,
+    "import_workers": None,
+    # Student sessions (UnitOfWork): with autocommit (the default) every write goes straight to
+    # the store and is durable at once, as without a session. Turning it off buffers a session's
+    # writes and commits them as one write at logout, on an explicit commit, or after this many
+    # idle seconds (None = only at logout/commit); a crash before then loses the buffered writes.
+    "session_autocommit": True,
+    "session_idle_commit_seconds": 30.0,
+    # StudentRepository.get_many(): students not in memory beyond this many are read from one snapshot
+    "repository_point_loads": 64
+}
+
+# SYNTHETIC DATA CONFIGS
+
+GENERATOR_CONFIG = {
+    # Probability of a student having 0, 1, 2, 3 or 4 subjects
+    "subject_count_weights": [0.1, 0.15, 0.2, 0.25, 0.3],
+    # Mark distribution: "uniform" (mark_min..mark_max, like enrol_subject) or "normal" (mark_mean ± mark_std)
+    "mark_distribution": "uniform",
+    "mark_min": 25,
+    "mark_max": 100,
+    "mark_mean": 65,
+    "mark_std": 15,
+    # Students generated (and committed, for incremental backends) per batch
+    "batch_size": 100_000,
+    "seed": 42
+}
+
+# SUBJECT CATALOG CONFIGS
+
+SUBJECT_CONFIG = {
+    # Subjects 001..catalog_size are offered when the catalog file is first created
+    "catalog_size": 999,
+    # Places per subject (None = unlimited); change single subjects with SubjectCatalog.offer()
+    "default_capacity": None
+}
+
+# ADMIN CONFIGS
+
+ADMIN_CONFIG = {
+    # Populations (per shard) at least this large are reported through the NumPy StudentTable
+    "columnar_threshold": 5000,
+    # Recompute the materialized grade / PASS-FAIL aggregates on every report and warn about differences
+    "verify_aggregates": False
+}
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from typing import List, Dict, Optional
+from typing import List, Dict
 from view.CLI.base_page import BasePage
 from models.student_model import Student
-from models.subject_model import grade_from_mark, GRADE_ORDER
+from models.subject_model import GRADE_ORDER
 
 
 class AdminPage(BasePage):
@@ -32,18 +32,12 @@ class AdminPage(BasePage):
                 continue
 
     # ---------- Helper methods (formatting and grade conversion) ----------
-    @staticmethod
-    def _grade_from_avg(avg: Optional[float]) -> Optional[str]:
-        if avg is None:
-            return None
-        return grade_from_mark(int(round(avg)))
-
     def _format_student_for_list(self, s: Student) -> str:
         """Exact one-line item used in Grade Grouping and PASS/FAIL Partition."""
         avg = s.average_mark()
         if avg is None:
             return f"{s.name} :: {s.id} --> GRADE: N/A - MARK: N/A"
-        grade = self._grade_from_avg(avg) or "N/A"
+        grade = s.overall_grade or "N/A"
         return f"{s.name} :: {s.id} --> GRADE: {grade} - MARK: {avg:.2f}"
 
     # ---------- Menu option flows ----------
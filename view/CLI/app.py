@@ -3,7 +3,13 @@ from view.CLI.student_page import StudentPage
 from controller.admin_controller import AdminController
 from controller.student_controller import StudentController
 from controller.subject_controller import SubjectController 
-from db.database import Database
+from db.async_database import AsyncDatabase
+from db.backends import open_database
+from db.enrolment_index import EnrolmentIndex
+from db.id_allocator import IdAllocator
+from db.student_repository import StudentRepository
+from db.subject_catalog import SubjectCatalog
+from db.unit_of_work import UnitOfWork
 
 
 class App:
@@ -11,11 +17,23 @@ class App:
 
     def __init__(self):
         """Set up database, controllers, and views."""
-        self.db = Database()
+        self.db = open_database()
+        self.adb = AsyncDatabase(self.db)
+        self.ids = IdAllocator.for_database(self.db)
+        self.catalog = SubjectCatalog.for_database(self.db)
+        # Student writes go straight to the store; with session_autocommit off they are
+        # buffered and committed at logout instead (see UnitOfWork)
+        self.session = UnitOfWork(self.db)
+        # Built on the session so a rebuild sees any enrolments still buffered in it
+        self.enrolments = EnrolmentIndex(self.session, self.catalog)
+        # One live Student per id, shared by every controller
+        self.students = StudentRepository(self.session)
         # Controllers
-        self.admin_controller = AdminController(self.db)
-        self.student_controller = StudentController(self.db)
-        self.subject_controller = SubjectController(self.db) 
+        self.admin_controller = AdminController(self.db, adb=self.adb, ids=self.ids, catalog=self.catalog,
+                                                enrolments=self.enrolments, students=self.students)
+        self.student_controller = StudentController(self.session, adb=self.adb, ids=self.ids, students=self.students)
+        self.subject_controller = SubjectController(self.session, adb=self.adb, catalog=self.catalog,
+                                                    enrolments=self.enrolments, students=self.students)
 
         # Pages
         self.admin_page = AdminPage(self.admin_controller)
@@ -33,6 +51,7 @@ class App:
             elif choice == 'S':      # Student system
                 self.student_page.show()
             elif choice == 'X':      # Exit
+                self.session.close()
                 print("\033[93mThank You\033[0m")
                 break
             else:                    # Invalid input
@@ -20,7 +20,8 @@ class StudentPage(BasePage):
                 self.register()
             elif student_choice == 'l':    # Login
                 self.login()
-            elif student_choice == 'x':    # Exit
+            elif student_choice == 'x':    # Exit (saves any registrations still buffered)
+                self.student.commit()
                 break
             else:
                 continue
@@ -98,6 +99,9 @@ class StudentPage(BasePage):
             elif choice == "s":
                 self._show_subjects_flow()
             elif choice == "x":
+                ok, msg = self.student.logout()
+                if not ok:
+                    print(f"\t\t\033[91m{msg}\033[0m")
                 break
             else:
                 continue
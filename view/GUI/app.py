@@ -1,14 +1,26 @@
+import asyncio
+import threading
 from tkinter import Tk, messagebox
 from view.GUI.login_page import LoginPage
 from view.GUI.splash_page import SplashScreenPage
 from view.GUI.enrolment_page import EnrolmentPage
 from theme.style_config import setup_styles
 from resources.parameters.app_parameters import APP_CONFIG
-from db.database import Database
+from db.async_database import AsyncDatabase
+from db.backends import open_database
+from db.enrolment_index import EnrolmentIndex
+from db.id_allocator import IdAllocator
+from db.student_repository import StudentRepository
+from db.subject_catalog import SubjectCatalog
+from db.unit_of_work import UnitOfWork
 from controller.student_controller import StudentController
 from controller.admin_controller import AdminController
+from controller.subject_controller import SubjectController
 import inspect
 
+# How often (ms) the Tk loop checks whether a background operation has finished
+ASYNC_POLL_MS = 20
+
 class App:
     """
     Main application class that manages window initialization, page navigation,
@@ -22,9 +34,26 @@ class App:
         setup_styles()
 
         # Initialize shared resources
-        self.db = Database()
-        self.student_controller = StudentController(self.db)
-        self.admin_controller = AdminController(self.db)
+        self.db = open_database()
+        self.adb = AsyncDatabase(self.db)
+        self.ids = IdAllocator.for_database(self.db)
+        self.catalog = SubjectCatalog.for_database(self.db)
+        # Student writes go straight to the store; with session_autocommit off they are
+        # buffered and committed at logout instead (see UnitOfWork)
+        self.session = UnitOfWork(self.db)
+        # Built on the session so a rebuild sees any enrolments still buffered in it
+        self.enrolments = EnrolmentIndex(self.session, self.catalog)
+        # One live Student per id, shared by every controller and page
+        self.students = StudentRepository(self.session)
+        self.student_controller = StudentController(self.session, adb=self.adb, ids=self.ids, students=self.students)
+        self.subject_controller = SubjectController(self.session, adb=self.adb, catalog=self.catalog,
+                                                    enrolments=self.enrolments, students=self.students)
+        self.admin_controller = AdminController(self.db, adb=self.adb, ids=self.ids, catalog=self.catalog,
+                                                enrolments=self.enrolments, students=self.students)
+
+        # Event loop for controller coroutines, kept off the Tk thread
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
 
         # Page registry
         self.pages = {
@@ -68,7 +97,7 @@ class App:
         if "app" in sig.parameters:
             kwargs["app"] = self
         if "db" in sig.parameters:
-            kwargs["db"] = self.db
+            kwargs["db"] = self.session
         if page_name == "splash" and "on_continue" in sig.parameters:
             kwargs["on_continue"] = lambda: self.navigate("login")
 
@@ -104,6 +133,33 @@ class App:
         """Display an error message in a modal dialog."""
         messagebox.showerror("Navigation Error", message)
 
+    def run_async(self, coro, on_done, on_error=None):
+        """
+        Run a controller coroutine on the background event loop and hand its
+        result to `on_done` on the Tk thread, so the window keeps responding.
+
+        Args:
+            coro: Coroutine to run (e.g. controller.login_async(...)).
+            on_done (callable): Called with the coroutine's result.
+            on_error (callable): Called with the exception if it fails.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+        def poll():
+            if not future.done():
+                self.root.after(ASYNC_POLL_MS, poll)
+            elif future.exception() is not None:
+                (on_error or (lambda e: self._show_error(str(e))))(future.exception())
+            else:
+                on_done(future.result())
+
+        self.root.after(ASYNC_POLL_MS, poll)
+
     def run(self):
         """Start the main application loop."""
         self.root.mainloop()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.session.close()
+        self.adb.close()
+        self.ids.close()
+        self.catalog.close()
@@ -1,7 +1,5 @@
 import tkinter as tk
 from tkinter import ttk
-from controller.subject_controller import SubjectController
-from db.database import Database
 from resources.parameters.app_parameters import ENROLLMENT_CONFIG
 from view.GUI.base_page import BasePage
 from components.label_component import LabelComponent
@@ -15,11 +13,12 @@ class EnrolmentPage(BasePage):
     Displays student info, enrolment actions, and subject table.
     """
 
-    def __init__(self, master, controller=None, app=None):
+    def __init__(self, master, controller=None, db=None, app=None):
         super().__init__(master, bg="white", layout="grid")
         self.controller = controller
-        self.db = Database()
-        self.subjects = SubjectController(self.db)
+        self.db = db
+        # The app's shared SubjectController
+        self.subjects = app.subject_controller
         self.app = app
 
         self.controller.current_student = getattr(controller, "current_student", None)
@@ -105,6 +104,8 @@ class EnrolmentPage(BasePage):
                                   fg="#fff", bg="#007BFF", layout="grid", padding=(6, 6))
             btn.create_component()
             btn.button_widget.grid(row=0, column=i, padx=6, pady=6, sticky="ew")
+            if command == self._popup_enrol:
+                self.enrol_button = btn
 
     def _refresh_status(self):
         """Update average and status labels."""
@@ -169,13 +170,32 @@ class EnrolmentPage(BasePage):
             self._show_message("Error", "No student loaded.")
             return
 
-        ok, msg, _ = self.subjects.enrol_auto()
+        if self.app:
+            # Persist off the Tk thread so the window stays responsive; one enrolment at a time
+            self.enrol_button.button_widget.configure(state="disabled")
+            self.app.run_async(self.subjects.enrol_auto_async(),
+                               lambda outcome: self._on_enrolled(*outcome[:2]),
+                               self._on_enrol_error)
+        else:
+            self._on_enrolled(*self.subjects.enrol_auto()[:2])
+
+    def _on_enrolled(self, ok, msg):
+        """Refresh the status labels and report an enrolment result."""
+        self.enrol_button.button_widget.configure(state="normal")
         self._refresh_status()
         self._show_message("Success" if ok else "Error", msg)
 
+    def _on_enrol_error(self, e):
+        """Re-enable enrolment and report a failed background enrolment."""
+        self.enrol_button.button_widget.configure(state="normal")
+        self._show_message("Error", str(e))
+
     def _on_logout(self):
-        """Handle logout and navigate to login page."""
+        """Commit the session, then navigate to login page."""
         print("[DEBUG][Enrollment Page] -> login")
+        ok, msg = self.controller.logout()
+        if not ok:
+            self._show_message("Error", msg)
         if self.app:
             self.app.navigate("login")
 
@@ -116,8 +116,23 @@ class LoginPage(BasePage):
         password = self.password_field.get_value()
         print(f"[DEBUG][LoginPage] Login attempt email={email}")
 
+        if self.app:
+            # Look the student up off the Tk thread so the window stays responsive
+            self.login_button.button_widget.configure(state="disabled")
+            self.app.run_async(self.controller.login_async(email, password),
+                               lambda outcome: self._on_login_result(*outcome),
+                               self._on_login_error)
+            return
+
+        try:
+            self._on_login_result(*self.controller.login(email, password))
+        except Exception as e:
+            self._on_login_error(e)
+
+    def _on_login_result(self, success, result):
+        """Route the user after a login attempt completes."""
         try:
-            success, result = self.controller.login(email, password)
+            self.login_button.button_widget.configure(state="normal")
             print(f"[DEBUG][LoginPage] Login result: {success}, {result}")
 
             if success:
@@ -134,9 +149,14 @@ class LoginPage(BasePage):
                 self._clear_fields()
 
         except Exception as e:
-            print(f"[ERROR][LoginPage] Exception: {e}")
-            self._show_message("Login Error", f"An error occurred: {e}")
-            self._clear_fields()
+            self._on_login_error(e)
+
+    def _on_login_error(self, e):
+        """Report a failed login attempt."""
+        self.login_button.button_widget.configure(state="normal")
+        print(f"[ERROR][LoginPage] Exception: {e}")
+        self._show_message("Login Error", f"An error occurred: {e}")
+        self._clear_fields()
 
     def _show_message(self, title, message):
         """Display a modal message box with the given title and message."""